@@ -1,17 +1,34 @@
-from flask import Flask, render_template, request, send_from_directory
+from flask import (Flask, abort, g, has_app_context, make_response, render_template,
+                   request, send_from_directory, url_for)
 import sqlite3
-from datetime import datetime, timedelta
+import hashlib
+import mimetypes
+import atexit
+import threading
+import weakref
+from pathlib import Path
+from datetime import datetime, timedelta, timezone
+from functools import wraps
 import os
-from collections import defaultdict
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeout
+from collections import OrderedDict, defaultdict
 import re
-from markupsafe import escape
+from markupsafe import Markup, escape
+from werkzeug.exceptions import HTTPException
 from werkzeug.utils import secure_filename
 
+from archive_calendar import ensure_calendar
+
 app = Flask(__name__)
 
 
 app.config['MAX_CONTENT_LENGTH'] = 2 * 1024 * 1024  # 2MB
 
+# Front proxy file offload, see send_archive_file()
+app.config['ACCEL_REDIRECT_PREFIX'] = os.environ.get('ARCHIVE_ACCEL_REDIRECT', '')
+app.config['USE_X_SENDFILE']        = os.environ.get('ARCHIVE_X_SENDFILE') == '1'
+
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 
 PORTAL_DB_PATH   = os.path.join(BASE_DIR, "portal_archive", "database.db")
@@ -24,6 +41,8 @@ PAPER_DB_PATH   = os.path.join(BASE_DIR, "paper_archive", "database.db")
 SOCIAL_THUMB_DIR = os.path.join(BASE_DIR, "social_archive", "thumbnails")
 SOCIAL_DB_PATH   = os.path.join(BASE_DIR, "social_archive", "social_archive.db")
 
+CALENDAR_DB_PATH = os.path.join(BASE_DIR, "archive_calendar.db")
+
 
 
 def validate_date(date_str):
@@ -35,33 +54,327 @@ def sanitize_search(text):
     text = (text or "").strip()
     if len(text) > 100:
         return ""
-    return re.sub(r'[^\w\s\-.,]', '', text)
+    # Devanagari vowel signs and the virama are not \w, keep them explicitly
+    return re.sub(r'[^\w\s\-.,\u0900-\u097F\u200c\u200d]', '', text)
+
+# bm25 weights for articles_fts: title, summary_en, summary_np,
+# keywords_en, keywords_np, clean_content
+FTS_WEIGHTS = "10.0, 4.0, 4.0, 3.0, 3.0, 1.0"
+
+def fts_match(text):
+    """Turn a sanitized query into an FTS5 MATCH expression.
+
+    Every word becomes a quoted prefix term so that "नेपाल" also finds
+    "नेपालमा" / "नेपालले" and "elect" finds "election".
+    """
+    terms = [t for t in re.split(r'[\s\-.,]+', text or "") if t]
+    return " ".join('"' + t.replace('"', '') + '"*' for t in terms)
 
 def validate_choice(value, allowed):
     return value if value in allowed else ""
 
-def get_db(path):
-    conn = sqlite3.connect(path)
-    conn.execute("PRAGMA foreign_keys = ON")
+# Read-only connections are kept open per thread and reused across requests,
+# so a request no longer pays for connect + schema parsing on every query.
+DB_CACHE_KIB         = 16 * 1024
+DB_MMAP_BYTES        = 256 * 1024 * 1024
+DB_CACHED_STATEMENTS = 256
+
+# Each thread keeps its own connections and they are closed when the thread
+# ends, so short-lived request threads don't leave descriptors behind.
+_db_local = threading.local()
+_db_open  = weakref.WeakSet()  # every live connection, for close_all_db()
+_db_lock  = threading.Lock()
+
+class _ThreadConnections(dict):
+    """One thread's connections by path (a dict subclass so it can be weakly referenced)."""
+
+def _close_connections(conns):
+    for conn in conns:
+        try:
+            conn.close()
+        except sqlite3.Error:
+            pass
+
+class ArchiveConnection(sqlite3.Connection):
+    """Read-only archive connection that remembers which optional tables exist."""
+
+    def has_table(self, name):
+        """Checked once per connection; archives not yet migrated lack newer tables."""
+        known = self.__dict__.setdefault('tables', {})
+        if name not in known:
+            known[name] = self.execute(
+                "SELECT 1 FROM sqlite_master WHERE name = ?", (name,)
+            ).fetchone() is not None
+        return known[name]
+
+def open_readonly(path):
+    conn = sqlite3.connect(
+        Path(path).as_uri() + "?mode=ro",
+        uri=True,
+        check_same_thread=False,
+        cached_statements=DB_CACHED_STATEMENTS,
+        factory=ArchiveConnection,
+    )
+    conn.execute("PRAGMA query_only = ON")
+    conn.execute(f"PRAGMA cache_size = -{DB_CACHE_KIB}")
+    conn.execute(f"PRAGMA mmap_size = {DB_MMAP_BYTES}")
     conn.row_factory = sqlite3.Row
     return conn
 
+def get_db(path):
+    """Return this thread's pooled read-only connection for path."""
+    pool = getattr(_db_local, "conns", None)
+    if pool is None:
+        pool = _db_local.conns = _ThreadConnections()
+        pool.opened = []
+        # runs when the thread-local is dropped at thread exit (or at interpreter exit)
+        weakref.finalize(pool, _close_connections, pool.opened)
+    conn = pool.get(path)
+    if conn is None:
+        conn = pool[path] = open_readonly(path)
+        pool.opened.append(conn)
+        with _db_lock:
+            _db_open.add(conn)
+    if has_app_context():
+        g.setdefault("db_used", set()).add(path)
+    return conn
+
+@app.teardown_appcontext
+def release_db(exc):
+    """Hand the request's connections back in a clean state."""
+    pool = getattr(_db_local, "conns", {})
+    for path in g.pop("db_used", ()):
+        conn = pool.get(path)
+        if conn is not None and conn.in_transaction:
+            conn.rollback()
+
+@atexit.register
+def close_all_db():
+    with _db_lock:
+        conns = list(_db_open)
+    _close_connections(conns)
+
+
+# Rendered /papers, /portals and /socials pages are cached in memory, keyed on
+# the normalized query args and on the archive_generation counter that the
+# scrapers' triggers bump on every write to that database.
+RESPONSE_CACHE_BYTES   = 64 * 1024 * 1024
+RESPONSE_CACHE_ENTRIES = 2048
+HISTORICAL_PAGE_AGE    = 24 * 3600  # a final day's pages can still gain late additions
+
+class ResponseCache:
+    """Thread-safe LRU of rendered pages, capped by entry count and bytes."""
+
+    def __init__(self, max_bytes, max_entries):
+        self.max_bytes   = max_bytes
+        self.max_entries = max_entries
+        self.entries     = OrderedDict()
+        self.size        = 0
+        self.lock        = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                self.entries.move_to_end(key)
+            return entry
+
+    def put(self, key, entry):
+        size = len(entry['body'])
+        if size > self.max_bytes:
+            return
+        with self.lock:
+            old = self.entries.pop(key, None)
+            if old is not None:
+                self.size -= len(old['body'])
+            self.entries[key] = entry
+            self.size += size
+            while self.size > self.max_bytes or len(self.entries) > self.max_entries:
+                _, evicted = self.entries.popitem(last=False)
+                self.size -= len(evicted['body'])
+
+response_cache = ResponseCache(RESPONSE_CACHE_BYTES, RESPONSE_CACHE_ENTRIES)
+
+def archive_generation(path):
+    """(generation, last-modified) of an archive, or None if it has no counter."""
+    try:
+        row = get_db(path).execute(
+            "SELECT generation, updated_at FROM archive_generation WHERE id = 1"
+        ).fetchone()
+    except sqlite3.Error:
+        return None
+    if row is None:
+        return None
+    modified = datetime.strptime(row['updated_at'], '%Y-%m-%d %H:%M:%S').replace(tzinfo=timezone.utc)
+    return row['generation'], modified
+
+def is_historical(date_str):
+    """Days before yesterday are final; yesterday can still get late papers."""
+    return bool(date_str) and date_str < (datetime.now() - timedelta(days=1)).strftime('%Y-%m-%d')
+
+def lookup_choice(db_path, sql):
+    """Cache-key normalizer: the value if sql finds it in a lookup table, else ''."""
+    def normalize(value):
+        if value and get_db(db_path()).execute(sql, (value,)).fetchone():
+            return value
+        return ''
+    return normalize
+
+def cached_page(db_path, normalizers):
+    """Cache a listing route's rendered page and answer conditional requests.
+
+    db_path is a callable so the path is looked up per request. normalizers
+    maps each query arg to the normalizer the view applies to it, so requests
+    the view would render the same share one cache entry.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            gen = archive_generation(db_path())
+            if gen is None:
+                return view(*args, **kwargs)
+            generation, modified = gen
+
+            params = tuple((name, normalize(request.args.get(name, '').strip()) or '')
+                           for name, normalize in normalizers.items())
+            today  = datetime.now().strftime('%Y-%m-%d')  # pages embed today's date
+            key    = (request.endpoint, params, generation, today)
+            entry  = response_cache.get(key)
+            if entry is None:
+                resp = make_response(view(*args, **kwargs))
+                if resp.status_code != 200:
+                    return resp
+                body  = resp.get_data()
+                entry = {
+                    'body':     body,
+                    'mimetype': resp.mimetype,
+                    'etag':     hashlib.sha256(body).hexdigest()[:32],
+                }
+                response_cache.put(key, entry)
+
+            resp = app.response_class(entry['body'], mimetype=entry['mimetype'])
+            resp.set_etag(entry['etag'])
+            resp.last_modified = modified
+            if is_historical(dict(params).get('date')):
+                # bounded, then revalidated against the ETag
+                resp.cache_control.public          = True
+                resp.cache_control.max_age         = HISTORICAL_PAGE_AGE
+                resp.cache_control.must_revalidate = True
+            else:
+                resp.cache_control.public   = True
+                resp.cache_control.no_cache = True
+            return resp.make_conditional(request)
+        return wrapper
+    return decorator
+
+
+# Archive files are written once per day and named after it: papers as
+# {date}_{key}.pdf/.jpg, portal shots as {key}_{date}_{HHMMSS}.png, social
+# shots as {YYYY_MM_DD}_{name}.png. A file whose day is final rarely changes,
+# but thumbnails.py --force and the variant backfill rewrite it in place, so
+# it is cached for a day and then revalidated rather than marked immutable.
+ARCHIVE_FILE_DATE_RE = re.compile(r'(\d{4})[-_](\d{2})[-_](\d{2})')
+
+def send_archive_file(directory, filename):
+    """Serve a PDF or thumbnail with Range support and day-long caching.
+
+    Range / If-Range and conditional requests are handled by werkzeug's
+    send_file, which hands the open file to the WSGI server's file_wrapper
+    (sendfile(2) under gunicorn/uwsgi). With a front proxy configured the
+    transfer is offloaded entirely: ARCHIVE_ACCEL_REDIRECT for nginx, or
+    ARCHIVE_X_SENDFILE=1 for Apache/lighttpd mod_xsendfile.
+    """
+    filename = secure_filename(filename)
+    path     = os.path.join(directory, filename)
+    if not filename or not os.path.isfile(path):
+        abort(404)
+
+    prefix = app.config['ACCEL_REDIRECT_PREFIX']
+    if prefix:
+        rel  = os.path.relpath(path, BASE_DIR).replace(os.sep, '/')
+        resp = app.response_class(mimetype=mimetypes.guess_type(filename)[0] or 'application/octet-stream')
+        resp.headers['X-Accel-Redirect'] = prefix.rstrip('/') + '/' + rel
+    else:
+        resp = send_from_directory(directory, filename, conditional=True, etag=True)
+
+    m = ARCHIVE_FILE_DATE_RE.search(filename)
+    resp.cache_control.public = True
+    if m and is_historical('-'.join(m.groups())):
+        resp.cache_control.no_cache        = None
+        resp.cache_control.max_age         = HISTORICAL_PAGE_AGE
+        resp.cache_control.must_revalidate = True
+    else:
+        resp.cache_control.no_cache = True
+    return resp
+
+# older mimetypes tables don't know the thumbnail variant formats
+mimetypes.add_type('image/avif', '.avif')
+mimetypes.add_type('image/webp', '.webp')
+
+def attach_variants(conn, rows, key='thumb_filename'):
+    """Give each row a 'variants' dict of {format: [(filename, width), ...]}.
+
+    One query per page, against the thumbnail_variants table the scrapers
+    fill (see image_variants.py). Rows without variants get an empty dict
+    and fall back to the original thumbnail.
+    """
+    names = list({r[key] for r in rows if r.get(key)})
+    found = defaultdict(lambda: defaultdict(list))
+    if names:
+        try:
+            for v in conn.execute(f"""
+                SELECT source, format, width, filename FROM thumbnail_variants
+                WHERE source IN ({','.join('?' * len(names))})
+                ORDER BY source, format, width
+            """, names):
+                found[v['source']][v['format']].append((v['filename'], v['width']))
+        except sqlite3.OperationalError:  # archive not migrated yet
+            pass
+    for r in rows:
+        r['variants'] = dict(found.get(r.get(key), {}))
+    return rows
 
 @app.route('/papers/pdf/<path:filename>')
 def serve_paper_pdf(filename):
-    return send_from_directory(PAPER_PDF_DIR, secure_filename(filename))
+    return send_archive_file(PAPER_PDF_DIR, filename)
 
 @app.route('/papers/thumbnails/<path:filename>')
 def serve_paper_thumbnail(filename):
-    return send_from_directory(PAPER_THUMB_DIR, secure_filename(filename))
+    return send_archive_file(PAPER_THUMB_DIR, filename)
 
 @app.route('/portals/thumbnails/<path:filename>')
 def serve_portal_thumbnail(filename):
-    return send_from_directory(PORTAL_THUMB_DIR, secure_filename(filename))
+    return send_archive_file(PORTAL_THUMB_DIR, filename)
 
 @app.route('/socials/thumbnails/<path:filename>')
 def serve_social_thumbnail(filename):
-    return send_from_directory(SOCIAL_THUMB_DIR, secure_filename(filename))
+    return send_archive_file(SOCIAL_THUMB_DIR, filename)
+
+
+_calendar_lock  = threading.Lock()
+_calendar_ready = False
+
+def ensure_calendar_once():
+    """Build archive_calendar from the archives the first time it is needed.
+
+    On a deployment that predates the calendar it would otherwise stay
+    empty until someone runs `python archive_calendar.py rebuild`.
+    """
+    global _calendar_ready
+    if _calendar_ready:
+        return
+    with _calendar_lock:
+        if _calendar_ready:
+            return
+        try:
+            ensure_calendar(CALENDAR_DB_PATH, {
+                "paper":  PAPER_DB_PATH,
+                "portal": PORTAL_DB_PATH,
+                "social": SOCIAL_DB_PATH,
+            })
+        except (OSError, sqlite3.Error) as e:
+            print("Calendar rebuild failed:", e)
+        _calendar_ready = True
 
 
 @app.route('/')
@@ -79,41 +392,21 @@ def homepage():
     archive_info = defaultdict(dict)
 
     try:
-        conn = get_db(SOCIAL_DB_PATH)
-        rows = conn.execute(
-            "SELECT DISTINCT archive_date FROM archive_dates WHERE archive_date LIKE ?",
-            (f"{requested_year}%",)
-        ).fetchall()
-        for r in rows:
-            archive_info[r[0]]['social'] = True
-        conn.close()
-    except:
-        pass
-
-
-    try:
-        conn = get_db(PORTAL_DB_PATH)
-        rows = conn.execute(
-            "SELECT DISTINCT DATE(scrape_datetime) FROM headline_snapshots WHERE DATE(scrape_datetime) LIKE ?",
-            (f"{requested_year}%",)
-        ).fetchall()
+        ensure_calendar_once()
+        conn = get_db(CALENDAR_DB_PATH)
+        rows = conn.execute("""
+            SELECT date, has_paper, has_portal, has_social,
+                   paper_count, portal_count, social_count
+            FROM archive_calendar
+            WHERE date >= ? AND date < ?
+        """, (f"{requested_year}-01-01", f"{requested_year + 1}-01-01")).fetchall()
         for r in rows:
-            archive_info[r[0]]['portal'] = True
-        conn.close()
-    except:
-        pass
-
-    try:
-        conn = get_db(PAPER_DB_PATH)
-        rows = conn.execute(
-            "SELECT DISTINCT issue_date FROM issues WHERE issue_date LIKE ?",
-            (f"{requested_year}%",)
-        ).fetchall()
-        for r in rows:
-            archive_info[r[0]]['paper'] = True
-        conn.close()
-    except:
-        pass
+            for kind in ('paper', 'portal', 'social'):
+                if r[f'has_{kind}']:
+                    archive_info[r['date']][kind] = True
+                    archive_info[r['date']][f'{kind}_count'] = r[f'{kind}_count']
+    except Exception as e:
+        print("Calendar error:", e)
 
     return render_template(
         'homepage.html',
@@ -126,6 +419,11 @@ def homepage():
 
 
 @app.route('/socials')
+@cached_page(lambda: SOCIAL_DB_PATH, {
+    'date':     validate_date,
+    'platform': lookup_choice(lambda: SOCIAL_DB_PATH,
+                              "SELECT 1 FROM platforms WHERE CAST(platform_id AS TEXT) = ?"),
+})
 def socials():
     conn = get_db(SOCIAL_DB_PATH)
     c = conn.cursor()
@@ -172,11 +470,10 @@ def socials():
             }
             for r in c.fetchall()
         ]
+        attach_variants(conn, rows)
     except Exception as e:
         print("Social error:", e)
 
-    conn.close()
-
     return render_template(
         'social_homepage.html',
         rows=rows,
@@ -187,6 +484,11 @@ def socials():
     )
 
 @app.route('/papers')
+@cached_page(lambda: PAPER_DB_PATH, {
+    'date':  validate_date,
+    'lang':  lambda v: validate_choice(v, ['np', 'en']),
+    'paper': lookup_choice(lambda: PAPER_DB_PATH, "SELECT 1 FROM newspapers WHERE key = ?"),
+})
 def papers():
     conn = get_db(PAPER_DB_PATH)
     c = conn.cursor()
@@ -235,11 +537,10 @@ def papers():
             }
             for r in c.fetchall()
         ]
+        attach_variants(conn, rows)
     except Exception as e:
         print("Paper error:", e)
 
-    conn.close()
-
     return render_template(
         'paper_homepage.html',
         rows=rows,
@@ -252,15 +553,24 @@ def papers():
 
 
 @app.route('/portals')
+@cached_page(lambda: PORTAL_DB_PATH, {
+    'date':   validate_date,
+    'portal': lookup_choice(lambda: PORTAL_DB_PATH,
+                            "SELECT 1 FROM portals WHERE portal_key = ? AND is_active = 1"),
+    'lang':   lambda v: validate_choice(v, ['np', 'en']),
+    # a query that sanitizes away entirely renders empty, not like no query
+    'q':      lambda v: sanitize_search(v) or (' ' if v else ''),
+})
 def portals():
     conn = get_db(PORTAL_DB_PATH)
     c = conn.cursor()
 
-    search = sanitize_search(request.args.get('q', ''))
+    raw_q  = request.args.get('q', '').strip()
+    search = sanitize_search(raw_q)
     date_str = validate_date(request.args.get('date', ''))
 
     if not date_str:
-        row = c.execute("SELECT MAX(DATE(scrape_datetime)) as max_date FROM headline_snapshots").fetchone()
+        row = c.execute("SELECT MAX(scrape_date) as max_date FROM headline_snapshots").fetchone()
         date_str = row["max_date"]
 
     portal_rows = c.execute(
@@ -272,6 +582,8 @@ def portals():
     portal_key  = validate_choice(request.args.get('portal', ''), portals_map)
     lang_filter = validate_choice(request.args.get('lang', ''), ['np', 'en'])
 
+    match = fts_match(search)
+
     query = """
         SELECT hs.snapshot_id, hs.scrape_datetime, hs.thumbnail_filename,
                p.portal_key, p.portal_name, p.language,
@@ -281,9 +593,19 @@ def portals():
         FROM headline_snapshots hs
         JOIN portals p ON p.portal_key = hs.portal_key
         JOIN articles a ON a.article_id = hs.article_id
-        WHERE DATE(hs.scrape_datetime) = ?
     """
-    params = [date_str]
+    params = []
+
+    if match:
+        # bm25 is negative, smaller means a better match
+        query += f"""
+        JOIN (SELECT rowid, bm25(articles_fts, {FTS_WEIGHTS}) AS rank
+              FROM articles_fts WHERE articles_fts MATCH ?) m ON m.rowid = a.article_id
+        """
+        params.append(match)
+
+    query += " WHERE hs.scrape_date = ?"
+    params.append(date_str)
 
     if portal_key:
         query += " AND hs.portal_key = ?"
@@ -293,32 +615,28 @@ def portals():
         query += " AND p.language = ?"
         params.append(lang_filter)
 
-    if search:
-        like = f"%{search}%"
-        query += " AND (a.title LIKE ? OR a.summary_en LIKE ? OR a.summary_np LIKE ?)"
-        params.extend([like, like, like])
-
-    query += " ORDER BY hs.scrape_datetime DESC"
+    query += " ORDER BY m.rank, hs.scrape_datetime DESC" if match else " ORDER BY hs.scrape_datetime DESC"
 
     rows = []
     try:
-        c.execute(query, params)
-        rows = [
-            {
-                **dict(r),
-                "title": escape(r["title"]),
-                "summary_en": escape(r["summary_en"]) if r["summary_en"] else "",
-                "summary_np": escape(r["summary_np"]) if r["summary_np"] else "",
-                "keywords_en": escape(r["keywords_en"]) if r["keywords_en"] else "",
-                "keywords_np": escape(r["keywords_np"]) if r["keywords_np"] else ""
-            }
-            for r in c.fetchall()
-        ]
+        # a query with no searchable terms matches nothing, not everything
+        if match or not raw_q:
+            c.execute(query, params)
+            rows = [
+                {
+                    **dict(r),
+                    "title": escape(r["title"]),
+                    "summary_en": escape(r["summary_en"]) if r["summary_en"] else "",
+                    "summary_np": escape(r["summary_np"]) if r["summary_np"] else "",
+                    "keywords_en": escape(r["keywords_en"]) if r["keywords_en"] else "",
+                    "keywords_np": escape(r["keywords_np"]) if r["keywords_np"] else ""
+                }
+                for r in c.fetchall()
+            ]
+            attach_variants(conn, rows, 'thumbnail_filename')
     except Exception as e:
         print("Portal error:", e)
 
-    conn.close()
-
     return render_template(
         'portal_homepage.html',
         rows=rows,
@@ -330,12 +648,130 @@ def portals():
         today=datetime.now().strftime("%Y-%m-%d"),
     )
 
-@app.route('/search')
-def search():
-    from math import ceil
-    import unicodedata
+SEARCH_PER_PAGE  = 12
+SEARCH_COUNT_CAP = 1000
+
+# /search queries the three archives side by side; a source that is still
+# running SEARCH_SOURCE_TIMEOUT seconds after a worker picked it up (or that
+# waited that long for a worker) is interrupted and shown as partial
+SEARCH_SOURCE_TIMEOUT = 3.0
+SEARCH_POOL = ThreadPoolExecutor(max_workers=6, thread_name_prefix="search")
+
+def wait_for_source(future, state, submitted):
+    """future.result(), with the source's time budget starting when it starts running."""
+    while True:
+        started  = state.get('started')
+        deadline = (started or submitted) + SEARCH_SOURCE_TIMEOUT
+        try:
+            return future.result(timeout=max(0, deadline - time.monotonic()))
+        except FuturesTimeout:
+            if started is None and state.get('started') is not None:
+                continue  # only just left the queue: give it its full budget
+            raise
+
+def stop_source(state):
+    """Interrupt a timed-out search job, but only while it still owns its connection.
+
+    Connections are pooled per worker thread, so once the job has let go of
+    it the same connection may already be running another request's job.
+    """
+    with state['lock']:
+        state['cancelled'] = True
+        conn = state.get('conn')
+        if conn is not None:
+            conn.interrupt()
+
+# matching pages listed per newspaper issue in /search
+SEARCH_PAGE_HITS = 5
 
+def attach_page_hits(conn, rows, match, per_issue=SEARCH_PAGE_HITS):
+    """Give each paper row the pages whose text matches, best first.
 
+    Sets 'pages' to the matching page numbers and 'snippet' to the best
+    page's matched text, highlighted. One query for the whole result page.
+    """
+    ids  = [r['issue_id'] for r in rows]
+    hits = defaultdict(list)
+    if ids and match and conn.has_table('page_fts'):
+        for h in conn.execute(f"""
+            SELECT pt.issue_id, pt.page,
+                   snippet(page_fts, 0, char(2), char(3), '…', 16) AS snippet
+            FROM page_fts
+            JOIN page_text pt ON pt.id = page_fts.rowid
+            WHERE page_fts MATCH ? AND pt.issue_id IN ({','.join('?' * len(ids))})
+            ORDER BY rank
+        """, [match, *ids]):
+            hits[h['issue_id']].append(h)
+    for r in rows:
+        found        = hits.get(r['issue_id'], [])[:per_issue]
+        r['pages']   = [h['page'] for h in found]
+        r['snippet'] = Markup(str(escape(found[0]['snippet']))
+                              .replace('\x02', '<mark>').replace('\x03', '</mark>')) if found else ''
+    return rows
+
+def parse_cursor(raw, key_type=str):
+    """Decode a "sort_key|row_id" cursor from the query string."""
+    if not raw or len(raw) > 64 or '|' not in raw:
+        return None
+    key, _, row_id = raw.rpartition('|')
+    try:
+        return key_type(key), int(row_id)
+    except ValueError:
+        return None
+
+def make_cursor(row):
+    return f"{row['sort_key']}|{row['row_id']}"
+
+def keyset_page(conn, sql, params, descending, after=None, before=None,
+                per_page=SEARCH_PER_PAGE):
+    """Seek pagination over a query exposing sort_key and row_id columns.
+
+    Fetches per_page + 1 rows past the cursor so the cost of a page does not
+    depend on how deep into the results it is. Returns the rows plus the
+    cursors for the neighbouring pages (None when there is none).
+    """
+    backward = before is not None and after is None
+    cursor   = before if backward else after
+    forward_order = "DESC" if descending else "ASC"
+    if backward:
+        cmp   = ">" if descending else "<"
+        order = "ASC" if descending else "DESC"
+    else:
+        cmp   = "<" if descending else ">"
+        order = forward_order
+
+    where, vals = "", []
+    if cursor:
+        where = f"WHERE (sort_key, row_id) {cmp} (?, ?)"
+        vals  = list(cursor)
+
+    rows = conn.execute(f"""
+        SELECT * FROM ({sql}) {where}
+        ORDER BY sort_key {order}, row_id {order}
+        LIMIT ?
+    """, list(params) + vals + [per_page + 1]).fetchall()
+
+    more = len(rows) > per_page
+    rows = rows[:per_page]
+    if backward:
+        rows.reverse()
+        prev_cursor = make_cursor(rows[0]) if more and rows else None
+        next_cursor = make_cursor(rows[-1]) if rows else None
+    else:
+        prev_cursor = make_cursor(rows[0]) if cursor and rows else None
+        next_cursor = make_cursor(rows[-1]) if more else None
+    return rows, prev_cursor, next_cursor
+
+def capped_count(conn, sql, params, cap=SEARCH_COUNT_CAP):
+    """Count matches, stopping at cap + 1 so huge result sets stay cheap."""
+    row = conn.execute(
+        f"SELECT COUNT(*) FROM (SELECT 1 FROM ({sql}) LIMIT ?)",
+        list(params) + [cap + 1]
+    ).fetchone()
+    return row[0]
+
+@app.route('/search')
+def search():
     raw_q     = request.args.get('q', '').strip()
     q         = sanitize_search(raw_q)
     date_from = validate_date(request.args.get('from', ''))
@@ -345,20 +781,33 @@ def search():
     allowed_sources = {'papers', 'portals', 'socials'}
     sources = [s for s in raw_sources if s in allowed_sources] or list(allowed_sources)
 
-    try:    page_papers  = max(1, int(request.args.get('pp', 1)))
-    except: page_papers  = 1
-    try:    page_portals = max(1, int(request.args.get('po', 1)))
-    except: page_portals = 1
-    try:    page_socials = max(1, int(request.args.get('ps', 1)))
-    except: page_socials = 1
-
-    PER_PAGE = 12
-
-    paper_results  = []
-    portal_results = []
-    social_results = []
-
-    searched = bool(q or date_from or date_to)
+    match = fts_match(q)
+    # a query with no searchable terms matches nothing, as on /portals
+    no_terms = bool(raw_q) and not match
+
+    # (after, before) cursor parameter names per source
+    cursor_params = {
+        'papers':  ('pa', 'pb'),
+        'portals': ('oa', 'ob'),
+        'socials': ('sa', 'sb'),
+    }
+    # ranked portal results page on bm25 score, everything else on date
+    key_types = {'papers': str, 'portals': float if match else str, 'socials': str}
+    cursors = {}
+    for src, (a, b) in cursor_params.items():
+        after  = parse_cursor(request.args.get(a, ''), key_types[src])
+        before = parse_cursor(request.args.get(b, ''), key_types[src])
+        cursors[src] = (after, before)
+
+    results = {
+        src: {'rows': [], 'total': 0, 'prev': None, 'next': None}
+        for src in cursor_params
+    }
+
+    timings         = {}
+    partial_sources = []
+
+    searched = bool(raw_q or date_from or date_to)
 
     if searched:
 
@@ -374,112 +823,191 @@ def search():
 
         like = f"%{q}%" if q else None
 
-
-        if 'papers' in sources:
+        def run(src, db_path, sql, params, descending, clean, state):
+            started = time.perf_counter()
+            conn = get_db(db_path)
+            with state['lock']:
+                if state.get('cancelled'):
+                    return
+                state['conn']    = conn
+                state['started'] = time.monotonic()
             try:
-                conn = get_db(PAPER_DB_PATH)
-                dc, dv = date_clause("i.issue_date")
-                qc = " AND (n.name LIKE ?)" if like else ""
-                qv = [like] if like else []
-                sql = f"""
-                    SELECT
-                        n.name           AS title,
-                        n.language       AS language,
-                        n.name           AS source_name,
-                        i.issue_date     AS result_date,
-                        f.thumbnail_path AS thumb_path,
-                        f.pdf_path       AS pdf_path
-                    FROM newspapers n
-                    JOIN issues i ON i.newspaper_id = n.id
-                    JOIN files   f ON f.issue_id    = i.id
-                    WHERE 1=1 {dc} {qc}
-                    ORDER BY i.issue_date DESC
+                after, before = cursors[src]
+                rows, prev_c, next_c = keyset_page(conn, sql, params, descending,
+                                                   after=after, before=before)
+                # the page itself is enough to render if the count times out
+                rows = attach_variants(conn, [clean(dict(r)) for r in rows])
+                if src == 'papers':
+                    attach_page_hits(conn, rows, match)
+                state.update(rows=rows, prev=prev_c, next=next_c)
+                state['total'] = capped_count(conn, sql, params)
+                state['done']  = True
+            finally:
+                with state['lock']:
+                    state.pop('conn', None)
+                state['ms'] = round((time.perf_counter() - started) * 1000)
+
+        jobs = {}
+
+        if 'papers' in sources and not no_terms:
+            dc, dv = date_clause("i.issue_date")
+            qc, qv = "", []
+            if match and not get_db(PAPER_DB_PATH).has_table('page_fts'):
+                qc, qv = " AND (n.name LIKE ?)", [like]  # page text not extracted yet
+            elif match:
+                # the paper's name, or the text of any of its pages (see paper_text.py)
+                qc = """ AND (n.name LIKE ? OR i.id IN (
+                    SELECT pt.issue_id FROM page_fts
+                    JOIN page_text pt ON pt.id = page_fts.rowid
+                    WHERE page_fts MATCH ?))"""
+                qv = [like, match]
+            sql = f"""
+                SELECT
+                    i.id             AS issue_id,
+                    n.name           AS title,
+                    n.language       AS language,
+                    n.name           AS source_name,
+                    i.issue_date     AS result_date,
+                    f.thumbnail_path AS thumb_path,
+                    f.pdf_path       AS pdf_path,
+                    i.issue_date     AS sort_key,
+                    f.id             AS row_id
+                FROM newspapers n
+                JOIN issues i ON i.newspaper_id = n.id
+                JOIN files   f ON f.issue_id    = i.id
+                WHERE 1=1 {dc} {qc}
+            """
+
+            def clean_paper(d):
+                d['thumb_filename'] = os.path.basename(d['thumb_path']) if d.get('thumb_path') else None
+                d['pdf_filename']   = os.path.basename(d['pdf_path'])   if d.get('pdf_path')   else None
+                d['title']          = str(escape(d.get('title') or ''))
+                return d
+
+            jobs['papers'] = (PAPER_DB_PATH, sql, dv + qv, True, clean_paper)
+
+        if 'portals' in sources and not no_terms:
+            dc, dv = date_clause("hs.scrape_date")
+            if match:
+                # ranked: bm25 is negative, smaller means a better match
+                from_sql = """
+                    FROM articles_fts
+                    JOIN articles a ON a.article_id = articles_fts.rowid
+                    JOIN headline_snapshots hs ON hs.article_id = a.article_id
                 """
-                rows = conn.execute(sql, dv + qv).fetchall()
-                for r in rows:
-                    d = dict(r)
-                    d['thumb_filename'] = os.path.basename(d['thumb_path']) if d.get('thumb_path') else None
-                    d['pdf_filename']   = os.path.basename(d['pdf_path'])   if d.get('pdf_path')   else None
-                    d['title']          = str(escape(d.get('title') or ''))
-                    paper_results.append(d)
-                conn.close()
-            except Exception as e:
-                print("Search papers error:", e)
-
-        if 'portals' in sources:
-            try:
-                conn = get_db(PORTAL_DB_PATH)
-                dc, dv = date_clause("DATE(hs.scrape_datetime)")
-                qc = " AND (a.title LIKE ? OR a.summary_en LIKE ? OR a.summary_np LIKE ?)" if like else ""
-                qv = [like, like, like] if like else []
-                sql = f"""
-                    SELECT
-                        a.title                  AS title,
-                        a.summary_en             AS summary_en,
-                        a.summary_np             AS summary_np,
-                        a.article_url            AS url,
-                        p.language               AS language,
-                        p.portal_name            AS source_name,
-                        DATE(hs.scrape_datetime) AS result_date,
-                        hs.scrape_datetime       AS scrape_datetime,
-                        hs.thumbnail_filename    AS thumb_filename
+                sort_key = f"bm25(articles_fts, {FTS_WEIGHTS})"
+                qc, qv = " AND articles_fts MATCH ?", [match]
+            else:
+                from_sql = """
                     FROM headline_snapshots hs
-                    JOIN portals  p ON p.portal_key = hs.portal_key
                     JOIN articles a ON a.article_id = hs.article_id
-                    WHERE p.is_active = 1 {dc} {qc}
-                    ORDER BY hs.scrape_datetime DESC
                 """
-                rows = conn.execute(sql, dv + qv).fetchall()
-                for r in rows:
-                    d = dict(r)
-                    d['title']      = str(escape(d.get('title')      or ''))
-                    d['summary_en'] = str(escape(d.get('summary_en') or ''))
-                    d['summary_np'] = str(escape(d.get('summary_np') or ''))
-                    portal_results.append(d)
-                conn.close()
-            except Exception as e:
-                print("Search portals error:", e)
-
-        if 'socials' in sources:
+                sort_key = "hs.scrape_datetime"
+                qc, qv = "", []
+            sql = f"""
+                SELECT
+                    a.title                  AS title,
+                    a.summary_en             AS summary_en,
+                    a.summary_np             AS summary_np,
+                    a.article_url            AS url,
+                    p.language               AS language,
+                    p.portal_name            AS source_name,
+                    hs.scrape_date           AS result_date,
+                    hs.scrape_datetime       AS scrape_datetime,
+                    hs.thumbnail_filename    AS thumb_filename,
+                    {sort_key}               AS sort_key,
+                    hs.snapshot_id           AS row_id
+                {from_sql}
+                JOIN portals  p ON p.portal_key = hs.portal_key
+                WHERE p.is_active = 1 {dc} {qc}
+            """
+
+            def clean_portal(d):
+                d['title']      = str(escape(d.get('title')      or ''))
+                d['summary_en'] = str(escape(d.get('summary_en') or ''))
+                d['summary_np'] = str(escape(d.get('summary_np') or ''))
+                return d
+
+            jobs['portals'] = (PORTAL_DB_PATH, sql, dv + qv, not match, clean_portal)
+
+        if 'socials' in sources and (q or not raw_q):
+            dc, dv = date_clause("archive_date")
+            if dc:
+                # lets the planner walk idx_posts_date from the date range
+                dc = f" AND sp.archive_date_id IN (SELECT archive_date_id FROM archive_dates WHERE 1=1 {dc})"
+            qc = " AND (sp.title LIKE ?)" if like else ""
+            qv = [like] if like else []
+            sql = f"""
+                SELECT
+                    sp.title             AS title,
+                    sp.link              AS url,
+                    p.platform_name      AS source_name,
+                    ad.archive_date      AS result_date,
+                    (SELECT mf.file_path FROM media_files mf
+                      WHERE mf.post_id = sp.post_id
+                      ORDER BY mf.media_id DESC LIMIT 1) AS thumb_path,
+                    ad.archive_date      AS sort_key,
+                    sp.post_id           AS row_id
+                FROM social_posts sp
+                JOIN platforms     p  ON p.platform_id        = sp.platform_id
+                JOIN archive_dates ad ON ad.archive_date_id   = sp.archive_date_id
+                WHERE 1=1 {dc} {qc}
+            """
+
+            def clean_social(d):
+                d['thumb_filename'] = os.path.basename(d['thumb_path']) if d.get('thumb_path') else None
+                d['title']          = str(escape(d.get('title') or ''))
+                return d
+
+            jobs['socials'] = (SOCIAL_DB_PATH, sql, dv + qv, True, clean_social)
+
+        states  = {src: {'lock': threading.Lock()} for src in jobs}
+        futures = {
+            src: SEARCH_POOL.submit(run, src, *job, states[src])
+            for src, job in jobs.items()
+        }
+        submitted = time.monotonic()
+        for src, future in futures.items():
+            state = states[src]
             try:
-                conn = get_db(SOCIAL_DB_PATH)
-                dc, dv = date_clause("ad.archive_date")
-                qc = " AND (sp.title LIKE ?)" if like else ""
-                qv = [like] if like else []
-                sql = f"""
-                    SELECT
-                        sp.title             AS title,
-                        sp.link              AS url,
-                        p.platform_name      AS source_name,
-                        ad.archive_date      AS result_date,
-                        mf.file_path         AS thumb_path
-                    FROM social_posts sp
-                    JOIN platforms     p  ON p.platform_id        = sp.platform_id
-                    JOIN archive_dates ad ON ad.archive_date_id   = sp.archive_date_id
-                    LEFT JOIN media_files mf ON mf.post_id        = sp.post_id
-                    WHERE 1=1 {dc} {qc}
-                    ORDER BY ad.archive_date DESC, sp.created_at DESC
-                """
-                rows = conn.execute(sql, dv + qv).fetchall()
-                for r in rows:
-                    d = dict(r)
-                    d['thumb_filename'] = os.path.basename(d['thumb_path']) if d.get('thumb_path') else None
-                    d['title']          = str(escape(d.get('title') or ''))
-                    social_results.append(d)
-                conn.close()
+                wait_for_source(future, state, submitted)
+            except FuturesTimeout:
+                # stop the query so the worker is freed, keep what it already has
+                future.cancel()
+                try:
+                    stop_source(state)
+                except sqlite3.ProgrammingError:
+                    pass
+                partial_sources.append(src)
+                timings[src] = round(SEARCH_SOURCE_TIMEOUT * 1000)
             except Exception as e:
-                print("Search socials error:", e)
-
-    def paginate(items, page, per_page):
-        total       = len(items)
-        total_pages = ceil(total / per_page) if total else 1
-        page        = min(max(1, page), total_pages)
-        offset      = (page - 1) * per_page
-        return items[offset:offset + per_page], total, total_pages, page
+                print(f"Search {src} error:", e)
+            timings.setdefault(src, state.get('ms'))
+            results[src] = {
+                'rows':  state.get('rows', []),
+                'total': state.get('total', len(state.get('rows', []))),
+                'prev':  state.get('prev'),
+                'next':  state.get('next'),
+            }
 
-    paper_page,  paper_total,  paper_pages,  page_papers  = paginate(paper_results,  page_papers,  PER_PAGE)
-    portal_page, portal_total, portal_pages, page_portals = paginate(portal_results, page_portals, PER_PAGE)
-    social_page, social_total, social_pages, page_socials = paginate(social_results, page_socials, PER_PAGE)
+    def page_url(src, key, cursor):
+        """Link to a neighbouring page of one source, keeping the others in place."""
+        args = {'q': raw_q, 'from': date_from or '', 'to': date_to or '', 'source': sources}
+        for other, (a, b) in cursor_params.items():
+            if other != src:
+                for name in (a, b):
+                    if request.args.get(name):
+                        args[name] = request.args.get(name)
+        args[key] = cursor
+        return url_for('search', **args)
+
+    pages = {}
+    for src, (a, b) in cursor_params.items():
+        r = results[src]
+        pages[src] = {
+            'prev_url': page_url(src, b, r['prev']) if r['prev'] else None,
+            'next_url': page_url(src, a, r['next']) if r['next'] else None,
+        }
 
     has_nepali = False
     if raw_q:
@@ -492,18 +1020,18 @@ def search():
 
     return render_template(
         'search.html',
-        paper_results  = paper_page,
-        paper_total    = paper_total,
-        paper_pages    = paper_pages,
-        page_papers    = page_papers,
-        portal_results = portal_page,
-        portal_total   = portal_total,
-        portal_pages   = portal_pages,
-        page_portals   = page_portals,
-        social_results = social_page,
-        social_total   = social_total,
-        social_pages   = social_pages,
-        page_socials   = page_socials,
+        paper_results  = results['papers']['rows'],
+        paper_total    = results['papers']['total'],
+        paper_pages    = pages['papers'],
+        portal_results = results['portals']['rows'],
+        portal_total   = results['portals']['total'],
+        portal_pages   = pages['portals'],
+        social_results = results['socials']['rows'],
+        social_total   = results['socials']['total'],
+        social_pages   = pages['socials'],
+        total_cap      = SEARCH_COUNT_CAP,
+        source_timings = timings,
+        partial_sources = partial_sources,
         searched       = searched,
         search_query   = raw_q,
         date_from      = date_from or '',
@@ -515,6 +1043,8 @@ def search():
 
 @app.errorhandler(Exception)
 def handle_error(e):
+    if isinstance(e, HTTPException):  # 404, 304/416 from Range handling, ...
+        return e
     print("Error:", e)
     return "Internal Server Error", 500
 
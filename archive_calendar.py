@@ -0,0 +1,159 @@
+import os
+import sqlite3
+import sys
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+CALENDAR_DB_PATH = os.path.join(BASE_DIR, "archive_calendar.db")
+
+SOURCE_DB_PATHS = {
+    "paper":  os.path.join(BASE_DIR, "paper_archive", "database.db"),
+    "portal": os.path.join(BASE_DIR, "portal_archive", "database.db"),
+    "social": os.path.join(BASE_DIR, "social_archive", "social_archive.db"),
+}
+
+# Per-day item counts. With dates=None the whole archive is counted,
+# otherwise only the given days (each query stays on an index).
+COUNT_QUERIES = {
+    "paper": """
+        SELECT i.issue_date, COUNT(f.id)
+        FROM issues i
+        JOIN files f ON f.issue_id = i.id
+        {where}
+        GROUP BY i.issue_date
+    """,
+    "portal": """
+        SELECT scrape_date, COUNT(*)
+        FROM headline_snapshots
+        {where}
+        GROUP BY scrape_date
+    """,
+    "social": """
+        SELECT ad.archive_date, COUNT(sp.post_id)
+        FROM archive_dates ad
+        JOIN social_posts sp ON sp.archive_date_id = ad.archive_date_id
+        {where}
+        GROUP BY ad.archive_date
+    """,
+}
+
+
+def init_calendar(conn):
+    conn.executescript("""
+        CREATE TABLE IF NOT EXISTS archive_calendar (
+            date         TEXT    PRIMARY KEY
+                CHECK (date LIKE '____-__-__'),
+            has_paper    INTEGER NOT NULL DEFAULT 0,
+            has_portal   INTEGER NOT NULL DEFAULT 0,
+            has_social   INTEGER NOT NULL DEFAULT 0,
+            paper_count  INTEGER NOT NULL DEFAULT 0,
+            portal_count INTEGER NOT NULL DEFAULT 0,
+            social_count INTEGER NOT NULL DEFAULT 0
+        ) WITHOUT ROWID;
+    """)
+
+
+def calendar_is_empty(conn):
+    return conn.execute("SELECT NOT EXISTS (SELECT 1 FROM archive_calendar)").fetchone()[0]
+
+
+def _date_filter(kind, dates):
+    if dates is None:
+        return "", []
+    column = {"paper": "i.issue_date", "portal": "scrape_date", "social": "ad.archive_date"}[kind]
+    marks  = ", ".join("?" for _ in dates)
+    return f"WHERE {column} IN ({marks})", list(dates)
+
+
+def day_counts(kind, source_conn, dates=None):
+    """Return {date: count} for one archive, optionally limited to dates."""
+    where, vals = _date_filter(kind, dates)
+    rows = source_conn.execute(COUNT_QUERIES[kind].format(where=where), vals).fetchall()
+    return {d: n for d, n in rows if d}
+
+
+def _write_counts(conn, kind, counts):
+    conn.executemany(f"""
+        INSERT INTO archive_calendar (date, has_{kind}, {kind}_count)
+        VALUES (?, ?, ?)
+        ON CONFLICT(date) DO UPDATE SET
+            has_{kind}   = excluded.has_{kind},
+            {kind}_count = excluded.{kind}_count
+    """, [(d, 1 if n else 0, n) for d, n in counts.items()])
+
+
+def refresh_days(kind, dates, source_db_path=None, calendar_path=CALENDAR_DB_PATH):
+    """Recount the given days of one archive; called by the scrapers after a run."""
+    if kind not in COUNT_QUERIES:
+        raise ValueError(f"unknown archive kind: {kind}")
+    dates = sorted(set(dates))
+    if not dates:
+        return
+
+    source = sqlite3.connect(source_db_path or SOURCE_DB_PATHS[kind])
+    try:
+        counts = day_counts(kind, source, dates)
+    finally:
+        source.close()
+    counts = {d: counts.get(d, 0) for d in dates}
+
+    # run_daily.py can finish two scrapers at the same moment
+    conn = sqlite3.connect(calendar_path, timeout=30)
+    try:
+        init_calendar(conn)
+        empty = calendar_is_empty(conn)
+        if not empty:
+            _write_counts(conn, kind, counts)
+            conn.commit()
+    finally:
+        conn.close()
+    if empty:
+        # a calendar holding only these days would hide the rest of the archive
+        paths = {**SOURCE_DB_PATHS, kind: source_db_path} if source_db_path else None
+        rebuild_calendar(calendar_path, paths)
+        return
+    print(f"[Calendar] {kind}: refreshed {', '.join(dates)}")
+
+
+def ensure_calendar(calendar_path=CALENDAR_DB_PATH, source_paths=None):
+    """Rebuild archive_calendar if it is missing or empty; returns True if it did."""
+    conn = sqlite3.connect(calendar_path, timeout=30)
+    try:
+        init_calendar(conn)
+        empty = calendar_is_empty(conn)
+    finally:
+        conn.close()
+    if empty:
+        rebuild_calendar(calendar_path, source_paths)
+    return empty
+
+
+def rebuild_calendar(calendar_path=CALENDAR_DB_PATH, source_paths=None):
+    """Regenerate archive_calendar from scratch out of all three archives."""
+    print("[Calendar] rebuilding from the archives")
+    conn = sqlite3.connect(calendar_path, timeout=30)
+    init_calendar(conn)
+    conn.execute("DELETE FROM archive_calendar")
+    for kind, path in (source_paths or SOURCE_DB_PATHS).items():
+        if not os.path.exists(path):
+            print(f"[Calendar] {kind}: no database at {path}, skipped")
+            continue
+        source = sqlite3.connect(path)
+        try:
+            counts = day_counts(kind, source)
+        except sqlite3.Error as e:
+            print(f"[Calendar] {kind}: {e}")
+            counts = {}
+        finally:
+            source.close()
+        _write_counts(conn, kind, counts)
+        print(f"[Calendar] {kind}: {len(counts)} days")
+    conn.commit()
+    conn.close()
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2 or sys.argv[1] != "rebuild":
+        print("Usage: python archive_calendar.py rebuild")
+        sys.exit(1)
+    rebuild_calendar()
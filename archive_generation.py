@@ -0,0 +1,27 @@
+def init_generation(conn, tables):
+    """Create the archive_generation counter and bump it on every write.
+
+    The web app caches rendered archive pages per database and keys them on
+    this counter, so any commit a scraper makes to one of the given tables
+    invalidates that database's cached pages in the same transaction.
+    """
+    conn.executescript("""
+        CREATE TABLE IF NOT EXISTS archive_generation (
+            id         INTEGER PRIMARY KEY CHECK (id = 1),
+            generation INTEGER NOT NULL DEFAULT 0,
+            updated_at TEXT    NOT NULL DEFAULT CURRENT_TIMESTAMP
+        );
+        INSERT OR IGNORE INTO archive_generation (id) VALUES (1);
+    """)
+
+    for table in tables:
+        for event in ("INSERT", "UPDATE", "DELETE"):
+            conn.execute(f"""
+                CREATE TRIGGER IF NOT EXISTS {table}_generation_{event.lower()}
+                AFTER {event} ON {table} BEGIN
+                    UPDATE archive_generation
+                    SET generation = generation + 1,
+                        updated_at = CURRENT_TIMESTAMP
+                    WHERE id = 1;
+                END
+            """)
@@ -0,0 +1,55 @@
+"""Throughput benchmark for the summarizer backends.
+
+Summarizes archived articles from the portal database with each backend,
+in batches, and prints articles per second:
+
+    python bench_summarizers.py [--backends local,stub] [--limit 500] [--batch 100]
+
+Nothing is written back. Gemini is only run when named explicitly, since
+every article costs an API call.
+"""
+import argparse
+import sqlite3
+import time
+
+from summarize_backlog import DB_PATH
+from summarizers import BACKENDS, get_summarizer
+
+
+def load_articles(db_path, limit):
+    conn = sqlite3.connect(db_path)
+    rows = conn.execute("""
+        SELECT article_url, clean_content FROM articles
+        WHERE COALESCE(clean_content, '') != ''
+        ORDER BY article_id DESC LIMIT ?
+    """, (limit,)).fetchall()
+    conn.close()
+    return rows
+
+
+def bench(name, articles, batch_size):
+    summarizer = get_summarizer(name)
+    ok      = 0
+    started = time.perf_counter()
+    for i in range(0, len(articles), batch_size):
+        ok += sum(1 for r in summarizer.summarize_many(articles[i:i + batch_size]) if r)
+    elapsed = time.perf_counter() - started
+    print(f"{name:8} {len(articles):6} articles  {ok:6} summarized  "
+          f"{elapsed:8.2f}s  {len(articles) / elapsed:9.1f} articles/s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare summarizer backend throughput.")
+    parser.add_argument("--backends", default="local,stub")
+    parser.add_argument("--limit", type=int, default=500)
+    parser.add_argument("--batch", type=int, default=100)
+    parser.add_argument("--db", default=DB_PATH)
+    args = parser.parse_args()
+
+    articles = load_articles(args.db, args.limit)
+    if not articles:
+        raise SystemExit(f"no articles with clean_content in {args.db}")
+    for name in args.backends.split(","):
+        if name not in BACKENDS:
+            raise SystemExit(f"unknown backend {name!r} (choose from {', '.join(BACKENDS)})")
+        bench(name, articles, args.batch)
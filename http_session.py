@@ -0,0 +1,138 @@
+"""Shared, connection-pooled HTTP for the scrapers.
+
+get_session() is one requests.Session per process, so repeated requests to
+the same host (epaper sites, r.jina.ai, web.archive.org) reuse keep-alive
+connections instead of paying a TCP+TLS handshake each time. Failed
+connects and 429/5xx answers are retried with exponential backoff.
+
+Every request is timed per host; STATS.report() prints the counters at
+the end of a run. async_client() is the httpx equivalent for asyncio
+code, speaking HTTP/2 when the h2 package is installed.
+"""
+import threading
+import time
+from collections import defaultdict
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+RETRIES         = 3
+BACKOFF_FACTOR  = 1.0    # sleeps 1s, 2s, 4s ... between retries
+RETRY_STATUSES  = (429, 500, 502, 503, 504)
+POOL_HOSTS      = 16     # hosts with a pool kept open
+POOL_PER_HOST   = 8      # keep-alive connections per host
+DEFAULT_TIMEOUT = 30
+
+
+class HostStats:
+    """Thread-safe request, error and latency counters per host."""
+
+    def __init__(self):
+        self._lock  = threading.Lock()
+        self._hosts = defaultdict(lambda: {"requests": 0, "errors": 0, "seconds": 0.0, "max": 0.0})
+
+    def record(self, url, seconds, error=False):
+        host = urlparse(str(url)).hostname or str(url)
+        with self._lock:
+            h = self._hosts[host]
+            h["requests"] += 1
+            h["errors"]   += bool(error)
+            h["seconds"]  += seconds
+            h["max"]       = max(h["max"], seconds)
+
+    def snapshot(self):
+        with self._lock:
+            return {host: dict(h) for host, h in self._hosts.items()}
+
+    def report(self):
+        hosts = self.snapshot()
+        if not hosts:
+            return
+        print(f"\n[HTTP] {'host':40} {'reqs':>5} {'errs':>5} {'avg':>7} {'max':>7}")
+        for host, h in sorted(hosts.items(), key=lambda kv: -kv[1]["seconds"]):
+            avg = h["seconds"] / h["requests"]
+            print(f"[HTTP] {host[:40]:40} {h['requests']:5} {h['errors']:5} "
+                  f"{avg:6.2f}s {h['max']:6.2f}s")
+
+
+STATS = HostStats()
+
+
+class TimedAdapter(HTTPAdapter):
+    """HTTPAdapter that applies a default timeout and feeds STATS."""
+
+    def send(self, request, **kwargs):
+        kwargs["timeout"] = kwargs.get("timeout") or DEFAULT_TIMEOUT
+        start = time.monotonic()
+        try:
+            response = super().send(request, **kwargs)
+        except requests.RequestException:
+            STATS.record(request.url, time.monotonic() - start, error=True)
+            raise
+        STATS.record(request.url, time.monotonic() - start, error=response.status_code >= 400)
+        return response
+
+
+def retry_policy(retries=RETRIES, backoff=BACKOFF_FACTOR):
+    return Retry(
+        total=retries,
+        backoff_factor=backoff,
+        status_forcelist=RETRY_STATUSES,
+        allowed_methods=frozenset({"GET", "HEAD"}),
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+
+
+def new_session(retries=RETRIES, backoff=BACKOFF_FACTOR, per_host=POOL_PER_HOST):
+    session = requests.Session()
+    adapter = TimedAdapter(pool_connections=POOL_HOSTS, pool_maxsize=per_host,
+                           max_retries=retry_policy(retries, backoff))
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+_shared      = None
+_shared_lock = threading.Lock()
+
+
+def get_session():
+    """The process-wide session shared by every scraper and worker thread."""
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            _shared = new_session()
+        return _shared
+
+
+def async_client(retries=RETRIES, **client_kwargs):
+    """httpx.AsyncClient with pooled keep-alive, HTTP/2 if available, and STATS.
+
+    httpx only retries failed connects, not 429/5xx answers.
+    """
+    import httpx
+    try:
+        import h2  # noqa: F401
+        http2 = True
+    except ImportError:
+        http2 = False
+
+    class TimedTransport(httpx.AsyncHTTPTransport):
+        async def handle_async_request(self, request):
+            start = time.monotonic()
+            try:
+                response = await super().handle_async_request(request)
+            except httpx.HTTPError:
+                STATS.record(request.url, time.monotonic() - start, error=True)
+                raise
+            STATS.record(request.url, time.monotonic() - start, error=response.status_code >= 400)
+            return response
+
+    limits    = httpx.Limits(max_connections=POOL_HOSTS * POOL_PER_HOST,
+                             max_keepalive_connections=POOL_HOSTS * POOL_PER_HOST)
+    transport = TimedTransport(http2=http2, retries=retries, limits=limits)
+    client_kwargs.setdefault("timeout", DEFAULT_TIMEOUT)
+    return httpx.AsyncClient(transport=transport, **client_kwargs)
@@ -0,0 +1,180 @@
+"""Smaller, modern-format copies of every archive thumbnail.
+
+Listing pages show thumbnails a few hundred pixels wide, but the scrapers
+save 400x600 JPEG front pages and full-size PNG screenshots. For each
+thumbnail this writes AVIF (when Pillow can encode it), WebP and a JPEG
+fallback at up to three widths next to the original, named
+{stem}.{width}w.{ext}, and records them in the archive's own database so
+the app can offer them through srcset from the existing thumbnail routes.
+
+Backfill thumbnails that have no variants yet:
+
+    python image_variants.py papers|portals|socials [--force]
+"""
+import argparse
+import os
+import re
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from PIL import Image, features
+
+VARIANT_WIDTHS  = (320, 640, 960)
+WEBP_QUALITY    = 75
+AVIF_QUALITY    = 55
+JPEG_QUALITY    = 80
+VARIANT_WORKERS = os.cpu_count() or 2  # Pillow drops the GIL while resizing and encoding
+
+try:
+    HAS_AVIF = features.check_module("avif")
+except ValueError:  # Pillow older than 11.3 doesn't know the format
+    HAS_AVIF = False
+
+# best first; jpeg is always last as the <img> fallback
+FORMATS = (("avif",) if HAS_AVIF else ()) + ("webp", "jpeg")
+EXTENSIONS = {"avif": "avif", "webp": "webp", "jpeg": "jpg"}
+
+VARIANT_NAME_RE = re.compile(r"\.\d+w\.(avif|webp|jpg)$")
+
+
+def init_variants(conn):
+    conn.executescript("""
+        -- one row per derivative of a thumbnail, keyed by the original's file name
+        CREATE TABLE IF NOT EXISTS thumbnail_variants (
+            source   TEXT    NOT NULL,
+            format   TEXT    NOT NULL,
+            width    INTEGER NOT NULL,
+            filename TEXT    NOT NULL,
+            bytes    INTEGER NOT NULL,
+            PRIMARY KEY (source, format, width)
+        ) WITHOUT ROWID;
+    """)
+
+
+def variant_name(source_name, width, fmt):
+    stem = os.path.splitext(source_name)[0]
+    return f"{stem}.{width}w.{EXTENSIONS[fmt]}"
+
+
+def _save(img, path, fmt):
+    tmp_path = path + ".tmp"
+    if fmt == "avif":
+        img.save(tmp_path, "AVIF", quality=AVIF_QUALITY)
+    elif fmt == "webp":
+        img.save(tmp_path, "WEBP", quality=WEBP_QUALITY, method=4)
+    else:
+        img.save(tmp_path, "JPEG", quality=JPEG_QUALITY, optimize=True, progressive=True)
+    os.replace(tmp_path, path)
+
+
+def make_variants(src_path, force=False):
+    """Write the derivatives of src_path; returns [(format, width, filename, bytes)].
+
+    Widths above the original's are clamped to it, so nothing is upscaled.
+    A derivative newer than its original is kept as it is.
+    """
+    directory   = os.path.dirname(src_path)
+    source_name = os.path.basename(src_path)
+    src_mtime   = os.path.getmtime(src_path)
+
+    with Image.open(src_path) as img:
+        img.load()
+        if img.mode != "RGB":
+            # screenshots are opaque; flatten any alpha onto white
+            rgba = img.convert("RGBA")
+            img  = Image.new("RGB", rgba.size, "white")
+            img.paste(rgba, mask=rgba.getchannel("A"))
+        src_w, src_h = img.size
+
+        variants = []
+        for width in sorted({min(w, src_w) for w in VARIANT_WIDTHS}):
+            resized = None
+            for fmt in FORMATS:
+                filename = variant_name(source_name, width, fmt)
+                path     = os.path.join(directory, filename)
+                if force or not os.path.exists(path) or os.path.getmtime(path) < src_mtime:
+                    if resized is None:
+                        height  = max(1, round(src_h * width / src_w))
+                        resized = img if width == src_w else img.resize((width, height), Image.LANCZOS)
+                    _save(resized, path, fmt)
+                variants.append((fmt, width, filename, os.path.getsize(path)))
+    return variants
+
+
+def record_variants(conn, source_name, variants):
+    """Replace the recorded derivatives of one thumbnail and commit."""
+    conn.execute("DELETE FROM thumbnail_variants WHERE source = ?", (source_name,))
+    conn.executemany("""
+        INSERT INTO thumbnail_variants (source, format, width, filename, bytes)
+        VALUES (?, ?, ?, ?, ?)
+    """, [(source_name, *v) for v in variants])
+    conn.commit()
+
+
+def try_variants(src_path):
+    """make_variants for the scrapers: logs and returns [] instead of raising."""
+    try:
+        variants = make_variants(src_path)
+    except Exception as e:
+        print(f"Image variants failed for {os.path.basename(src_path)}: {e}")
+        return []
+    saved = os.path.getsize(src_path) - min(v[3] for v in variants) if variants else 0
+    print(f"Image variants: {len(variants)} for {os.path.basename(src_path)} "
+          f"(smallest saves {saved / 1024:.0f} KB)")
+    return variants
+
+
+def archives():
+    """(db_path, thumbnail dir) per archive, from the scrapers' own settings."""
+    import paper_scraper
+    import portal_scraper
+    import social_scraper
+    return {
+        "papers":  (paper_scraper.PAPER_DB_PATH, paper_scraper.PAPER_THUMB_DIR),
+        "portals": (portal_scraper.DB_PATH,      portal_scraper.THUMB_DIR),
+        "socials": (social_scraper.DB_PATH,      str(social_scraper.THUMB_FOLDER)),
+    }
+
+
+def backfill(archive, force=False):
+    """Make and record variants for every thumbnail of one archive, in parallel."""
+    db_path, thumb_dir = archives()[archive]
+    conn = sqlite3.connect(db_path)
+    init_variants(conn)
+    done = {row[0] for row in conn.execute("SELECT DISTINCT source FROM thumbnail_variants")}
+
+    names = sorted(name for name in os.listdir(thumb_dir)
+                   if name.lower().endswith((".png", ".jpg", ".jpeg"))
+                   and not VARIANT_NAME_RE.search(name)
+                   and (force or name not in done))
+    print(f"{len(names)} {archive} thumbnails to process")
+
+    started = time.monotonic()
+    before  = after = failed = 0
+    with ThreadPoolExecutor(VARIANT_WORKERS) as pool:
+        futures = {name: pool.submit(make_variants, os.path.join(thumb_dir, name), force)
+                   for name in names}
+        # all writes happen here, on the thread that owns conn
+        for name, future in futures.items():
+            try:
+                variants = future.result()
+            except Exception as e:
+                print(f"  {name}: failed ({e})")
+                failed += 1
+                continue
+            record_variants(conn, name, variants)
+            before += os.path.getsize(os.path.join(thumb_dir, name))
+            after  += min(v[3] for v in variants)
+    conn.close()
+
+    print(f"{len(names) - failed} thumbnails, {failed} failed in {time.monotonic() - started:.1f}s; "
+          f"smallest variants are {after / 1e6:.1f} MB against {before / 1e6:.1f} MB of originals")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Create srcset variants of archive thumbnails.")
+    parser.add_argument("archive", choices=("papers", "portals", "socials"))
+    parser.add_argument("--force", action="store_true", help="re-encode existing variants")
+    args = parser.parse_args()
+    backfill(args.archive, args.force)
@@ -1,21 +1,17 @@
-import requests
+import os
+import sys
 import sqlite3
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timedelta
+import threading
 import time
 
-conn = sqlite3.connect("wayback_nepal_news.db")
-cur = conn.cursor()
+# http_session is shared with the scrapers in the repository root
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from http_session import STATS as HTTP_STATS, get_session
 
-cur.execute("""
-CREATE TABLE IF NOT EXISTS snapshots (
-    id INTEGER PRIMARY KEY AUTOINCREMENT,
-    site TEXT,
-    date TEXT,
-    timestamp TEXT,
-    archive_url TEXT,
-    UNIQUE(site, date)
-)
-""")
+DB_PATH = "wayback_nepal_news.db"
 
 SITES = {
     "onlinekhabar": "onlinekhabar.com",
@@ -32,29 +28,85 @@ SITES = {
 
 BASE_URL = "http://web.archive.org/cdx/search/cdx"
 
-
-
-def get_snapshots(site, date):
-    """Get all snapshots for a site on a specific date"""
+START_YEAR   = 2003
+WORKERS      = 4     # CDX queries in flight, across all sites
+MIN_INTERVAL = 1.0   # seconds between query starts, across all sites
+CDX_TIMEOUT  = 120   # a year of captures is a much bigger answer than a day
+
+
+class RateLimiter:
+    """Spaces request starts at least min_interval apart across threads."""
+
+    def __init__(self, min_interval):
+        self.min_interval = min_interval
+        self._lock        = threading.Lock()
+        self._next        = 0.0
+
+    def wait(self):
+        with self._lock:
+            now   = time.monotonic()
+            start = max(now, self._next)
+            self._next = start + self.min_interval
+        if start > now:
+            time.sleep(start - now)
+
+
+limiter = RateLimiter(MIN_INTERVAL)
+
+
+def init_db(conn):
+    conn.executescript("""
+        CREATE TABLE IF NOT EXISTS snapshots (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            site TEXT,
+            date TEXT,
+            timestamp TEXT,
+            archive_url TEXT,
+            UNIQUE(site, date)
+        );
+
+        -- one row per (site, year) whose CDX listing has been fully saved
+        CREATE TABLE IF NOT EXISTS backfill_progress (
+            site      TEXT NOT NULL,
+            year      INTEGER NOT NULL,
+            days      INTEGER NOT NULL,
+            done_at   TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (site, year)
+        );
+    """)
+    conn.commit()
+
+
+def get_snapshots(site, year, start):
+    """Daily snapshots of a site from start (YYYY or YYYYMMDD) to the end of year, by day.
+
+    Returns {"YYYYMMDD": [[timestamp, original], ...]}, or None if the
+    query failed (so the year is not checkpointed and is retried next run).
+    """
     params = {
         "url": site,
-        "from": date,
-        "to": date,
+        "from": start,
+        "to": str(year),
         "output": "json",
         "fl": "timestamp,original",
         "filter": "statuscode:200",
-        "collapse": "timestamp:8"  
+        "collapse": "timestamp:8"
     }
 
+    limiter.wait()
     try:
-        res = requests.get(BASE_URL, params=params, timeout=15)
-        data = res.json()
-        if len(data) > 1:
-            return data[1:]  # skip header
+        res = get_session().get(BASE_URL, params=params, timeout=CDX_TIMEOUT)
+        res.raise_for_status()
+        data = res.json() if res.text.strip() else []
     except Exception as e:
-        print(f" Error fetching snapshots for {site} on {date}: {e}")
-    
-    return []
+        print(f" Error fetching snapshots for {site} in {year}: {e}")
+        return None
+
+    by_day = defaultdict(list)
+    for timestamp, original in data[1:]:  # skip header
+        by_day[timestamp[:8]].append([timestamp, original])
+    return by_day
+
 
 def pick_middle(snapshots):
     """Pick middle snapshot from list"""
@@ -62,47 +114,78 @@ def pick_middle(snapshots):
         return None
     return snapshots[len(snapshots)//2]
 
-def save_to_db(site, date, timestamp, original):
-    """Save snapshot to SQLite database"""
-    archive_url = f"https://web.archive.org/web/{timestamp}/{original}"
-    try:
-        cur.execute("""
-            INSERT OR IGNORE INTO snapshots (site, date, timestamp, archive_url)
-            VALUES (?, ?, ?, ?)
-        """, (site, date, timestamp, archive_url))
-        conn.commit()
-        print(f" Saved {archive_url}")
-    except Exception as e:
-        print(f"DB Error for {site} on {date}: {e}")
-
-
-start_date = datetime(2003, 1, 1)
-end_date = datetime.now()
-
-current = start_date
-
-while current <= end_date:
-    date_str = current.strftime("%Y%m%d")      
-    pretty_date = current.strftime("%Y-%m-%d") 
-
-    print(f"\nProcessing {pretty_date}")
-
-    for site_name, domain in SITES.items():
-        print(f"   {site_name}...", end="")
-        snapshots = get_snapshots(domain, date_str)
-
-        if not snapshots:
-            print("No snapshot")
-            continue
-
-        chosen = pick_middle(snapshots)
-        if chosen:
-            timestamp, original = chosen
-            save_to_db(site_name, pretty_date, timestamp, original)
-
-        time.sleep(1)  
-
-    current += timedelta(days=1)
 
-conn.close()
-print("\ncompleted")
+def save_year(conn, site, year, by_day):
+    """Save one snapshot per day that is still missing; returns how many were new."""
+    rows = []
+    for day, snapshots in by_day.items():
+        timestamp, original = pick_middle(snapshots)
+        pretty_date = f"{day[:4]}-{day[4:6]}-{day[6:]}"
+        rows.append((site, pretty_date, timestamp,
+                     f"https://web.archive.org/web/{timestamp}/{original}"))
+    before = conn.total_changes
+    conn.executemany("""
+        INSERT OR IGNORE INTO snapshots (site, date, timestamp, archive_url)
+        VALUES (?, ?, ?, ?)
+    """, rows)
+    return conn.total_changes - before
+
+
+def pending_years(conn, this_year):
+    """(site, year, start) for every year not yet checkpointed, sites interleaved.
+
+    The current year starts the day after the newest snapshot already saved,
+    so a daily run only asks for the days it is missing.
+    """
+    done   = set(conn.execute("SELECT site, year FROM backfill_progress"))
+    latest = dict(conn.execute("""
+        SELECT site, MAX(date) FROM snapshots WHERE date >= ? GROUP BY site
+    """, (f"{this_year}-01-01",)))
+    todo = []
+    for year in range(START_YEAR, this_year + 1):
+        for site_name in SITES:
+            if (site_name, year) in done:
+                continue
+            start = str(year)
+            if year == this_year and site_name in latest:
+                day   = datetime.strptime(latest[site_name], "%Y-%m-%d") + timedelta(days=1)
+                start = day.strftime("%Y%m%d")
+            todo.append((site_name, year, start))
+    return todo
+
+
+def backfill():
+    conn = sqlite3.connect(DB_PATH)
+    init_db(conn)
+
+    this_year = datetime.now().year
+    todo      = pending_years(conn, this_year)
+    print(f"{len(todo)} site-years to fetch ({len(SITES)} sites from {START_YEAR})")
+
+    started = time.monotonic()
+    saved   = 0
+    with ThreadPoolExecutor(WORKERS) as pool:
+        futures = {pool.submit(get_snapshots, SITES[site_name], year, start): (site_name, year)
+                   for site_name, year, start in todo}
+        # all writes happen here, on the thread that owns conn
+        for future in as_completed(futures):
+            site_name, year = futures[future]
+            by_day = future.result()
+            if by_day is None:
+                continue
+            new    = save_year(conn, site_name, year, by_day)
+            saved += new
+            if year < this_year:  # the current year is re-queried until it is over
+                conn.execute("""
+                    INSERT OR REPLACE INTO backfill_progress (site, year, days) VALUES (?, ?, ?)
+                """, (site_name, year, len(by_day)))
+            conn.commit()
+            print(f"   {site_name} {year}: {len(by_day)} days archived, {new} new")
+
+    conn.close()
+    HTTP_STATS.report()
+    print(f"\ncompleted: {saved} new snapshots in {time.monotonic() - started:.0f}s")
+
+
+if __name__ == "__main__":
+    backfill()
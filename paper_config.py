@@ -21,6 +21,10 @@ NEWSPAPERS = {
         "name": "Abhiyan Daily",
         "epaper_url": "https://abhiyandaily.com/epaper/",
         "download_js_selector": "a.download__epaper",
+        "ready": {
+            "load":     {"clickable": "a.download__epaper", "timeout": 30},
+            "download": {"download": ".pdf", "timeout": 60},
+        },
         "language": "np"
     },
     "karobardaily": {
@@ -28,6 +32,11 @@ NEWSPAPERS = {
         "main_url": "https://www.karobardaily.com/news/e-paper/",
         "today_paper_selector": "div.uk-width-5-5\\@s.uk-first-column",
         "download_button_selector": "span.fa-file.flipbook-icon-fa.flipbook-menu-btn.skin-color.fa.flipbook-color-light",
+        "ready": {
+            "load":     {"clickable": "div.uk-width-5-5\\@s.uk-first-column"},
+            "open":     {"clickable": "span.fa-file.flipbook-icon-fa.flipbook-menu-btn.skin-color.fa.flipbook-color-light", "timeout": 25},
+            "download": {"windows": 2},
+        },
         "language": "np"
     },
     "himalayatimes": {
@@ -35,6 +44,10 @@ NEWSPAPERS = {
         "epaper_url": "https://ehimalayatimes.com/epaper/",
         "more_button_selector": "div.df-ui-more",
         "download_link_selector": "a.df-ui-download",
+        "ready": {
+            "load": {"clickable": "div.df-ui-more"},
+            "open": {"present": "a.df-ui-download"},
+        },
         "language": "np"
     },
     "souryadaily": {
@@ -42,12 +55,20 @@ NEWSPAPERS = {
         "main_url": "https://www.souryaonline.com/paper",
         "today_paper_selector": "div.epaper_item a",
         "pdf_pattern": r'https://www\.souryaonline\.com/wp-content/uploads/.*?\.pdf',
+        "ready": {
+            "load": {"clickable": "div.epaper_item a"},
+            "open": {"windows": 2, "timeout": 15},
+            "pdf":  {"source": r'https://www\.souryaonline\.com/wp-content/uploads/.*?\.pdf', "timeout": 15},
+        },
         "language": "np"
     },
     "annapurnapost": {
         "name": "Annapurna Post",
         "epaper_url": "https://annapurnapost.com/epaper/",
         "download_links_selector": "button.view__flipbook.view__download a",
+        "ready": {
+            "load": {"present": "button.view__flipbook.view__download a"},
+        },
         "language": "np"
     },
     "rajdhani": {
@@ -55,6 +76,10 @@ NEWSPAPERS = {
         "epaper_url": "https://rajdhani.com.np/",
         "more_button_selector": ".df-ui-more",
         "download_button_selector": "a.df-ui-btn.df-ui-download.df-icon-download",
+        "ready": {
+            "load": {"clickable": ".df-ui-more"},
+            "open": {"present": "a.df-ui-btn.df-ui-download.df-icon-download"},
+        },
         "language": "np"
     },
     "apandainik": {
@@ -62,12 +87,20 @@ NEWSPAPERS = {
         "epaper_url": "https://epaper.apandainik.com/all-day-epaper/",
         "thumbnail_selector": ".pcp-post-thumb-wrapper",
         "download_button_selector": "a.pdfp_download.pdfp_download_btn.button",
+        "ready": {
+            "load": {"clickable": ".pcp-post-thumb-wrapper"},
+            "open": {"present": "a.pdfp_download.pdfp_download_btn.button"},
+        },
         "use_yesterday": True,
         "language": "np"
     },
     "samacharpata": {
         "name": "Samachar Patra",
         "epaper_url": "https://epaper.newsofnepal.com/",
+        "ready": {
+            "load": {"clickable": "a > div.box-shadow.epaper-img"},
+            "pdf":  {"response": r"\.pdf$", "timeout": 35},
+        },
         "language": "np"
     },
     "kantipur": {
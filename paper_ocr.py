@@ -0,0 +1,258 @@
+"""OCR for newspaper pages that have no text layer.
+
+Some e-papers (flipbook exports) are scans, so paper_text.py stores their
+pages empty. This works through those pages newest issue first: poppler
+rasterizes one page, tesseract reads it as Nepali and English, and the text
+goes into page_text, where the page_fts triggers index it. Every page is
+checkpointed in ocr_pages as soon as it is done, so the queue can be
+stopped at any time and picks up where it left off.
+
+It is meant to run in the background next to the daily scrape without
+competing with it: workers run at the lowest CPU priority, tesseract is
+held to one thread per worker, and no new pages are started while
+run_daily.py holds scrape.lock.
+
+    python paper_ocr.py [--workers 2] [--max-pages 500] [--max-minutes 60]
+"""
+import argparse
+import os
+import sqlite3
+import subprocess
+import tempfile
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from pdf2image import convert_from_path
+
+from thumbnails import POPPLER_PATH
+
+OCR_WORKERS    = max(1, (os.cpu_count() or 2) // 2)
+OCR_LANGS      = "nep+eng"
+OCR_DPI        = 300
+OCR_TIMEOUT    = 300
+MAX_ATTEMPTS   = 3
+REPORT_EVERY   = 60    # seconds between progress lines
+PAUSE_POLL     = 30    # seconds between scrape.lock checks while paused
+TESSERACT      = os.environ.get("ARCHIVE_TESSERACT", "tesseract")
+SCRAPE_LOCK    = os.path.join(os.path.dirname(os.path.abspath(__file__)), "scrape.lock")
+
+PENDING_SQL = """
+    FROM page_text pt
+    JOIN text_extraction t ON t.issue_id = pt.issue_id
+    JOIN issues i          ON i.id       = pt.issue_id
+    JOIN files f           ON f.issue_id = pt.issue_id
+    LEFT JOIN ocr_pages o  ON o.issue_id = pt.issue_id AND o.page = pt.page
+                          AND o.sha256 IS t.sha256
+    WHERE pt.text = ''
+      AND (o.issue_id IS NULL OR (o.status = 'failed' AND o.attempts < ?))
+"""
+
+
+def init_ocr(conn):
+    conn.executescript("""
+        -- per-page checkpoint; sha256 ties it to the PDF that was read
+        CREATE TABLE IF NOT EXISTS ocr_pages (
+            issue_id INTEGER NOT NULL REFERENCES issues(id),
+            page     INTEGER NOT NULL,
+            sha256   TEXT,
+            status   TEXT    NOT NULL CHECK (status IN ('done', 'empty', 'failed')),
+            chars    INTEGER NOT NULL DEFAULT 0,
+            seconds  REAL,
+            attempts INTEGER NOT NULL DEFAULT 1,
+            done_at  TEXT    NOT NULL DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (issue_id, page)
+        );
+
+        -- one row per queue run, for throughput and backlog over time
+        CREATE TABLE IF NOT EXISTS ocr_runs (
+            id             INTEGER PRIMARY KEY AUTOINCREMENT,
+            started_at     TEXT NOT NULL,
+            seconds        REAL NOT NULL,
+            pages          INTEGER NOT NULL,
+            failed         INTEGER NOT NULL,
+            pages_per_sec  REAL NOT NULL,
+            backlog_before INTEGER NOT NULL,
+            backlog_after  INTEGER NOT NULL
+        );
+
+        CREATE INDEX IF NOT EXISTS idx_page_text_empty ON page_text (issue_id, page) WHERE text = '';
+    """)
+
+
+def backlog_size(conn):
+    return conn.execute("SELECT COUNT(*) " + PENDING_SQL, (MAX_ATTEMPTS,)).fetchone()[0]
+
+
+def next_pages(conn, limit, skip):
+    """(issue_id, page, pdf_path, sha256) to read next, newest issue first."""
+    rows = conn.execute(f"""
+        SELECT pt.issue_id, pt.page, f.pdf_path, t.sha256 {PENDING_SQL}
+        ORDER BY i.issue_date DESC, pt.page
+        LIMIT ?
+    """, (MAX_ATTEMPTS, limit + len(skip))).fetchall()
+    return [r for r in rows if (r[0], r[1]) not in skip][:limit]
+
+
+def scrape_active():
+    """True while a scrape run holds scrape.lock (a lock left by a dead run is ignored)."""
+    try:
+        with open(SCRAPE_LOCK) as f:
+            pid = int(f.read().strip() or 0)
+    except (OSError, ValueError):
+        return False
+    if not pid:
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except OSError:
+        pass  # exists, owned by someone else
+    return True
+
+
+def _low_priority():
+    """Worker initializer: yield the CPU to everything else on the machine."""
+    if hasattr(os, "nice"):
+        os.nice(19)
+
+
+def ocr_page(pdf_path, page):
+    """Runs in a worker process; returns (text, seconds)."""
+    started = time.monotonic()
+    images  = convert_from_path(pdf_path, dpi=OCR_DPI, first_page=page, last_page=page,
+                                grayscale=True, poppler_path=POPPLER_PATH)
+    if not images:
+        raise RuntimeError("poppler returned no page")
+
+    with tempfile.TemporaryDirectory(prefix="ocr_") as tmp:
+        image_path = os.path.join(tmp, "page.png")
+        images[0].save(image_path)
+        result = subprocess.run(
+            [TESSERACT, image_path, "stdout", "-l", OCR_LANGS, "--psm", "3"],
+            capture_output=True, timeout=OCR_TIMEOUT,
+            env={**os.environ, "OMP_THREAD_LIMIT": "1"},  # the pool sets the parallelism
+        )
+    if result.returncode != 0:
+        raise RuntimeError(f"tesseract exited {result.returncode}: "
+                           f"{result.stderr.decode(errors='replace').strip()[:200]}")
+    text = " ".join(result.stdout.decode("utf-8", errors="replace").split())
+    return text, time.monotonic() - started
+
+
+def save_page(conn, issue_id, page, sha256, text=None, seconds=None):
+    """Store one page's OCR text (None for a failure) and checkpoint it."""
+    if text:
+        conn.execute("UPDATE page_text SET text = ? WHERE issue_id = ? AND page = ?",
+                     (text, issue_id, page))
+    status = "failed" if text is None else ("done" if text else "empty")
+    conn.execute("""
+        INSERT INTO ocr_pages (issue_id, page, sha256, status, chars, seconds)
+        VALUES (?, ?, ?, ?, ?, ?)
+        ON CONFLICT(issue_id, page) DO UPDATE SET
+            sha256   = excluded.sha256,
+            status   = excluded.status,
+            chars    = excluded.chars,
+            seconds  = excluded.seconds,
+            attempts = CASE WHEN ocr_pages.sha256 IS excluded.sha256
+                            THEN ocr_pages.attempts + 1 ELSE 1 END,
+            done_at  = CURRENT_TIMESTAMP
+    """, (issue_id, page, sha256, status, len(text or ""), seconds))
+    conn.commit()
+
+
+def run_queue(workers=OCR_WORKERS, max_pages=None, max_minutes=None):
+    from paper_scraper import PAPER_DB_PATH, PAPER_PDF_DIR, init_db
+
+    init_db()
+    conn = sqlite3.connect(PAPER_DB_PATH)
+    init_ocr(conn)
+    conn.commit()
+
+    backlog_before = backlog_size(conn)
+    print(f"[OCR] backlog: {backlog_before} pages, {workers} workers")
+
+    started_at = time.strftime("%Y-%m-%d %H:%M:%S")
+    started    = time.monotonic()
+    deadline   = started + max_minutes * 60 if max_minutes else None
+    reported   = started
+    submitted  = done = failed = 0
+    in_flight  = {}  # future -> (issue_id, page, sha256)
+    exhausted  = paused = False
+
+    pool = ProcessPoolExecutor(workers, initializer=_low_priority)
+    try:
+        while True:
+            stopping = (exhausted
+                        or (max_pages and submitted >= max_pages)
+                        or (deadline and time.monotonic() >= deadline))
+            active = not stopping and scrape_active()
+            if active and not in_flight:
+                if not paused:
+                    print("[OCR] scrape running, paused")
+                    paused = True
+                time.sleep(PAUSE_POLL)
+                continue
+            paused = False
+            if not stopping and not active and len(in_flight) < workers:
+                want = workers * 2 - len(in_flight)
+                if max_pages:
+                    want = min(want, max_pages - submitted)
+                skip  = {(i, p) for i, p, _ in in_flight.values()}
+                batch = next_pages(conn, want, skip)
+                exhausted = not batch and not in_flight
+                for issue_id, page, pdf_path, sha256 in batch:
+                    pdf_path = os.path.join(PAPER_PDF_DIR, os.path.basename(pdf_path))
+                    future   = pool.submit(ocr_page, pdf_path, page)
+                    in_flight[future] = (issue_id, page, sha256)
+                    submitted += 1
+
+            if not in_flight:
+                if stopping or exhausted:
+                    break
+                continue
+
+            finished, _ = wait(in_flight, timeout=PAUSE_POLL, return_when=FIRST_COMPLETED)
+            # all writes happen here, on the thread that owns conn
+            for future in finished:
+                issue_id, page, sha256 = in_flight.pop(future)
+                try:
+                    text, seconds = future.result()
+                except Exception as e:
+                    print(f"[OCR] issue {issue_id} page {page}: failed ({e})")
+                    save_page(conn, issue_id, page, sha256)
+                    failed += 1
+                    continue
+                save_page(conn, issue_id, page, sha256, text, seconds)
+                done += 1
+
+            now = time.monotonic()
+            if now - reported >= REPORT_EVERY:
+                reported = now
+                print(f"[OCR] {done} pages, {failed} failed, "
+                      f"{done / (now - started):.2f} pages/s, backlog {backlog_size(conn)}")
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+    elapsed       = time.monotonic() - started
+    rate          = done / elapsed if elapsed else 0.0
+    backlog_after = backlog_size(conn)
+    conn.execute("""
+        INSERT INTO ocr_runs (started_at, seconds, pages, failed, pages_per_sec,
+                              backlog_before, backlog_after)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+    """, (started_at, elapsed, done, failed, rate, backlog_before, backlog_after))
+    conn.commit()
+    conn.close()
+    print(f"[OCR] {done} pages, {failed} failed in {elapsed:.0f}s "
+          f"({rate:.2f} pages/s); backlog {backlog_before} -> {backlog_after}")
+    return done
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="OCR newspaper pages without a text layer.")
+    parser.add_argument("--workers", type=int, default=OCR_WORKERS)
+    parser.add_argument("--max-pages", type=int, help="stop after this many pages")
+    parser.add_argument("--max-minutes", type=float, help="stop starting pages after this long")
+    args = parser.parse_args()
+    run_queue(args.workers, args.max_pages, args.max_minutes)
@@ -1,15 +1,24 @@
 import os
-import requests
+import shutil
+import subprocess
 import urllib3
-import json
-import re
 from bs4 import BeautifulSoup
 from datetime import datetime, timedelta
 import sqlite3
 from paper_config import NEWSPAPERS
+from archive_calendar import refresh_days
+from archive_generation import init_generation
+from scrape_pipeline import HostLimiter, StageTimer
+from pdf_fetch import fetch_pdf, verify_pdf
+from thumbnails import RENDER_WORKERS, file_sha256, make_thumbnail, shutdown_pool
+from image_variants import init_variants, record_variants, try_variants
+from paper_text import TEXT_WORKERS, extract_issue, init_page_text, save_pages
+from http_session import STATS as HTTP_STATS, get_session
+from readiness import wait_ready
 import time
+import threading
 import pytz
-from pdf2image import convert_from_path
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 
 from selenium import webdriver
 from selenium.webdriver.chrome.service import Service
@@ -23,6 +32,22 @@ PAPER_BASE_DIR  = os.path.dirname(os.path.abspath(__file__))
 PAPER_PDF_DIR   = os.path.join(PAPER_BASE_DIR, "paper_archive", "pdfs")
 PAPER_THUMB_DIR = os.path.join(PAPER_BASE_DIR, "paper_archive", "thumbnails")
 PAPER_DB_PATH   = os.path.join(PAPER_BASE_DIR, "paper_archive", "database.db")
+PAPER_ORIG_DIR  = os.path.join(PAPER_BASE_DIR, "paper_archive", "originals")
+
+# Post-download PDF stage: linearize ("fast web view") and losslessly
+# recompress with qpdf when it is installed. Originals are only kept on request.
+OPTIMIZE_PDFS       = os.environ.get("ARCHIVE_OPTIMIZE_PDFS", "1") != "0"
+KEEP_ORIGINAL_PDFS  = os.environ.get("ARCHIVE_KEEP_ORIGINAL_PDFS", "0") == "1"
+QPDF_TIMEOUT        = 300
+
+# scrape_today runs discovery, download, thumbnail/optimize and text
+# extraction stages in separate pools; all SQLite writes stay on the main thread.
+DISCOVERY_WORKERS   = 4
+DOWNLOAD_WORKERS    = 4
+THUMBNAIL_WORKERS   = RENDER_WORKERS  # threads waiting on qpdf and the render processes
+HOST_MIN_INTERVAL   = 3.0
+
+host_limiter = HostLimiter(per_host=1, min_interval=HOST_MIN_INTERVAL)
 
 os.makedirs(PAPER_PDF_DIR,   exist_ok=True)
 os.makedirs(PAPER_THUMB_DIR, exist_ok=True)
@@ -50,13 +75,36 @@ def init_db():
             id             INTEGER PRIMARY KEY AUTOINCREMENT,
             issue_id       INTEGER NOT NULL REFERENCES issues(id),
             pdf_path       TEXT    NOT NULL,
-            thumbnail_path TEXT
+            thumbnail_path TEXT,
+            original_size  INTEGER,
+            optimized_size INTEGER,
+            sha256         TEXT,  -- the download, used to spot re-posted issues
+            stored_sha256  TEXT   -- the file on disk, after optimize_pdf
         );
+
+        CREATE INDEX IF NOT EXISTS idx_issues_date ON issues (issue_date);
+        CREATE INDEX IF NOT EXISTS idx_files_issue ON files (issue_id);
     """)
+    add_missing_columns(c, "files", {"original_size": "INTEGER", "optimized_size": "INTEGER",
+                                     "sha256": "TEXT", "stored_sha256": "TEXT"})
+    c.execute("CREATE INDEX IF NOT EXISTS idx_files_sha256 ON files (sha256)")
+    init_variants(conn)
+    init_page_text(conn)
+    # page text only feeds /search, which isn't cached; OCR must not invalidate /papers
+    for event in ("insert", "update", "delete"):
+        c.execute(f"DROP TRIGGER IF EXISTS page_text_generation_{event}")
+    init_generation(conn, ("newspapers", "issues", "files", "thumbnail_variants"))
     conn.commit()
     conn.close()
 
 
+def add_missing_columns(c, table, columns):
+    existing = {row[1] for row in c.execute(f"PRAGMA table_info({table})")}
+    for name, decl in columns.items():
+        if name not in existing:
+            c.execute(f"ALTER TABLE {table} ADD COLUMN {name} {decl}")
+
+
 def upsert_newspaper(conn, key, name, language):
     c = conn.cursor()
     c.execute("""
@@ -81,21 +129,100 @@ def upsert_issue(conn, newspaper_id, issue_date):
     return c.fetchone()[0]
 
 
-def upsert_file(conn, issue_id, pdf_path, thumbnail_path):
+def upsert_file(conn, issue_id, pdf_path, thumbnail_path, sizes=(None, None), sha256=None,
+                stored_sha256=None):
     c = conn.cursor()
     c.execute("DELETE FROM files WHERE issue_id = ?", (issue_id,))
     c.execute("""
-        INSERT INTO files (issue_id, pdf_path, thumbnail_path)
-        VALUES (?, ?, ?)
-    """, (issue_id, pdf_path, thumbnail_path))
+        INSERT INTO files (issue_id, pdf_path, thumbnail_path, original_size, optimized_size,
+                           sha256, stored_sha256)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+    """, (issue_id, pdf_path, thumbnail_path, *sizes, sha256, stored_sha256 or sha256))
     conn.commit()
 
 
-def save_paper(conn, key, name, language, issue_date, pdf_path, thumbnail_path):
+def duplicate_issue_date(conn, key, issue_date, sha256):
+    """Date of another issue of this paper whose download had the same hash, if any."""
+    row = conn.execute("""
+        SELECT i.issue_date
+        FROM files f
+        JOIN issues i     ON i.id = f.issue_id
+        JOIN newspapers n ON n.id = i.newspaper_id
+        WHERE f.sha256 = ? AND n.key = ? AND i.issue_date != ?
+        LIMIT 1
+    """, (sha256, key, issue_date)).fetchone()
+    return row[0] if row else None
+
+
+def is_duplicate(conn, key, name, issue_date, sha256):
+    earlier = duplicate_issue_date(conn, key, issue_date, sha256) if sha256 else None
+    if earlier:
+        print(f"[DB] Skipped {name} for {issue_date}: same PDF as the {earlier} issue")
+    return bool(earlier)
+
+
+def discard_files(pdf_path, thumb_path=None, variants=()):
+    """Remove what was written for an issue that is not saved after all."""
+    paths = [pdf_path, thumb_path]
+    if thumb_path:
+        paths += [os.path.join(os.path.dirname(thumb_path), v[2]) for v in variants]
+    for path in paths:
+        if path and os.path.exists(path):
+            os.remove(path)
+
+
+def save_paper(conn, key, name, language, issue_date, pdf_path, thumbnail_path,
+               sizes=(None, None), sha256=None, stored_sha256=None):
+    """Returns the issue id, or None if the PDF repeats an earlier issue."""
+    if is_duplicate(conn, key, name, issue_date, sha256):
+        return None
     newspaper_id = upsert_newspaper(conn, key, name, language)
     issue_id     = upsert_issue(conn, newspaper_id, issue_date)
-    upsert_file(conn, issue_id, pdf_path, thumbnail_path)
+    upsert_file(conn, issue_id, pdf_path, thumbnail_path, sizes, sha256, stored_sha256)
     print(f"[DB] Saved {name} for {issue_date}")
+    return issue_id
+
+
+def optimize_pdf(pdf_path):
+    """Linearize and recompress pdf_path in place; returns (original_size, optimized_size).
+
+    optimized_size is None when the stage is off, qpdf is missing or it fails,
+    in which case the downloaded file is left untouched.
+    """
+    original_size = os.path.getsize(pdf_path)
+    if not OPTIMIZE_PDFS or shutil.which("qpdf") is None:
+        return original_size, None
+
+    tmp_path = pdf_path + ".opt"
+    cmd = [
+        "qpdf", "--linearize",
+        "--object-streams=generate",
+        "--compress-streams=y", "--recompress-flate", "--compression-level=9",
+        pdf_path, tmp_path,
+    ]
+    try:
+        result = subprocess.run(cmd, capture_output=True, text=True, timeout=QPDF_TIMEOUT)
+    except Exception as e:
+        result = None
+        print(f"qpdf failed for {os.path.basename(pdf_path)}: {e}")
+
+    # exit status 3 means qpdf repaired something but still wrote the file
+    if result is None or result.returncode not in (0, 3) or not os.path.exists(tmp_path):
+        if result is not None:
+            print(f"qpdf failed for {os.path.basename(pdf_path)}: {result.stderr.strip()[:200]}")
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        return original_size, None
+
+    if KEEP_ORIGINAL_PDFS:
+        os.makedirs(PAPER_ORIG_DIR, exist_ok=True)
+        shutil.copy2(pdf_path, os.path.join(PAPER_ORIG_DIR, os.path.basename(pdf_path)))
+    os.replace(tmp_path, pdf_path)
+
+    optimized_size = os.path.getsize(pdf_path)
+    print(f"Optimized PDF: {os.path.basename(pdf_path)} "
+          f"{original_size / 1e6:.1f} MB -> {optimized_size / 1e6:.1f} MB")
+    return original_size, optimized_size
 
 
 def download_pdf(input_url, date, newspaper):
@@ -108,7 +235,7 @@ def download_pdf(input_url, date, newspaper):
             print(f"Extracted direct URL for {newspaper}: {direct_pdf_url}")
         except Exception:
             print(f"Failed to extract ?file= for {newspaper}")
-            return None, None
+            return None
     else:
         print(f"Using direct PDF URL for {newspaper}: {direct_pdf_url}")
 
@@ -130,70 +257,296 @@ def download_pdf(input_url, date, newspaper):
 
         }
 
-    try:
-        response = requests.get(direct_pdf_url, headers=headers, cookies=cookies,
-                                verify=False, timeout=60, stream=True)
-        response.raise_for_status()
-        content_type = response.headers.get('Content-Type', '').lower()
-        if 'pdf' not in content_type:
-            print(f"Non-PDF response for {newspaper} (Content-Type: {content_type})")
-            return None, None
-    except Exception as e:
-        print(f"Failed to download PDF for {newspaper}: {e}")
-        return None, None
-
     pdf_path = os.path.join(PAPER_PDF_DIR, f"{date}_{newspaper}.pdf")
-    try:
-        with open(pdf_path, "wb") as f:
-            for chunk in response.iter_content(chunk_size=1024):
-                if chunk:
-                    f.write(chunk)
-        print(f"Downloaded PDF: {pdf_path}")
-    except Exception as e:
-        print(f"Failed to save PDF for {newspaper}: {e}")
-        return None, None
+    with host_limiter.slot(direct_pdf_url):
+        verified = fetch_pdf(direct_pdf_url, pdf_path, newspaper, headers=headers,
+                             cookies=cookies, verify=False, timeout=60)
+    if verified is None:
+        return None
+    sha256, size = verified
+    print(f"Downloaded PDF: {pdf_path} ({size / 1e6:.1f} MB)")
+    return pdf_path, sha256
+
+
+def finish_pdf(pdf_path, date, newspaper, sha256=None):
+    """Thumbnail stage: render page one and its srcset variants, then linearize the PDF.
+
+    PDFs the browser saved itself arrive without a hash and are verified here.
+    Returns (thumb_path, sizes, download sha256, stored sha256, variants).
+    """
+    if sha256 is None:
+        verified = verify_pdf(pdf_path)
+        if verified is None:
+            return None
+        sha256 = verified[0]
+    thumb_path = make_thumbnail(pdf_path, os.path.join(PAPER_THUMB_DIR, f"{date}_{newspaper}.jpg"),
+                                newspaper, sha256)
+    variants   = try_variants(thumb_path) if thumb_path else []
+    sizes      = optimize_pdf(pdf_path)
+    stored     = file_sha256(pdf_path) if sizes[1] is not None else sha256
+    return thumb_path, sizes, sha256, stored, variants
+
+
+# ── Selenium drivers ──────────────────────────────────────────────────────────
+# WebDriver sessions are not thread-safe, so each discovery worker lazily
+# starts its own headless Chrome and reuses it for every paper it handles.
+
+_local          = threading.local()
+_drivers        = []
+_drivers_lock   = threading.Lock()
+_chromedriver   = None
+
+
+def chrome_service():
+    global _chromedriver
+    with _drivers_lock:
+        if _chromedriver is None:
+            _chromedriver = ChromeDriverManager().install()
+    return Service(_chromedriver)
+
+
+def headless_options():
+    chrome_options = Options()
+    chrome_options.add_argument("--headless")
+    chrome_options.add_argument("--no-sandbox")
+    chrome_options.add_argument("--disable-dev-shm-usage")
+    chrome_options.add_argument("--disable-gpu")
+    chrome_options.add_argument("--window-size=1920,1080")
+    return chrome_options
 
-    thumb_path = _make_thumbnail(pdf_path, date, newspaper)
-    return pdf_path, thumb_path
 
+def thread_driver():
+    driver = getattr(_local, "driver", None)
+    if driver is None:
+        driver = webdriver.Chrome(service=chrome_service(), options=headless_options())
+        _local.driver = driver
+        with _drivers_lock:
+            _drivers.append(driver)
+    return driver
 
-def _make_thumbnail(pdf_path, date, newspaper):
-    thumb_path = os.path.join(PAPER_THUMB_DIR, f"{date}_{newspaper}.jpg")
-    poppler_path = os.path.join(
-        PAPER_BASE_DIR, "Release-25.12.0-0",
-        "poppler-25.12.0", "Library", "bin"
-    )
-    try:
-        images = convert_from_path(pdf_path, dpi=150, first_page=1, last_page=1,
-                                   poppler_path=poppler_path)
-        if images:
-            img = images[0]
-            img.thumbnail((400, 600))
-            img.save(thumb_path, "JPEG", quality=85)
-            print(f"Thumbnail created: {thumb_path}")
-            return thumb_path
-    except Exception as e:
-        print(f"Thumbnail generation failed for {newspaper}: {e}")
-    return None
 
+def quit_drivers():
+    with _drivers_lock:
+        drivers = list(_drivers)
+        _drivers.clear()
+    for driver in drivers:
+        try:
+            driver.quit()
+        except Exception:
+            pass
+
+
+def visit(driver, url):
+    with host_limiter.slot(url):
+        driver.get(url)
+
+
+def discover_pdf(key, info, today, save_date_str):
+    """Discovery stage: returns (pdf_url, None), (None, local_pdf_path) or None."""
+    tz       = pytz.timezone('Asia/Kathmandu')
+    pdf_url  = None
+    name     = info["name"]
+    ready    = info.get("ready", {})
+
+    if key in ["kantipur", "kathmandupost"]:
+        y, m, d = today.strftime("%Y"), today.strftime("%m"), today.strftime("%d")
+        pdf_url = info["download_url_pattern"].format(y=y, m=m, d=d)
+        print(f"Direct download URL for {name}: {pdf_url}")
+
+    elif key == "nagarik":
+        base_date  = tz.localize(datetime.strptime(info["base_date"], "%Y-%m-%d"))
+        days_offset = (today - base_date).days
+        epaper_id  = info["base_id"] + days_offset
+        pdf_url    = info["epaper_base_url"] + str(epaper_id)
+        print(f"Calculated Nagarik epaper ID: {epaper_id} → {pdf_url}")
+
+    elif key == "abhiyandaily":
+        download_temp_dir = os.path.join(PAPER_BASE_DIR, "temp_downloads")
+        os.makedirs(download_temp_dir, exist_ok=True)
+        for old_file in os.listdir(download_temp_dir):
+            old_path = os.path.join(download_temp_dir, old_file)
+            if os.path.isfile(old_path):
+                os.remove(old_path)
+
+        chrome_opts_ab = Options()
+        chrome_opts_ab.add_argument("--no-sandbox")
+        chrome_opts_ab.add_argument("--disable-dev-shm-usage")
+        chrome_opts_ab.add_argument("--disable-gpu")
+        prefs = {
+            "download.default_directory":      download_temp_dir,
+            "download.prompt_for_download":    False,
+            "download.directory_upgrade":      True,
+            "safebrowsing.enabled":            True,
+            "plugins.always_open_pdf_externally": True,
+        }
+        chrome_opts_ab.add_experimental_option("prefs", prefs)
+        driver_ab = webdriver.Chrome(service=chrome_service(), options=chrome_opts_ab)
+        try:
+            visit(driver_ab, info["epaper_url"])
+            wait_ready(driver_ab, ready["load"], f"{key} load")
+            driver_ab.execute_script(f"""
+                let btn = document.querySelector('{info["download_js_selector"]}');
+                if (btn) btn.click();
+            """)
+            print("Triggered Arthik Abhiyan download")
+
+            src_path = wait_ready(driver_ab, ready["download"], f"{key} download",
+                                  download_dir=download_temp_dir)
+            if not src_path:
+                print("Arthik Abhiyan: Download timed out")
+                return None
+            dest_path = os.path.join(PAPER_PDF_DIR, f"{save_date_str}_abhiyandaily.pdf")
+            if os.path.exists(dest_path):
+                os.remove(dest_path)
+            os.rename(src_path, dest_path)
+            print(f"Saved Arthik Abhiyan PDF: {dest_path}")
+            return None, dest_path
+        finally:
+            driver_ab.quit()
+
+    elif key == "karobardaily":
+        driver = thread_driver()
+        visit(driver, info["main_url"])
+        try:
+            wait_ready(driver, ready["load"], f"{key} load")
+            driver.find_element(By.CSS_SELECTOR, info["today_paper_selector"]).click()
+            wait_ready(driver, ready["open"], f"{key} open")
+            driver.find_element(By.CSS_SELECTOR, info["download_button_selector"]).click()
+            wait_ready(driver, ready["download"], f"{key} download")
+            driver.switch_to.window(driver.window_handles[-1])
+            pdf_url = driver.current_url
+            print(f"Karobar Daily PDF URL: {pdf_url}")
+        except Exception as e:
+            print(f"Selenium error for Karobar Daily: {e}")
+        finally:
+            # the flipbook opens a new tab; close it so the next paper starts clean
+            while len(driver.window_handles) > 1:
+                driver.switch_to.window(driver.window_handles[-1])
+                driver.close()
+            driver.switch_to.window(driver.window_handles[0])
+
+    elif key == "souryadaily":
+        driver = thread_driver()
+        visit(driver, info["main_url"])
+        try:
+            wait_ready(driver, ready["load"], f"{key} load")
+            driver.find_element(By.CSS_SELECTOR, info["today_paper_selector"]).click()
+            wait_ready(driver, ready["open"], f"{key} open")
+            driver.switch_to.window(driver.window_handles[-1])
+            pdf_url = wait_ready(driver, ready["pdf"], f"{key} pdf")
+            if pdf_url:
+                print(f"Sourya Daily PDF: {pdf_url}")
+        except Exception as e:
+            print(f"Selenium error for Sourya Daily: {e}")
+        finally:
+            while len(driver.window_handles) > 1:
+                driver.switch_to.window(driver.window_handles[-1])
+                driver.close()
+            driver.switch_to.window(driver.window_handles[0])
+
+    elif key == "nayapatrika":
+        page_url = info["date_url_pattern"].format(
+            y=today.strftime("%Y"), m=today.strftime("%m"), d=today.strftime("%d"))
+        cookies_local = {'PHPSESSID': '25dc5220dbcc5c59ac596a8b3b2ebab9', 'STACKSCALING': 'web99j'}
+        headers_local = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:147.0) Gecko/20100101 Firefox/147.0'}
+        with host_limiter.slot(page_url):
+            r = get_session().get(page_url, headers=headers_local, cookies=cookies_local, verify=False, timeout=30)
+        if r.status_code == 200:
+            soup     = BeautifulSoup(r.text, 'lxml')
+            link_tag = soup.select_one(info["pdf_selector"])
+            if link_tag and link_tag.get('href'):
+                pdf_url = link_tag['href']
+                if not pdf_url.startswith('http'):
+                    pdf_url = "https://epaper.nayapatrikadaily.com/" + pdf_url.lstrip('/')
+
+    elif key == "himalayatimes":
+        driver = thread_driver()
+        visit(driver, info["epaper_url"])
+        try:
+            wait_ready(driver, ready["load"], f"{key} load")
+            driver.find_element(By.CSS_SELECTOR, info["more_button_selector"]).click()
+            wait_ready(driver, ready["open"], f"{key} open")
+            pdf_link = driver.find_element(By.CSS_SELECTOR, info["download_link_selector"])
+            pdf_url  = pdf_link.get_attribute("href")
+        except Exception as e:
+            print(f"Selenium error for Himalaya Times: {e}")
+
+    elif key == "annapurnapost":
+        driver = thread_driver()
+        visit(driver, info["epaper_url"])
+        try:
+            wait_ready(driver, ready["load"], f"{key} load")
+            for a_tag in driver.find_elements(By.CSS_SELECTOR, info["download_links_selector"]):
+                href = a_tag.get_attribute("href")
+                if href:
+                    pdf_url = href
+                    print(f"Annapurna Post download gateway: {pdf_url}")
+                    break
+        except Exception as e:
+            print(f"Selenium error for Annapurna Post: {e}")
+
+    elif key == "rajdhani":
+        driver = thread_driver()
+        visit(driver, info["epaper_url"])
+        try:
+            wait_ready(driver, ready["load"], f"{key} load")
+            driver.find_element(By.CSS_SELECTOR, info["more_button_selector"]).click()
+            wait_ready(driver, ready["open"], f"{key} open")
+            dl_btn  = driver.find_element(By.CSS_SELECTOR, info["download_button_selector"])
+            pdf_url = dl_btn.get_attribute("href")
+            print(f"Rajdhani Daily PDF: {pdf_url}")
+        except Exception as e:
+            print(f"Selenium error for Rajdhani Daily: {e}")
+
+    elif key == "apandainik":
+        driver = thread_driver()
+        visit(driver, info["epaper_url"])
+        try:
+            thumb = wait_ready(driver, ready["load"], f"{key} load")
+            driver.execute_script("arguments[0].scrollIntoView({block:'center'});", thumb)
+            thumb.click()
+            wait_ready(driver, ready["open"], f"{key} open")
+            dl_btn  = driver.find_element(By.CSS_SELECTOR, info["download_button_selector"])
+            pdf_url = dl_btn.get_attribute("href")
+            print(f"Apan Dainik PDF ({save_date_str}): {pdf_url}")
+        except Exception as e:
+            print(f"Selenium error for Apan Dainik: {e}")
+
+    elif key == "samacharpata":
+        chrome_opts_vis = Options()
+        chrome_opts_vis.add_argument("--no-sandbox")
+        chrome_opts_vis.add_argument("--disable-dev-shm-usage")
+        chrome_opts_vis.add_argument("--disable-gpu")
+        chrome_opts_vis.add_argument("--window-size=1920,1080")
+        chrome_opts_vis.set_capability("goog:loggingPrefs", {"performance": "ALL"})
+        drv = webdriver.Chrome(service=chrome_service(), options=chrome_opts_vis)
+        try:
+            visit(drv, info["epaper_url"])
+            btn = wait_ready(drv, ready["load"], f"{key} load")
+            drv.execute_script("arguments[0].scrollIntoView({block:'center'});", btn)
+            btn.click()
+            pdf_url = wait_ready(drv, ready["pdf"], f"{key} pdf")
+            if pdf_url:
+                print(f"Samachar Patra PDF: {pdf_url}")
+        except Exception as e:
+            print(f"Selenium error for Samachar Patra: {e}")
+        finally:
+            drv.quit()
 
-def _make_thumbnail_from_path(pdf_path, dest_path):
-    poppler_path = os.path.join(
-        PAPER_BASE_DIR, "Release-25.12.0-0",
-        "poppler-25.12.0", "Library", "bin"
-    )
-    try:
-        images = convert_from_path(pdf_path, dpi=150, first_page=1, last_page=1,
-                                   poppler_path=poppler_path)
-        if images:
-            img = images[0]
-            img.thumbnail((400, 600))
-            img.save(dest_path, "JPEG", quality=85)
-            print(f"Thumbnail created: {dest_path}")
-            return dest_path
-    except Exception as e:
-        print(f"Thumbnail generation failed: {e}")
-    return None
+    else:
+        with host_limiter.slot(info["list_url"]):
+            r = get_session().get(info["list_url"], verify=False, timeout=30)
+        if r.status_code == 200:
+            soup     = BeautifulSoup(r.text, 'lxml')
+            link_tag = soup.select_one(info["selector"])
+            if link_tag and link_tag.get('href'):
+                pdf_url = link_tag['href']
+
+    if not pdf_url:
+        print(f"No PDF URL found for {name}")
+        return None
+    print(f"{name} PDF URL: {pdf_url}")
+    return pdf_url, None
 
 
 def scrape_today():
@@ -207,270 +560,90 @@ def scrape_today():
     conn = sqlite3.connect(PAPER_DB_PATH)
     conn.execute("PRAGMA foreign_keys = ON")
 
-    chrome_options = Options()
-    chrome_options.add_argument("--headless")
-    chrome_options.add_argument("--no-sandbox")
-    chrome_options.add_argument("--disable-dev-shm-usage")
-    chrome_options.add_argument("--disable-gpu")
-    chrome_options.add_argument("--window-size=1920,1080")
+    timer     = StageTimer()
+    run_start = time.monotonic()
+    run_dates = set()
 
-    driver = None
+    discover_pool  = ThreadPoolExecutor(DISCOVERY_WORKERS, thread_name_prefix="discover")
+    download_pool  = ThreadPoolExecutor(DOWNLOAD_WORKERS,  thread_name_prefix="download")
+    thumbnail_pool = ThreadPoolExecutor(THUMBNAIL_WORKERS, thread_name_prefix="thumbnail")
+    text_pool      = ThreadPoolExecutor(TEXT_WORKERS,      thread_name_prefix="text")
+    pending = {}  # future -> (stage, key, issue date, local pdf path)
 
-    try:
-        for key, info in NEWSPAPERS.items():
-            try:
-                pdf_url      = None
-                name         = info["name"]
-                language     = info.get("language", "np")
-                save_date_str = today_str
-
-                if info.get("use_yesterday"):
-                    save_date     = today - timedelta(days=1)
-                    save_date_str = save_date.strftime("%Y-%m-%d")
-
-                if key in ["kantipur", "kathmandupost"]:
-                    y, m, d = today.strftime("%Y"), today.strftime("%m"), today.strftime("%d")
-                    pdf_url = info["download_url_pattern"].format(y=y, m=m, d=d)
-                    print(f"Direct download URL for {name}: {pdf_url}")
-
-                elif key == "nagarik":
-                    base_date  = tz.localize(datetime.strptime(info["base_date"], "%Y-%m-%d"))
-                    days_offset = (today - base_date).days
-                    epaper_id  = info["base_id"] + days_offset
-                    pdf_url    = info["epaper_base_url"] + str(epaper_id)
-                    print(f"Calculated Nagarik epaper ID: {epaper_id} → {pdf_url}")
-
-                elif key == "abhiyandaily":
-                    download_temp_dir = os.path.join(PAPER_BASE_DIR, "temp_downloads")
-                    os.makedirs(download_temp_dir, exist_ok=True)
-                    for old_file in os.listdir(download_temp_dir):
-                        old_path = os.path.join(download_temp_dir, old_file)
-                        if os.path.isfile(old_path):
-                            os.remove(old_path)
-
-                    chrome_opts_ab = Options()
-                    chrome_opts_ab.add_argument("--no-sandbox")
-                    chrome_opts_ab.add_argument("--disable-dev-shm-usage")
-                    chrome_opts_ab.add_argument("--disable-gpu")
-                    prefs = {
-                        "download.default_directory":      download_temp_dir,
-                        "download.prompt_for_download":    False,
-                        "download.directory_upgrade":      True,
-                        "safebrowsing.enabled":            True,
-                        "plugins.always_open_pdf_externally": True,
-                    }
-                    chrome_opts_ab.add_experimental_option("prefs", prefs)
-                    driver_ab = webdriver.Chrome(
-                        service=Service(ChromeDriverManager().install()),
-                        options=chrome_opts_ab
-                    )
-                    try:
-                        driver_ab.get(info["epaper_url"])
-                        time.sleep(15)
-                        driver_ab.execute_script(f"""
-                            let btn = document.querySelector('{info["download_js_selector"]}');
-                            if (btn) btn.click();
-                        """)
-                        print("Triggered Arthik Abhiyan download")
-
-                        timeout    = 60
-                        start_time = time.time()
-                        downloaded_file = None
-                        while time.time() - start_time < timeout:
-                            files     = os.listdir(download_temp_dir)
-                            pdf_files = [f for f in files if f.endswith(".pdf")]
-                            if pdf_files:
-                                downloaded_file = pdf_files[0]
-                                break
-                            time.sleep(2)
-
-                        if downloaded_file:
-                            src_path  = os.path.join(download_temp_dir, downloaded_file)
-                            dest_path = os.path.join(PAPER_PDF_DIR, f"{save_date_str}_abhiyandaily.pdf")
-                            if os.path.exists(dest_path):
-                                os.remove(dest_path)
-                            os.rename(src_path, dest_path)
-                            print(f"Saved Arthik Abhiyan PDF: {dest_path}")
-
-                            thumb_dest = os.path.join(PAPER_THUMB_DIR, f"{save_date_str}_abhiyandaily.jpg")
-                            thumb_path = _make_thumbnail_from_path(dest_path, thumb_dest)
-                            save_paper(conn, key, name, language, save_date_str, dest_path, thumb_path)
-                        else:
-                            print("Arthik Abhiyan: Download timed out")
-                    except Exception as e:
-                        print(f"Error with Arthik Abhiyan: {e}")
-                    finally:
-                        driver_ab.quit()
-                    continue  # already saved — skip generic handling below
-
-                elif key == "karobardaily":
-                    if driver is None:
-                        driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=chrome_options)
-                    driver.get(info["main_url"])
-                    time.sleep(5)
-                    try:
-                        driver.find_element(By.CSS_SELECTOR, info["today_paper_selector"]).click()
-                        time.sleep(10)
-                        driver.find_element(By.CSS_SELECTOR, info["download_button_selector"]).click()
-                        time.sleep(10)
-                        driver.switch_to.window(driver.window_handles[-1])
-                        pdf_url = driver.current_url
-                        print(f"Karobar Daily PDF URL: {pdf_url}")
-                    except Exception as e:
-                        print(f"Selenium error for Karobar Daily: {e}")
-
-                elif key == "souryadaily":
-                    if driver is None:
-                        driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=chrome_options)
-                    driver.get(info["main_url"])
-                    time.sleep(5)
-                    try:
-                        driver.find_element(By.CSS_SELECTOR, info["today_paper_selector"]).click()
-                        time.sleep(5)
-                        driver.switch_to.window(driver.window_handles[-1])
-                        pdfs = re.findall(info["pdf_pattern"], driver.page_source)
-                        if pdfs:
-                            pdf_url = pdfs[0]
-                            print(f"Sourya Daily PDF: {pdf_url}")
-                    except Exception as e:
-                        print(f"Selenium error for Sourya Daily: {e}")
-
-                elif key == "nayapatrika":
-                    page_url = info["date_url_pattern"].format(
-                        y=today.strftime("%Y"), m=today.strftime("%m"), d=today.strftime("%d"))
-                    cookies_local = {'PHPSESSID': '25dc5220dbcc5c59ac596a8b3b2ebab9', 'STACKSCALING': 'web99j'}
-                    headers_local = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:147.0) Gecko/20100101 Firefox/147.0'}
-                    r = requests.get(page_url, headers=headers_local, cookies=cookies_local, verify=False, timeout=30)
-                    if r.status_code == 200:
-                        soup     = BeautifulSoup(r.text, 'lxml')
-                        link_tag = soup.select_one(info["pdf_selector"])
-                        if link_tag and link_tag.get('href'):
-                            pdf_url = link_tag['href']
-                            if not pdf_url.startswith('http'):
-                                pdf_url = "https://epaper.nayapatrikadaily.com/" + pdf_url.lstrip('/')
-
-                elif key == "himalayatimes":
-                    if driver is None:
-                        driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=chrome_options)
-                    driver.get(info["epaper_url"])
-                    time.sleep(10)
-                    try:
-                        driver.find_element(By.CSS_SELECTOR, info["more_button_selector"]).click()
-                        time.sleep(10)
-                        pdf_link = driver.find_element(By.CSS_SELECTOR, info["download_link_selector"])
-                        pdf_url  = pdf_link.get_attribute("href")
-                    except Exception as e:
-                        print(f"Selenium error for Himalaya Times: {e}")
-
-                elif key == "annapurnapost":
-                    if driver is None:
-                        driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=chrome_options)
-                    driver.get(info["epaper_url"])
-                    time.sleep(10)
-                    try:
-                        for a_tag in driver.find_elements(By.CSS_SELECTOR, info["download_links_selector"]):
-                            href = a_tag.get_attribute("href")
-                            if href:
-                                pdf_url = href
-                                print(f"Annapurna Post download gateway: {pdf_url}")
-                                break
-                    except Exception as e:
-                        print(f"Selenium error for Annapurna Post: {e}")
-
-                elif key == "rajdhani":
-                    if driver is None:
-                        driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=chrome_options)
-                    driver.get(info["epaper_url"])
-                    time.sleep(10)
-                    try:
-                        driver.find_element(By.CSS_SELECTOR, info["more_button_selector"]).click()
-                        time.sleep(10)
-                        dl_btn  = driver.find_element(By.CSS_SELECTOR, info["download_button_selector"])
-                        pdf_url = dl_btn.get_attribute("href")
-                        print(f"Rajdhani Daily PDF: {pdf_url}")
-                    except Exception as e:
-                        print(f"Selenium error for Rajdhani Daily: {e}")
-
-                elif key == "apandainik":
-                    if driver is None:
-                        driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=chrome_options)
-                    driver.get(info["epaper_url"])
-                    time.sleep(10)
-                    try:
-                        thumb = driver.find_element(By.CSS_SELECTOR, info["thumbnail_selector"])
-                        driver.execute_script("arguments[0].scrollIntoView(true);", thumb)
-                        time.sleep(1)
-                        thumb.click()
-                        time.sleep(10)
-                        dl_btn  = driver.find_element(By.CSS_SELECTOR, info["download_button_selector"])
-                        pdf_url = dl_btn.get_attribute("href")
-                        print(f"Apan Dainik PDF ({save_date_str}): {pdf_url}")
-                    except Exception as e:
-                        print(f"Selenium error for Apan Dainik: {e}")
-
-                elif key == "samacharpata":
-                    chrome_opts_vis = Options()
-                    chrome_opts_vis.add_argument("--no-sandbox")
-                    chrome_opts_vis.add_argument("--disable-dev-shm-usage")
-                    chrome_opts_vis.add_argument("--disable-gpu")
-                    chrome_opts_vis.add_argument("--window-size=1920,1080")
-                    chrome_opts_vis.set_capability("goog:loggingPrefs", {"performance": "ALL"})
-                    drv = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=chrome_opts_vis)
-                    try:
-                        drv.get(info["epaper_url"])
-                        time.sleep(5)
-                        btn = drv.find_element(By.CSS_SELECTOR, "a > div.box-shadow.epaper-img")
-                        drv.execute_script("arguments[0].scrollIntoView(true);", btn)
-                        time.sleep(1)
-                        btn.click()
-                        time.sleep(10)
-                        pdf_links  = set()
-                        start_time = time.time()
-                        while time.time() - start_time < 25:
-                            for entry in drv.get_log("performance"):
-                                try:
-                                    msg  = json.loads(entry["message"])["message"]
-                                    if msg.get("method") == "Network.responseReceived":
-                                        resp = msg["params"]["response"]
-                                        url  = resp.get("url", "")
-                                        if resp.get("status") == 206 and url.lower().endswith(".pdf"):
-                                            pdf_links.add(url)
-                                except Exception:
-                                    pass
-                            time.sleep(1)
-                        if pdf_links:
-                            pdf_url = list(pdf_links)[0]
-                            print(f"Samachar Patra PDF: {pdf_url}")
-                    except Exception as e:
-                        print(f"Selenium error for Samachar Patra: {e}")
-                    finally:
-                        drv.quit()
-
-                else:
-                    r = requests.get(info["list_url"], verify=False, timeout=30)
-                    if r.status_code == 200:
-                        soup     = BeautifulSoup(r.text, 'lxml')
-                        link_tag = soup.select_one(info["selector"])
-                        if link_tag and link_tag.get('href'):
-                            pdf_url = link_tag['href']
-
-                if not pdf_url:
-                    print(f"No PDF URL found for {name}")
-                    continue
+    for key, info in NEWSPAPERS.items():
+        save_date_str = today_str
+        if info.get("use_yesterday"):
+            save_date     = today - timedelta(days=1)
+            save_date_str = save_date.strftime("%Y-%m-%d")
+        run_dates.add(save_date_str)
 
-                print(f"{name} PDF URL: {pdf_url}")
-                pdf_path, thumb_path = download_pdf(pdf_url, save_date_str, key)
-                if pdf_path:
-                    save_paper(conn, key, name, language, save_date_str, pdf_path, thumb_path)
+        future = discover_pool.submit(timer.run, "discover", discover_pdf,
+                                      key, info, today, save_date_str)
+        pending[future] = ("discover", key, save_date_str, None)
 
-            except Exception as e:
-                print(f"Error scraping {info.get('name', key)}: {e}")
+    try:
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                stage, key, save_date_str, pdf_path = pending.pop(future)
+                info = NEWSPAPERS[key]
+                try:
+                    result = future.result()
+                except Exception as e:
+                    print(f"Error scraping {info.get('name', key)} ({stage}): {e}")
+                    continue
+                if not result:
+                    continue
 
+                if stage == "discover":
+                    pdf_url, pdf_path = result
+                    if pdf_path is None:
+                        nxt = download_pool.submit(timer.run, "download", download_pdf,
+                                                   pdf_url, save_date_str, key)
+                        pending[nxt] = ("download", key, save_date_str, None)
+                        continue
+                    stage, result = "download", (pdf_path, None)
+
+                if stage == "download":
+                    pdf_path, sha256 = result
+                    if is_duplicate(conn, key, info["name"], save_date_str, sha256):
+                        discard_files(pdf_path)
+                        continue
+                    nxt = thumbnail_pool.submit(timer.run, "thumbnail", finish_pdf,
+                                                pdf_path, save_date_str, key, sha256)
+                    pending[nxt] = ("thumbnail", key, save_date_str, pdf_path)
+
+                elif stage == "thumbnail":
+                    thumb_path, sizes, sha256, stored_sha256, variants = result
+                    issue_id = timer.run("write", save_paper, conn, key, info["name"],
+                                         info.get("language", "np"), save_date_str,
+                                         pdf_path, thumb_path, sizes, sha256, stored_sha256)
+                    if issue_id is None:  # browser-saved PDF only hashed in finish_pdf
+                        discard_files(pdf_path, thumb_path, variants)
+                        continue
+                    if variants:
+                        record_variants(conn, os.path.basename(thumb_path), variants)
+                    nxt = text_pool.submit(timer.run, "text", extract_issue,
+                                           issue_id, pdf_path, sha256)
+                    pending[nxt] = ("text", key, save_date_str, pdf_path)
+
+                elif stage == "text":
+                    timer.run("write", save_pages, conn, *result)
     finally:
-        if driver:
-            driver.quit()
+        for pool in (discover_pool, download_pool, thumbnail_pool, text_pool):
+            pool.shutdown(wait=True, cancel_futures=True)
+        quit_drivers()
+        shutdown_pool()
         conn.close()
 
+    timer.summary(time.monotonic() - run_start)
+    HTTP_STATS.report()
+
+    try:
+        refresh_days("paper", run_dates, PAPER_DB_PATH)
+    except Exception as e:
+        print(f"Calendar update failed: {e}")
+
 
 if __name__ == "__main__":
     scrape_today()
\ No newline at end of file
@@ -0,0 +1,166 @@
+"""Per-page text of the newspaper PDFs, for full-text search.
+
+poppler's pdftotext reads the embedded text layer of every page in one
+call; pages come back separated by form feeds and are stored one row per
+(issue_id, page) in page_text, which the page_fts index mirrors. Pages
+without a text layer are stored empty so scanned issues can be told apart.
+
+The scraper extracts each issue right after saving it. Issues archived
+before that, or whose PDF has changed since, are caught up with:
+
+    python paper_text.py [--limit 500] [--workers 4]
+"""
+import argparse
+import os
+import sqlite3
+import subprocess
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from search_index import FTS_TOKENIZE, drop_stale_fts
+from thumbnails import POPPLER_PATH
+
+TEXT_WORKERS    = os.cpu_count() or 2  # each worker waits on a pdftotext process
+EXTRACT_TIMEOUT = 120
+PDFTOTEXT       = os.path.join(POPPLER_PATH, "pdftotext") if POPPLER_PATH else "pdftotext"
+
+
+def init_page_text(conn):
+    """Create page_text, its extraction checkpoints and the page_fts index.
+
+    Same tokenizer and prefix indexes as the portal articles_fts, so app.py's
+    prefix queries work on Nepali pages too.
+    """
+    drop_stale_fts(conn, "page_fts")
+    exists = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'page_fts'"
+    ).fetchone()
+
+    conn.executescript(f"""
+        CREATE TABLE IF NOT EXISTS page_text (
+            id       INTEGER PRIMARY KEY AUTOINCREMENT,
+            issue_id INTEGER NOT NULL REFERENCES issues(id),
+            page     INTEGER NOT NULL,
+            text     TEXT    NOT NULL DEFAULT '',
+            UNIQUE (issue_id, page)
+        );
+
+        -- one row per issue whose PDF has been through pdftotext
+        CREATE TABLE IF NOT EXISTS text_extraction (
+            issue_id     INTEGER PRIMARY KEY REFERENCES issues(id),
+            sha256       TEXT,
+            pages        INTEGER NOT NULL,
+            text_pages   INTEGER NOT NULL,
+            extracted_at TEXT    NOT NULL DEFAULT CURRENT_TIMESTAMP
+        );
+
+        CREATE VIRTUAL TABLE IF NOT EXISTS page_fts USING fts5(
+            text,
+            content       = 'page_text',
+            content_rowid = 'id',
+            tokenize      = "{FTS_TOKENIZE}",
+            prefix        = '2 3'
+        );
+
+        CREATE TRIGGER IF NOT EXISTS page_fts_ai AFTER INSERT ON page_text BEGIN
+            INSERT INTO page_fts (rowid, text) VALUES (new.id, new.text);
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS page_fts_ad AFTER DELETE ON page_text BEGIN
+            INSERT INTO page_fts (page_fts, rowid, text) VALUES ('delete', old.id, old.text);
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS page_fts_au AFTER UPDATE ON page_text BEGIN
+            INSERT INTO page_fts (page_fts, rowid, text) VALUES ('delete', old.id, old.text);
+            INSERT INTO page_fts (rowid, text) VALUES (new.id, new.text);
+        END;
+    """)
+    if not exists:
+        conn.execute("INSERT INTO page_fts (page_fts) VALUES ('rebuild')")
+
+
+def extract_pages(pdf_path):
+    """Text of every page of pdf_path, whitespace collapsed; '' for image-only pages."""
+    result = subprocess.run([PDFTOTEXT, "-enc", "UTF-8", pdf_path, "-"],
+                            capture_output=True, timeout=EXTRACT_TIMEOUT)
+    if result.returncode != 0:
+        raise RuntimeError(f"pdftotext exited {result.returncode}: "
+                           f"{result.stderr.decode(errors='replace').strip()[:200]}")
+    pages = result.stdout.decode("utf-8", errors="replace").split("\f")
+    if pages and not pages[-1].strip():
+        pages.pop()  # pdftotext ends every page, the last one included, with \f
+    return [" ".join(page.split()) for page in pages]
+
+
+def extract_issue(issue_id, pdf_path, sha256=None):
+    """Worker side: (issue_id, sha256, pages) for save_pages."""
+    return issue_id, sha256, extract_pages(pdf_path)
+
+
+def save_pages(conn, issue_id, sha256, pages):
+    """Replace the stored pages of one issue and checkpoint it; returns the page count."""
+    conn.execute("DELETE FROM page_text WHERE issue_id = ?", (issue_id,))
+    conn.executemany("INSERT INTO page_text (issue_id, page, text) VALUES (?, ?, ?)",
+                     [(issue_id, n, text) for n, text in enumerate(pages, 1)])
+    text_pages = sum(1 for text in pages if text)
+    conn.execute("""
+        INSERT OR REPLACE INTO text_extraction (issue_id, sha256, pages, text_pages)
+        VALUES (?, ?, ?, ?)
+    """, (issue_id, sha256, len(pages), text_pages))
+    conn.commit()
+    print(f"[Text] issue {issue_id}: {text_pages} of {len(pages)} pages have text")
+    return len(pages)
+
+
+def pending_issues(conn, limit=None):
+    """(issue_id, pdf_path, sha256) not yet extracted or changed since, newest first."""
+    sql = """
+        SELECT f.issue_id, f.pdf_path, f.sha256
+        FROM files f
+        JOIN issues i ON i.id = f.issue_id
+        LEFT JOIN text_extraction t ON t.issue_id = f.issue_id
+        WHERE t.issue_id IS NULL OR t.sha256 IS NOT f.sha256
+        ORDER BY i.issue_date DESC
+        LIMIT ?
+    """
+    return conn.execute(sql, (limit or -1,)).fetchall()
+
+
+def catch_up(limit=None, workers=TEXT_WORKERS):
+    """Extract every pending issue in parallel; safe to stop and rerun."""
+    from paper_scraper import PAPER_DB_PATH, PAPER_PDF_DIR, init_db
+
+    init_db()
+    conn = sqlite3.connect(PAPER_DB_PATH)
+    todo = pending_issues(conn, limit)
+    print(f"{len(todo)} issues to extract")
+
+    started = time.monotonic()
+    done    = failed = 0
+    with ThreadPoolExecutor(workers) as pool:
+        futures = {}
+        for issue_id, pdf_path, sha256 in todo:
+            pdf_path = os.path.join(PAPER_PDF_DIR, os.path.basename(pdf_path))
+            if not os.path.exists(pdf_path):
+                print(f"  missing PDF: {pdf_path}")
+                failed += 1
+                continue
+            futures[pool.submit(extract_issue, issue_id, pdf_path, sha256)] = issue_id
+        # all writes happen here, on the thread that owns conn
+        for future in as_completed(futures):
+            try:
+                save_pages(conn, *future.result())
+                done += 1
+            except Exception as e:
+                print(f"  issue {futures[future]}: failed ({e})")
+                failed += 1
+    conn.close()
+    print(f"extracted {done} issues, {failed} failed in {time.monotonic() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Extract newspaper PDF text for search.")
+    parser.add_argument("--limit", type=int, help="newest N pending issues only")
+    parser.add_argument("--workers", type=int, default=TEXT_WORKERS)
+    args = parser.parse_args()
+    catch_up(args.limit, args.workers)
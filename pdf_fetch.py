@@ -0,0 +1,116 @@
+import hashlib
+import os
+import re
+import time
+
+import requests
+
+from http_session import get_session
+
+CHUNK_SIZE  = 1 << 20  # 1 MiB per write
+ATTEMPTS    = 4
+RETRY_DELAY = 2.0      # doubled after every failed attempt
+
+
+def verify_pdf(path, expected_size=None):
+    """(sha256, size) if path looks like a complete PDF, else None.
+
+    Checks the byte count against the server's, the %PDF- header and the
+    %%EOF marker, and hashes the file in the same pass.
+    """
+    size = os.path.getsize(path)
+    name = os.path.basename(path)
+    if expected_size is not None and size != expected_size:
+        print(f"Incomplete PDF {name}: {size} of {expected_size} bytes")
+        return None
+
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        head = f.read(1024)
+        f.seek(max(0, size - 2048))
+        tail = f.read()
+        f.seek(0)
+        while chunk := f.read(CHUNK_SIZE):
+            digest.update(chunk)
+
+    if b"%PDF-" not in head:
+        print(f"Not a PDF: {name} (no %PDF- header)")
+        return None
+    if b"%%EOF" not in tail:
+        print(f"Truncated PDF {name}: no %%EOF marker")
+        return None
+    return digest.hexdigest(), size
+
+
+def _total_size(response):
+    """Full size of the file being sent, or None when the server doesn't say."""
+    if response.status_code == 206:
+        match = re.search(r"/(\d+)\s*$", response.headers.get("Content-Range", ""))
+        return int(match.group(1)) if match else None
+    if response.headers.get("Content-Encoding"):
+        return None  # Content-Length counts compressed bytes
+    length = response.headers.get("Content-Length")
+    return int(length) if length and length.isdigit() else None
+
+
+def fetch_pdf(url, dest_path, label, attempts=ATTEMPTS, **request_kwargs):
+    """Download url to dest_path; returns (sha256, size) or None.
+
+    The body streams to dest_path + ".part" in large chunks. A dropped
+    connection is resumed with an HTTP Range request (If-Range keeps it on
+    the same file), and the result must pass verify_pdf before it is
+    atomically renamed into place, so a truncated download never replaces
+    a good file.
+    """
+    part_path = dest_path + ".part"
+    if os.path.exists(part_path):
+        os.remove(part_path)
+
+    base_headers = request_kwargs.pop("headers", None) or {}
+    expected     = None
+    validator    = None
+    for attempt in range(1, attempts + 1):
+        offset  = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+        headers = dict(base_headers)
+        if offset and validator:
+            headers["Range"]    = f"bytes={offset}-"
+            headers["If-Range"] = validator
+        try:
+            with get_session().get(url, headers=headers, stream=True, **request_kwargs) as response:
+                response.raise_for_status()
+                content_type = response.headers.get("Content-Type", "").lower()
+                if "pdf" not in content_type:
+                    print(f"Non-PDF response for {label} (Content-Type: {content_type})")
+                    if os.path.exists(part_path):
+                        os.remove(part_path)
+                    return None
+
+                resumed   = response.status_code == 206
+                expected  = _total_size(response)
+                validator = response.headers.get("ETag") or response.headers.get("Last-Modified")
+                with open(part_path, "ab" if resumed else "wb") as f:
+                    for chunk in response.iter_content(CHUNK_SIZE):
+                        f.write(chunk)
+            if resumed:
+                print(f"Resumed {label} from byte {offset}")
+            if expected is None or os.path.getsize(part_path) >= expected:
+                break
+            raise requests.ConnectionError(
+                f"connection closed at {os.path.getsize(part_path)} of {expected} bytes")
+        except (requests.RequestException, OSError) as e:
+            client_error = isinstance(e, requests.HTTPError) and e.response.status_code < 500
+            if client_error or attempt == attempts:
+                print(f"Failed to download PDF for {label}: {e}")
+                if os.path.exists(part_path):
+                    os.remove(part_path)
+                return None
+            delay = RETRY_DELAY * 2 ** (attempt - 1)
+            print(f"Download of {label} interrupted ({e}); retrying in {delay:.0f}s")
+            time.sleep(delay)
+
+    verified = verify_pdf(part_path, expected)
+    if verified is None:
+        os.remove(part_path)
+        return None
+    os.replace(part_path, dest_path)
+    return verified
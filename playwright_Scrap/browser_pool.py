@@ -0,0 +1,184 @@
+import asyncio
+import threading
+from contextlib import asynccontextmanager, contextmanager
+
+from playwright.async_api import async_playwright
+from playwright.sync_api import sync_playwright, Error as PlaywrightError
+
+BROWSER_ARGS = [
+    "--no-sandbox", "--disable-gpu", "--mute-audio", "--disable-dev-shm-usage",
+    "--disable-extensions", "--disable-background-networking",
+    "--disable-default-apps", "--no-first-run",
+    "--js-flags=--max-old-space-size=256",
+]
+
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 Chrome/122.0.0.0 Safari/537.36"
+
+# Every page call inside a site context is bounded by this, so a hung site
+# fails on its own instead of blocking the sites queued behind it.
+SITE_TIMEOUT_MS = 90000
+
+
+class SharedBrowser:
+    """One long-lived Chromium per run, with a fresh BrowserContext per site.
+
+    Playwright's sync API is bound to the thread that started it, so a
+    SharedBrowser must only be used from that thread; see shared_browser().
+    """
+
+    def __init__(self, args=None, headless=True):
+        self.args      = args or BROWSER_ARGS
+        self.headless  = headless
+        self.launches  = 0
+        self._pw       = None
+        self._browser  = None
+        self._owner    = None
+
+    def _launch(self):
+        if self._pw is None:
+            self._pw    = sync_playwright().start()
+            self._owner = threading.get_ident()
+        self._browser = self._pw.chromium.launch(headless=self.headless, args=self.args)
+        self.launches += 1
+        if self.launches > 1:
+            print(f"[Browser] Chromium relaunched (launch #{self.launches})")
+
+    def _discard(self):
+        if self._browser is not None:
+            try:
+                self._browser.close()
+            except PlaywrightError:
+                pass
+        self._browser = None
+
+    @property
+    def browser(self):
+        if self._owner is not None and threading.get_ident() != self._owner:
+            raise RuntimeError("SharedBrowser used from a thread other than its own")
+        if self._browser is None or not self._browser.is_connected():
+            self._discard()
+            self._launch()
+        return self._browser
+
+    def _new_context(self, **context_kwargs):
+        browser = self.browser
+        try:
+            return browser.new_context(**context_kwargs)
+        except PlaywrightError as e:
+            # connected but wedged: start over with a fresh process
+            print(f"[Browser] new_context failed ({str(e)[:80]}); relaunching")
+            self._discard()
+            return self.browser.new_context(**context_kwargs)
+
+    @contextmanager
+    def site(self, name, block=(), timeout_ms=SITE_TIMEOUT_MS, **context_kwargs):
+        """Isolated context for one site; closed afterwards, relaunching Chromium if it died."""
+        context_kwargs.setdefault("viewport",   {"width": 1280, "height": 800})
+        context_kwargs.setdefault("user_agent", USER_AGENT)
+        ctx = self._new_context(**context_kwargs)
+        ctx.set_default_timeout(timeout_ms)
+        ctx.set_default_navigation_timeout(timeout_ms)
+        if block:
+            ctx.route("**/*", lambda route, req:
+                route.abort() if req.resource_type in block
+                else route.continue_())
+        try:
+            yield ctx
+        finally:
+            try:
+                ctx.close()
+            except PlaywrightError:
+                pass
+            if self._browser is not None and not self._browser.is_connected():
+                print(f"[Browser] Chromium died during {name}; relaunching for the next site")
+                self._browser = None
+
+    def close(self):
+        self._discard()
+        if self._pw is not None:
+            self._pw.stop()
+            self._pw = None
+
+
+_local = threading.local()
+
+
+def shared_browser():
+    """The calling thread's SharedBrowser; Chromium starts on first use."""
+    if getattr(_local, "browser", None) is None:
+        _local.browser = SharedBrowser()
+    return _local.browser
+
+
+def close_shared_browser():
+    browser = getattr(_local, "browser", None)
+    if browser is not None:
+        browser.close()
+        _local.browser = None
+
+
+class AsyncSharedBrowser:
+    """asyncio counterpart of SharedBrowser: one Chromium, many concurrent contexts."""
+
+    def __init__(self, args=None, headless=True):
+        self.args      = args or BROWSER_ARGS
+        self.headless  = headless
+        self.launches  = 0
+        self._pw       = None
+        self._browser  = None
+        self._lock     = asyncio.Lock()
+
+    async def _discard(self):
+        if self._browser is not None:
+            try:
+                await self._browser.close()
+            except PlaywrightError:
+                pass
+        self._browser = None
+
+    async def browser(self):
+        async with self._lock:
+            if self._browser is None or not self._browser.is_connected():
+                await self._discard()
+                if self._pw is None:
+                    self._pw = await async_playwright().start()
+                self._browser = await self._pw.chromium.launch(headless=self.headless, args=self.args)
+                self.launches += 1
+                if self.launches > 1:
+                    print(f"[Browser] Chromium relaunched (launch #{self.launches})")
+            return self._browser
+
+    @asynccontextmanager
+    async def site(self, name, block=(), timeout_ms=SITE_TIMEOUT_MS, **context_kwargs):
+        context_kwargs.setdefault("viewport",   {"width": 1280, "height": 800})
+        context_kwargs.setdefault("user_agent", USER_AGENT)
+        browser = await self.browser()
+        try:
+            ctx = await browser.new_context(**context_kwargs)
+        except PlaywrightError as e:
+            print(f"[Browser] new_context failed ({str(e)[:80]}); relaunching")
+            async with self._lock:
+                if self._browser is browser:
+                    await self._discard()
+            ctx = await (await self.browser()).new_context(**context_kwargs)
+        ctx.set_default_timeout(timeout_ms)
+        ctx.set_default_navigation_timeout(timeout_ms)
+        if block:
+            await ctx.route("**/*", lambda route, req:
+                route.abort() if req.resource_type in block
+                else route.continue_())
+        try:
+            yield ctx
+        finally:
+            try:
+                await ctx.close()
+            except PlaywrightError:
+                pass
+            if self._browser is not None and not self._browser.is_connected():
+                print(f"[Browser] Chromium died during {name}; relaunching for the next site")
+
+    async def close(self):
+        await self._discard()
+        if self._pw is not None:
+            await self._pw.stop()
+            self._pw = None
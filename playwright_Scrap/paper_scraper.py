@@ -1,16 +1,26 @@
-from playwright.sync_api import sync_playwright
+import sys
 from urllib.parse import urlparse
 import sqlite3
 import os
-import re
 import json
 import time
-import requests
 import urllib3
 from bs4 import BeautifulSoup
 from datetime import datetime, timedelta
 import pytz
-from pdf2image import convert_from_path
+from contextlib import contextmanager
+from itertools import cycle
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+# helpers shared with the root scrapers (http_session, thumbnails, ...) live one level up
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from scrape_pipeline import HostLimiter, StageTimer
+from pdf_fetch import fetch_pdf, verify_pdf
+from thumbnails import RENDER_WORKERS, make_thumbnail, shutdown_pool
+from image_variants import init_variants, record_variants, try_variants
+from paper_text import TEXT_WORKERS, extract_issue, init_page_text, save_pages
+from http_session import STATS as HTTP_STATS, get_session
+from browser_pool import shared_browser, close_shared_browser
+from readiness import wait_ready
 
 urllib3.disable_warnings()
 
@@ -19,6 +29,23 @@ PAPER_PDF_DIR   = os.path.join(PAPER_BASE_DIR, "paper_archive", "pdfs")
 PAPER_THUMB_DIR = os.path.join(PAPER_BASE_DIR, "paper_archive", "thumbnails")
 PAPER_DB_PATH   = os.path.join(PAPER_BASE_DIR, "paper_archive", "database.db")
 
+DISCOVERY_WORKERS = 4
+BROWSER_WORKERS   = 3  # each runs its own Chromium, so this is bounded by memory
+DOWNLOAD_WORKERS  = 4
+THUMBNAIL_WORKERS = RENDER_WORKERS
+HOST_MIN_INTERVAL = 3.0
+
+# Papers discovered through the browser are dealt round-robin to BROWSER_WORKERS
+# single-thread lanes. Playwright's sync API is bound to the thread that
+# started it, so each lane owns its Chromium (shared_browser() is per thread)
+# and closes it on that thread; the rest use the plain discovery pool.
+BROWSER_PAPERS = {
+    "gorkhapatra", "risingnepal", "abhiyandaily", "karobardaily", "himalayatimes",
+    "souryadaily", "annapurnapost", "rajdhani", "apandainik", "samacharpata",
+}
+
+host_limiter = HostLimiter(per_host=1, min_interval=HOST_MIN_INTERVAL)
+
 os.makedirs(PAPER_PDF_DIR,   exist_ok=True)
 os.makedirs(PAPER_THUMB_DIR, exist_ok=True)
 
@@ -27,12 +54,14 @@ NEWSPAPERS = {
         "name": "Gorkhapatra",
         "list_url": "https://epaper.gorkhapatraonline.com/single/gorkhapatra",
         "selector": "div.paperdesign a",
+        "ready": {"load": {"present": "div.paperdesign a"}},
         "language": "np"
     },
     "risingnepal": {
         "name": "The Rising Nepal",
         "list_url": "https://epaper.gorkhapatraonline.com/single/risingnepal",
         "selector": "div.paperdesign a",
+        "ready": {"load": {"present": "div.paperdesign a"}},
         "language": "en"
     },
     "nayapatrika": {
@@ -45,6 +74,10 @@ NEWSPAPERS = {
         "name": "Abhiyan Daily",
         "epaper_url": "https://abhiyandaily.com/epaper/",
         "download_js_selector": "a.download__epaper",
+        "ready": {
+            "load":     {"clickable": "a.download__epaper", "timeout": 30},
+            "download": {"download": True, "timeout": 60},
+        },
         "language": "np"
     },
     "karobardaily": {
@@ -52,6 +85,11 @@ NEWSPAPERS = {
         "main_url": "https://www.karobardaily.com/news/e-paper/",
         "today_paper_selector": "div.uk-width-5-5\\@s.uk-first-column",
         "download_button_selector": "span.fa-file.flipbook-icon-fa.flipbook-menu-btn.skin-color.fa.flipbook-color-light",
+        "ready": {
+            "load":     {"clickable": "div.uk-width-5-5\\@s.uk-first-column"},
+            "open":     {"clickable": "span.fa-file.flipbook-icon-fa.flipbook-menu-btn.skin-color.fa.flipbook-color-light", "timeout": 25},
+            "download": {"windows": 2},
+        },
         "language": "np"
     },
     "himalayatimes": {
@@ -59,6 +97,10 @@ NEWSPAPERS = {
         "epaper_url": "https://ehimalayatimes.com/epaper/",
         "more_button_selector": "div.df-ui-more",
         "download_link_selector": "a.df-ui-download",
+        "ready": {
+            "load": {"clickable": "div.df-ui-more"},
+            "open": {"present": "a.df-ui-download"},
+        },
         "language": "np"
     },
     "souryadaily": {
@@ -66,12 +108,20 @@ NEWSPAPERS = {
         "main_url": "https://www.souryaonline.com/paper",
         "today_paper_selector": "div.epaper_item a",
         "pdf_pattern": r'https://www\.souryaonline\.com/wp-content/uploads/.*?\.pdf',
+        "ready": {
+            "load": {"clickable": "div.epaper_item a"},
+            "open": {"windows": 2, "timeout": 15},
+            "pdf":  {"source": r'https://www\.souryaonline\.com/wp-content/uploads/.*?\.pdf', "timeout": 15},
+        },
         "language": "np"
     },
     "annapurnapost": {
         "name": "Annapurna Post",
         "epaper_url": "https://annapurnapost.com/epaper/",
         "download_links_selector": "button.view__flipbook.view__download a",
+        "ready": {
+            "load": {"present": "button.view__flipbook.view__download a"},
+        },
         "language": "np"
     },
     "rajdhani": {
@@ -79,6 +129,10 @@ NEWSPAPERS = {
         "epaper_url": "https://rajdhani.com.np/",
         "more_button_selector": ".df-ui-more",
         "download_button_selector": "a.df-ui-btn.df-ui-download.df-icon-download",
+        "ready": {
+            "load": {"clickable": ".df-ui-more"},
+            "open": {"present": "a.df-ui-btn.df-ui-download.df-icon-download"},
+        },
         "language": "np"
     },
     "apandainik": {
@@ -86,12 +140,20 @@ NEWSPAPERS = {
         "epaper_url": "https://epaper.apandainik.com/all-day-epaper/",
         "thumbnail_selector": ".pcp-post-thumb-wrapper",
         "download_button_selector": "a.pdfp_download.pdfp_download_btn.button",
+        "ready": {
+            "load": {"clickable": ".pcp-post-thumb-wrapper"},
+            "open": {"present": "a.pdfp_download.pdfp_download_btn.button"},
+        },
         "use_yesterday": True,
         "language": "np"
     },
     "samacharpata": {
         "name": "Samachar Patra",
         "epaper_url": "https://epaper.newsofnepal.com/",
+        "ready": {
+            "load": {"clickable": "a > div.box-shadow.epaper-img"},
+            "pdf":  {"response": r"\.pdf$", "timeout": 35},
+        },
         "language": "np"
     },
     "kantipur": {
@@ -113,13 +175,6 @@ NEWSPAPERS = {
     }
 }
 
-BROWSER_ARGS = [
-    "--no-sandbox", "--disable-gpu", "--mute-audio", "--disable-dev-shm-usage",
-    "--disable-extensions", "--disable-background-networking",
-    "--disable-default-apps", "--no-first-run",
-    "--js-flags=--max-old-space-size=256",
-]
-
 HEADERS = {
     "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:147.0) Gecko/20100101 Firefox/147.0",
     "Accept-Language": "en-US,en;q=0.9",
@@ -150,14 +205,56 @@ def init_db():
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             issue_id INTEGER NOT NULL REFERENCES issues(id),
             pdf_path TEXT NOT NULL,
-            thumbnail_path TEXT
+            thumbnail_path TEXT,
+            original_size INTEGER,
+            sha256 TEXT
         );
     """)
+    existing = {row[1] for row in c.execute("PRAGMA table_info(files)")}
+    for name, decl in (("original_size", "INTEGER"), ("sha256", "TEXT")):
+        if name not in existing:
+            c.execute(f"ALTER TABLE files ADD COLUMN {name} {decl}")
+    c.execute("CREATE INDEX IF NOT EXISTS idx_files_sha256 ON files (sha256)")
+    init_variants(conn)
+    init_page_text(conn)
     conn.commit()
     conn.close()
 
 
-def save_paper(conn, key, name, language, issue_date, pdf_path, thumbnail_path):
+def duplicate_issue_date(conn, key, issue_date, sha256):
+    """Date of another issue of this paper whose download had the same hash, if any."""
+    row = conn.execute("""
+        SELECT i.issue_date FROM files f
+        JOIN issues i ON i.id = f.issue_id
+        JOIN newspapers n ON n.id = i.newspaper_id
+        WHERE f.sha256 = ? AND n.key = ? AND i.issue_date != ?
+        LIMIT 1
+    """, (sha256, key, issue_date)).fetchone()
+    return row[0] if row else None
+
+
+def is_duplicate(conn, key, name, issue_date, sha256):
+    earlier = duplicate_issue_date(conn, key, issue_date, sha256) if sha256 else None
+    if earlier:
+        print(f"[DB] Skipped {name} for {issue_date}: same PDF as the {earlier} issue")
+    return bool(earlier)
+
+
+def discard_files(pdf_path, thumb_path=None, variants=()):
+    """Remove what was written for an issue that is not saved after all."""
+    paths = [pdf_path, thumb_path]
+    if thumb_path:
+        paths += [os.path.join(os.path.dirname(thumb_path), v[2]) for v in variants]
+    for path in paths:
+        if path and os.path.exists(path):
+            os.remove(path)
+
+
+def save_paper(conn, key, name, language, issue_date, pdf_path, thumbnail_path, verified=(None, None)):
+    """Returns the issue id, or None if the PDF repeats an earlier issue."""
+    sha256, size = verified
+    if is_duplicate(conn, key, name, issue_date, sha256):
+        return None
     c = conn.cursor()
     c.execute("""
         INSERT INTO newspapers (key, name, language) VALUES (?, ?, ?)
@@ -175,10 +272,11 @@ def save_paper(conn, key, name, language, issue_date, pdf_path, thumbnail_path):
     issue_id = c.fetchone()[0]
 
     c.execute("DELETE FROM files WHERE issue_id=?", (issue_id,))
-    c.execute("INSERT INTO files (issue_id, pdf_path, thumbnail_path) VALUES (?,?,?)",
-              (issue_id, pdf_path, thumbnail_path))
+    c.execute("INSERT INTO files (issue_id, pdf_path, thumbnail_path, original_size, sha256) VALUES (?,?,?,?,?)",
+              (issue_id, pdf_path, thumbnail_path, size, sha256))
     conn.commit()
     print(f"[DB] Saved {name} for {issue_date}")
+    return issue_id
 
 
 
@@ -200,80 +298,44 @@ def download_pdf(pdf_url, date_str, key):
         cookies = {
         }
 
-    try:
-        r = requests.get(pdf_url, headers=HEADERS, cookies=cookies,
-                         verify=False, timeout=60, stream=True)
-        r.raise_for_status()
-        ct = r.headers.get("Content-Type", "").lower()
-        if "pdf" not in ct:
-            print(f"  Non-PDF for {key} (Content-Type: {ct})")
-            return None, None
-    except Exception as e:
-        print(f"  Download failed for {key}: {e}")
-        return None, None
-
     pdf_path = os.path.join(PAPER_PDF_DIR, f"{date_str}_{key}.pdf")
-    try:
-        with open(pdf_path, "wb") as f:
-            for chunk in r.iter_content(chunk_size=1024):
-                if chunk:
-                    f.write(chunk)
-        print(f"  PDF saved: {pdf_path}")
-    except Exception as e:
-        print(f"  Save failed for {key}: {e}")
-        return None, None
-
-    thumb_path = make_thumbnail(pdf_path, date_str, key)
-    return pdf_path, thumb_path
+    with host_limiter.slot(pdf_url):
+        verified = fetch_pdf(pdf_url, pdf_path, key, headers=HEADERS, cookies=cookies,
+                             verify=False, timeout=60)
+    if verified is None:
+        return None
+    print(f"  PDF saved: {pdf_path} ({verified[1] / 1e6:.1f} MB)")
+    return pdf_path, verified
 
 
-def make_thumbnail(pdf_path, date_str, key, dest_path=None):
-    if dest_path is None:
-        dest_path = os.path.join(PAPER_THUMB_DIR, f"{date_str}_{key}.jpg")
-    try:
-        images = convert_from_path(pdf_path, dpi=150, first_page=1, last_page=1)
-        if images:
-            img = images[0]
-            img.thumbnail((400, 600))
-            img.save(dest_path, "JPEG", quality=85)
-            print(f"  Thumbnail: {dest_path}")
-            return dest_path
-    except Exception as e:
-        print(f"  Thumbnail failed for {key}: {e}")
-    return None
-
-
-def new_browser(p):
-    return p.chromium.launch(headless=True, args=BROWSER_ARGS)
+def finish_pdf(pdf_path, date_str, key, verified=None):
+    """Thumbnail and srcset variants; PDFs the browser saved itself are verified first."""
+    verified = verified or verify_pdf(pdf_path)
+    if verified is None:
+        return None
+    thumb_path = make_thumbnail(pdf_path, os.path.join(PAPER_THUMB_DIR, f"{date_str}_{key}.jpg"),
+                                key, verified[0])
+    return thumb_path, verified, try_variants(thumb_path) if thumb_path else []
 
 
-def new_page(browser, block_media=True):
-    ctx = browser.new_context(
-        viewport={"width": 1280, "height": 800},
-        user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 Chrome/122.0.0.0 Safari/537.36"
-    )
-    if block_media:
-        ctx.route("**/*", lambda route, req:
-            route.abort() if req.resource_type in ("font", "image", "media")
-            else route.continue_())
-    return ctx, ctx.new_page()
+@contextmanager
+def site_page(key, block_media=True, **context_kwargs):
+    """Fresh context and page on this thread's shared browser."""
+    block = ("font", "image", "media") if block_media else ()
+    with shared_browser().site(key, block=block, **context_kwargs) as ctx:
+        yield ctx, ctx.new_page()
 
 
 def get_pdf_url_gorkhapatra_rising(key, info):
-    with sync_playwright() as p:
-        browser = new_browser(p)
-        try:
-            ctx, page = new_page(browser)
+    try:
+        with site_page(key) as (ctx, page):
             page.goto(info["list_url"], wait_until="domcontentloaded", timeout=60000)
-            time.sleep(5)
-            el = page.query_selector(info["selector"])
+            el = wait_ready(page, info["ready"]["load"], f"{key} load")
             if el:
                 href = el.get_attribute("href") or ""
                 return href if href.startswith("http") else ""
-        except Exception as e:
-            print(f"  {key} error: {e}")
-        finally:
-            browser.close()
+    except Exception as e:
+        print(f"  {key} error: {e}")
     return None
 
 
@@ -282,7 +344,8 @@ def get_pdf_url_nayapatrika(info, today):
         y=today.strftime("%Y"), m=today.strftime("%m"), d=today.strftime("%d"))
     cookies = {"PHPSESSID": "25dc5220dbcc5c59ac596a8b3b2ebab9", "STACKSCALING": "web99j"}
     try:
-        r = requests.get(url, headers=HEADERS, cookies=cookies, verify=False, timeout=30)
+        with host_limiter.slot(url):
+            r = get_session().get(url, headers=HEADERS, cookies=cookies, verify=False, timeout=30)
         if r.status_code == 200:
             soup = BeautifulSoup(r.text, "lxml")
             tag  = soup.select_one(info["pdf_selector"])
@@ -303,275 +366,289 @@ def get_pdf_url_abhiyandaily(info):
         if os.path.isfile(fp):
             os.remove(fp)
 
-    with sync_playwright() as p:
-        browser = p.chromium.launch(headless=True, args=BROWSER_ARGS)
-        try:
-            ctx = browser.new_context(
-                viewport={"width": 1280, "height": 800},
-                accept_downloads=True,
-            )
-            page = ctx.new_page()
+    ready = info["ready"]
+    try:
+        with site_page("abhiyandaily", block_media=False, accept_downloads=True) as (ctx, page):
             page.goto(info["epaper_url"], wait_until="domcontentloaded", timeout=60000)
-            time.sleep(15)
-            with page.expect_download(timeout=60000) as dl_info:
-                page.click(info["download_js_selector"])
-            dl = dl_info.value
+            wait_ready(page, ready["load"], "abhiyandaily load")
+            dl = wait_ready(page, ready["download"], "abhiyandaily download",
+                            action=lambda: page.click(info["download_js_selector"]))
+            if not dl:
+                return None
             dest = os.path.join(download_temp, dl.suggested_filename or "abhiyan.pdf")
             dl.save_as(dest)
             print(f"  Abhiyan download: {dest}")
             return dest  # return local path, handled differently
-        except Exception as e:
-            print(f"  abhiyandaily error: {e}")
-        finally:
-            browser.close()
+    except Exception as e:
+        print(f"  abhiyandaily error: {e}")
     return None
 
 
 def get_pdf_url_karobardaily(info):
-    with sync_playwright() as p:
-        browser = new_browser(p)
-        try:
-            ctx, page = new_page(browser, block_media=False)
+    ready = info["ready"]
+    try:
+        with site_page("karobardaily", block_media=False) as (ctx, page):
             page.goto(info["main_url"], wait_until="domcontentloaded", timeout=60000)
-            time.sleep(5)
-            page.click(info["today_paper_selector"])
-            time.sleep(10)
-            page.click(info["download_button_selector"])
-            time.sleep(10)
+            wait_ready(page, ready["load"], "karobardaily load")
+            wait_ready(page, ready["open"], "karobardaily open",
+                       action=lambda: page.click(info["today_paper_selector"]))
+            wait_ready(page, ready["download"], "karobardaily download",
+                       action=lambda: page.click(info["download_button_selector"]))
             pages = ctx.pages
             if len(pages) > 1:
                 return pages[-1].url
             return page.url
-        except Exception as e:
-            print(f"  karobardaily error: {e}")
-        finally:
-            browser.close()
+    except Exception as e:
+        print(f"  karobardaily error: {e}")
     return None
 
 
 def get_pdf_url_himalayatimes(info):
-    with sync_playwright() as p:
-        browser = new_browser(p)
-        try:
-            ctx, page = new_page(browser, block_media=False)
+    ready = info["ready"]
+    try:
+        with site_page("himalayatimes", block_media=False) as (ctx, page):
             page.goto(info["epaper_url"], wait_until="domcontentloaded", timeout=60000)
-            time.sleep(10)
-            page.click(info["more_button_selector"])
-            time.sleep(10)
-            el = page.query_selector(info["download_link_selector"])
+            wait_ready(page, ready["load"], "himalayatimes load")
+            el = wait_ready(page, ready["open"], "himalayatimes open",
+                            action=lambda: page.click(info["more_button_selector"]))
             return el.get_attribute("href") if el else None
-        except Exception as e:
-            print(f"  himalayatimes error: {e}")
-        finally:
-            browser.close()
+    except Exception as e:
+        print(f"  himalayatimes error: {e}")
     return None
 
 
 def get_pdf_url_souryadaily(info):
-    with sync_playwright() as p:
-        browser = new_browser(p)
-        try:
-            ctx, page = new_page(browser, block_media=False)
+    ready = info["ready"]
+    try:
+        with site_page("souryadaily", block_media=False) as (ctx, page):
             page.goto(info["main_url"], wait_until="domcontentloaded", timeout=60000)
-            time.sleep(5)
-            page.click(info["today_paper_selector"])
-            time.sleep(5)
-            new_pages = ctx.pages
-            src = new_pages[-1].content() if len(new_pages) > 1 else page.content()
-            pdfs = re.findall(info["pdf_pattern"], src)
-            return pdfs[0] if pdfs else None
-        except Exception as e:
-            print(f"  souryadaily error: {e}")
-        finally:
-            browser.close()
+            wait_ready(page, ready["load"], "souryadaily load")
+            wait_ready(page, ready["open"], "souryadaily open",
+                       action=lambda: page.click(info["today_paper_selector"]))
+            return wait_ready(page, ready["pdf"], "souryadaily pdf")
+    except Exception as e:
+        print(f"  souryadaily error: {e}")
     return None
 
 
 def get_pdf_url_annapurnapost(info):
-    with sync_playwright() as p:
-        browser = new_browser(p)
-        try:
-            ctx, page = new_page(browser, block_media=False)
+    try:
+        with site_page("annapurnapost", block_media=False) as (ctx, page):
             page.goto(info["epaper_url"], wait_until="domcontentloaded", timeout=60000)
-            time.sleep(10)
-            el = page.query_selector(info["download_links_selector"])
+            el = wait_ready(page, info["ready"]["load"], "annapurnapost load")
             return el.get_attribute("href") if el else None
-        except Exception as e:
-            print(f"  annapurnapost error: {e}")
-        finally:
-            browser.close()
+    except Exception as e:
+        print(f"  annapurnapost error: {e}")
     return None
 
 
 def get_pdf_url_rajdhani(info):
-    with sync_playwright() as p:
-        browser = new_browser(p)
-        try:
-            ctx, page = new_page(browser, block_media=False)
+    ready = info["ready"]
+    try:
+        with site_page("rajdhani", block_media=False) as (ctx, page):
             page.goto(info["epaper_url"], wait_until="domcontentloaded", timeout=60000)
-            time.sleep(10)
-            page.click(info["more_button_selector"])
-            time.sleep(10)
-            el = page.query_selector(info["download_button_selector"])
+            wait_ready(page, ready["load"], "rajdhani load")
+            el = wait_ready(page, ready["open"], "rajdhani open",
+                            action=lambda: page.click(info["more_button_selector"]))
             return el.get_attribute("href") if el else None
-        except Exception as e:
-            print(f"  rajdhani error: {e}")
-        finally:
-            browser.close()
+    except Exception as e:
+        print(f"  rajdhani error: {e}")
     return None
 
 
 def get_pdf_url_apandainik(info):
-    with sync_playwright() as p:
-        browser = new_browser(p)
-        try:
-            ctx, page = new_page(browser, block_media=False)
+    ready = info["ready"]
+    try:
+        with site_page("apandainik", block_media=False) as (ctx, page):
             page.goto(info["epaper_url"], wait_until="domcontentloaded", timeout=60000)
-            time.sleep(10)
-            thumb = page.query_selector(info["thumbnail_selector"])
-            if thumb:
-                thumb.scroll_into_view_if_needed()
-                time.sleep(1)
-                thumb.click()
-                time.sleep(10)
-            el = page.query_selector(info["download_button_selector"])
+            thumb = wait_ready(page, ready["load"], "apandainik load")
+            if not thumb:
+                return None
+            thumb.scroll_into_view_if_needed()
+            el = wait_ready(page, ready["open"], "apandainik open", action=thumb.click)
             return el.get_attribute("href") if el else None
-        except Exception as e:
-            print(f"  apandainik error: {e}")
-        finally:
-            browser.close()
+    except Exception as e:
+        print(f"  apandainik error: {e}")
     return None
 
 
 def get_pdf_url_samacharpata(info):
-    """Intercept PDF network requests."""
-    pdf_url = None
-    with sync_playwright() as p:
-        browser = p.chromium.launch(headless=True, args=BROWSER_ARGS)
-        try:
-            ctx = browser.new_context(viewport={"width": 1280, "height": 800})
-
-            def handle_response(response):
-                nonlocal pdf_url
-                if response.status == 206 and response.url.lower().endswith(".pdf"):
-                    pdf_url = response.url
-
-            ctx.on("response", handle_response)
-            page = ctx.new_page()
+    """Intercept the PDF response the viewer requests after the click."""
+    ready = info["ready"]
+    try:
+        with site_page("samacharpata", block_media=False) as (ctx, page):
             page.goto(info["epaper_url"], wait_until="domcontentloaded", timeout=60000)
-            time.sleep(5)
-            btn = page.query_selector("a > div.box-shadow.epaper-img")
-            if btn:
-                btn.scroll_into_view_if_needed()
-                time.sleep(1)
-                btn.click()
-                time.sleep(25)
-        except Exception as e:
-            print(f"  samacharpata error: {e}")
-        finally:
-            browser.close()
-    return pdf_url
-
-
+            btn = wait_ready(page, ready["load"], "samacharpata load")
+            if not btn:
+                return None
+            btn.scroll_into_view_if_needed()
+            return wait_ready(page, ready["pdf"], "samacharpata pdf", action=btn.click)
+    except Exception as e:
+        print(f"  samacharpata error: {e}")
+    return None
 
-def scrape_today():
-    tz        = pytz.timezone("Asia/Kathmandu")
-    today     = datetime.now(tz)
-    today_str = today.strftime("%Y-%m-%d")
-    print(f"Scraping for {today_str}...")
 
-    init_db()
-    conn = sqlite3.connect(PAPER_DB_PATH)
-    conn.execute("PRAGMA foreign_keys = ON")
+def discover_pdf(key, info, today):
+    """Returns (pdf_url, None), (None, local_pdf_path) or None."""
+    pdf_url   = None
+    pdf_local = None
 
-    for key, info in NEWSPAPERS.items():
-        name         = info["name"]
-        language     = info.get("language", "np")
-        save_date_str = today_str
+    if key in ("gorkhapatra", "risingnepal"):
+        pdf_url = get_pdf_url_gorkhapatra_rising(key, info)
 
-        if info.get("use_yesterday"):
-            save_date_str = (today - timedelta(days=1)).strftime("%Y-%m-%d")
+    elif key == "nayapatrika":
+        pdf_url = get_pdf_url_nayapatrika(info, today)
 
-        print(f"\n── {name} ──")
-        pdf_url   = None
-        pdf_local = None  
+    elif key in ("kantipur", "kathmandupost"):
+        y, m, d = today.strftime("%Y"), today.strftime("%m"), today.strftime("%d")
+        pdf_url = info["download_url_pattern"].format(y=y, m=m, d=d)
 
-        try:
-            if key in ("gorkhapatra", "risingnepal"):
-                pdf_url = get_pdf_url_gorkhapatra_rising(key, info)
+    elif key == "nagarik":
+        tz_naive   = pytz.timezone("Asia/Kathmandu")
+        base_date  = tz_naive.localize(datetime.strptime(info["base_date"], "%Y-%m-%d"))
+        days_offset = (today - base_date).days
+        epaper_id  = info["base_id"] + days_offset
+        pdf_url    = info["epaper_base_url"] + str(epaper_id)
 
-            elif key == "nayapatrika":
-                pdf_url = get_pdf_url_nayapatrika(info, today)
+    elif key == "abhiyandaily":
+        pdf_local = get_pdf_url_abhiyandaily(info)
 
-            elif key in ("kantipur", "kathmandupost"):
-                y, m, d = today.strftime("%Y"), today.strftime("%m"), today.strftime("%d")
-                pdf_url = info["download_url_pattern"].format(y=y, m=m, d=d)
+    elif key == "karobardaily":
+        pdf_url = get_pdf_url_karobardaily(info)
 
-            elif key == "nagarik":
-                tz_naive   = pytz.timezone("Asia/Kathmandu")
-                base_date  = tz_naive.localize(datetime.strptime(info["base_date"], "%Y-%m-%d"))
-                days_offset = (today - base_date).days
-                epaper_id  = info["base_id"] + days_offset
-                pdf_url    = info["epaper_base_url"] + str(epaper_id)
+    elif key == "himalayatimes":
+        pdf_url = get_pdf_url_himalayatimes(info)
 
-            elif key == "abhiyandaily":
-                pdf_local = get_pdf_url_abhiyandaily(info)
+    elif key == "souryadaily":
+        pdf_url = get_pdf_url_souryadaily(info)
 
-            elif key == "karobardaily":
-                pdf_url = get_pdf_url_karobardaily(info)
+    elif key == "annapurnapost":
+        pdf_url = get_pdf_url_annapurnapost(info)
 
-            elif key == "himalayatimes":
-                pdf_url = get_pdf_url_himalayatimes(info)
+    elif key == "rajdhani":
+        pdf_url = get_pdf_url_rajdhani(info)
 
-            elif key == "souryadaily":
-                pdf_url = get_pdf_url_souryadaily(info)
+    elif key == "apandainik":
+        pdf_url = get_pdf_url_apandainik(info)
 
-            elif key == "annapurnapost":
-                pdf_url = get_pdf_url_annapurnapost(info)
+    elif key == "samacharpata":
+        pdf_url = get_pdf_url_samacharpata(info)
 
-            elif key == "rajdhani":
-                pdf_url = get_pdf_url_rajdhani(info)
+    else:
+        with host_limiter.slot(info.get("list_url", "")):
+            r = get_session().get(info.get("list_url", ""), verify=False, timeout=30)
+        if r.status_code == 200:
+            soup = BeautifulSoup(r.text, "lxml")
+            tag  = soup.select_one(info["selector"])
+            if tag and tag.get("href"):
+                pdf_url = tag["href"]
 
-            elif key == "apandainik":
-                pdf_url = get_pdf_url_apandainik(info)
+    if pdf_local:
+        return None, pdf_local
+    if not pdf_url:
+        print(f"  No PDF URL found for {info['name']}")
+        return None
+    print(f"  {info['name']} URL: {pdf_url}")
+    return pdf_url, None
 
-            elif key == "samacharpata":
-                pdf_url = get_pdf_url_samacharpata(info)
 
-            else:
+def store_local_pdf(pdf_local, date_str, key):
+    dest_path = os.path.join(PAPER_PDF_DIR, f"{date_str}_{key}.pdf")
+    if os.path.exists(dest_path):
+        os.remove(dest_path)
+    os.rename(pdf_local, dest_path)
+    return dest_path
 
-                r = requests.get(info.get("list_url", ""), verify=False, timeout=30)
-                if r.status_code == 200:
-                    soup = BeautifulSoup(r.text, "lxml")
-                    tag  = soup.select_one(info["selector"])
-                    if tag and tag.get("href"):
-                        pdf_url = tag["href"]
 
-            if pdf_local:
-                dest_path  = os.path.join(PAPER_PDF_DIR, f"{save_date_str}_{key}.pdf")
-                if os.path.exists(dest_path):
-                    os.remove(dest_path)
-                os.rename(pdf_local, dest_path)
-                thumb_dest = os.path.join(PAPER_THUMB_DIR, f"{save_date_str}_{key}.jpg")
-                thumb_path = make_thumbnail(dest_path, save_date_str, key, thumb_dest)
-                save_paper(conn, key, name, language, save_date_str, dest_path, thumb_path)
-                continue
+def scrape_today():
+    tz        = pytz.timezone("Asia/Kathmandu")
+    today     = datetime.now(tz)
+    today_str = today.strftime("%Y-%m-%d")
+    print(f"Scraping for {today_str}...")
 
-            if not pdf_url:
-                print(f"  No PDF URL found for {name}")
-                continue
+    init_db()
+    conn = sqlite3.connect(PAPER_DB_PATH)
+    conn.execute("PRAGMA foreign_keys = ON")
 
-            print(f"  URL: {pdf_url}")
-            pdf_path, thumb_path = download_pdf(pdf_url, save_date_str, key)
-            if pdf_path:
-                save_paper(conn, key, name, language, save_date_str, pdf_path, thumb_path)
+    timer     = StageTimer()
+    run_start = time.monotonic()
 
-        except Exception as e:
-            print(f"  Error for {name}: {e}")
+    browser_pools  = [ThreadPoolExecutor(1, thread_name_prefix=f"browser{i}")
+                      for i in range(BROWSER_WORKERS)]
+    browser_lanes  = cycle(browser_pools)
+    discover_pool  = ThreadPoolExecutor(DISCOVERY_WORKERS, thread_name_prefix="discover")
+    download_pool  = ThreadPoolExecutor(DOWNLOAD_WORKERS,  thread_name_prefix="download")
+    thumbnail_pool = ThreadPoolExecutor(THUMBNAIL_WORKERS, thread_name_prefix="thumbnail")
+    text_pool      = ThreadPoolExecutor(TEXT_WORKERS,      thread_name_prefix="text")
+    pending = {}  # future -> (stage, key, issue date, local pdf path)
 
-        time.sleep(3) 
+    for key, info in NEWSPAPERS.items():
+        save_date_str = today_str
+        if info.get("use_yesterday"):
+            save_date_str = (today - timedelta(days=1)).strftime("%Y-%m-%d")
+        pool   = next(browser_lanes) if key in BROWSER_PAPERS else discover_pool
+        future = pool.submit(timer.run, "discover", discover_pdf, key, info, today)
+        pending[future] = ("discover", key, save_date_str, None)
 
-    conn.close()
+    try:
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                stage, key, save_date_str, pdf_path = pending.pop(future)
+                info = NEWSPAPERS[key]
+                try:
+                    result = future.result()
+                except Exception as e:
+                    print(f"  Error for {info['name']} ({stage}): {e}")
+                    continue
+                if not result:
+                    continue
+
+                if stage == "discover":
+                    pdf_url, pdf_local = result
+                    if pdf_local is None:
+                        nxt = download_pool.submit(timer.run, "download", download_pdf,
+                                                   pdf_url, save_date_str, key)
+                        pending[nxt] = ("download", key, save_date_str, None)
+                        continue
+                    stage, result = "download", (store_local_pdf(pdf_local, save_date_str, key), None)
+
+                if stage == "download":
+                    pdf_path, verified = result
+                    if verified and is_duplicate(conn, key, info["name"], save_date_str, verified[0]):
+                        discard_files(pdf_path)
+                        continue
+                    nxt = thumbnail_pool.submit(timer.run, "thumbnail", finish_pdf,
+                                                pdf_path, save_date_str, key, verified)
+                    pending[nxt] = ("thumbnail", key, save_date_str, pdf_path)
+
+                elif stage == "thumbnail":
+                    thumb_path, verified, variants = result
+                    issue_id = timer.run("write", save_paper, conn, key, info["name"],
+                                         info.get("language", "np"), save_date_str,
+                                         pdf_path, thumb_path, verified)
+                    if issue_id is None:  # browser-saved PDF only hashed in finish_pdf
+                        discard_files(pdf_path, thumb_path, variants)
+                        continue
+                    if variants:
+                        record_variants(conn, os.path.basename(thumb_path), variants)
+                    nxt = text_pool.submit(timer.run, "text", extract_issue,
+                                           issue_id, pdf_path, verified[0])
+                    pending[nxt] = ("text", key, save_date_str, pdf_path)
+
+                elif stage == "text":
+                    timer.run("write", save_pages, conn, *result)
+    finally:
+        closing = [pool.submit(close_shared_browser) for pool in browser_pools]
+        for future in closing:
+            future.result()
+        for pool in (*browser_pools, discover_pool, download_pool, thumbnail_pool, text_pool):
+            pool.shutdown(wait=True, cancel_futures=True)
+        shutdown_pool()
+        conn.close()
+
+    timer.summary(time.monotonic() - run_start)
+    HTTP_STATS.report()
     print("\nFinished")
 
 
@@ -1,25 +1,35 @@
-from playwright.sync_api import sync_playwright
 from urllib.parse import urlparse
 import sqlite3
 import os
 from datetime import datetime
-import json
 import time
-import requests
-from google.genai import Client
-
-client = Client(api_key="")
+import sys
+import asyncio
+# helpers shared with the root scrapers (http_session, thumbnails, ...) live one level up
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from archive_calendar import refresh_days
+from archive_generation import init_generation
+from http_session import STATS as HTTP_STATS, async_client
+from browser_pool import AsyncSharedBrowser
+from readiness import async_wait_ready
+from image_variants import init_variants, record_variants, try_variants
+from search_index import FTS_TOKENIZE, drop_stale_fts
+from summarizers import SummarizerError, get_summarizer
+from summary_cache import SummaryCache
+
+# gemini (default), local (offline TF-IDF/TextRank) or stub; see summarizers.py
+SUMMARIZER_BACKEND = os.environ.get("ARCHIVE_SUMMARIZER", "gemini")
 
 NEWS_PORTALS = {
-    "onlinekhabar":  {"name": "Online Khabar",      "url": "https://www.onlinekhabar.com/",                   "selector": "section.ok-bises.ok-bises-type-2 h2",                         "link_tag": "a", "language": "np"},
-    "baahrakhari":   {"name": "Baahrakhari",         "url": "https://baahrakhari.com/",                        "selector": "section.section.breaking-section.break-section div.container", "link_tag": "a", "language": "np"},
-    "deshsanchar":   {"name": "Desh Sanchar",        "url": "https://deshsanchar.com/",                        "selector": "section.fp-special-news-section div.ds-container",            "link_tag": "a", "language": "np"},
-    "annapurnapost": {"name": "Annapurna Post",      "url": "https://annapurnapost.com/",                      "selector": "div.ap__breakingNews div.breaking__news",                     "link_tag": "a", "language": "np"},
-    "setopati":      {"name": "Setopati",            "url": "https://www.setopati.com/",                       "selector": "section.section.breaking-news",                               "link_tag": "a", "language": "np"},
-    "ratopati":      {"name": "Ratopati",            "url": "https://www.ratopati.com/category/headline-news", "selector": "div.samachar-section",                                        "link_tag": "a", "language": "np"},
-    "ujyaaloonline": {"name": "Ujyaalo Online",      "url": "https://ujyaaloonline.com/",                      "selector": "div.home-news-section",                                       "link_tag": "a", "language": "np"},
-    "nagariknews":   {"name": "Nagarik News",        "url": "https://nagariknews.nagariknetwork.com/",         "selector": "div.text-center.border-bottom.pb-4",                          "link_tag": "a", "language": "np"},
-    "himalyantimes": {"name": "The Himalayan Times", "url": "https://thehimalayantimes.com/",                  "selector": "div.ht-homepage-left-one-article",                            "link_tag": "a", "language": "en"},
+    "onlinekhabar":  {"name": "Online Khabar",      "url": "https://www.onlinekhabar.com/",                   "selector": "section.ok-bises.ok-bises-type-2 h2",                         "link_tag": "a", "language": "np", "ready": {"visible": "section.ok-bises.ok-bises-type-2 h2", "network_idle": True, "timeout": 30}},
+    "baahrakhari":   {"name": "Baahrakhari",         "url": "https://baahrakhari.com/",                        "selector": "section.section.breaking-section.break-section div.container", "link_tag": "a", "language": "np", "ready": {"visible": "section.section.breaking-section.break-section div.container"}},
+    "deshsanchar":   {"name": "Desh Sanchar",        "url": "https://deshsanchar.com/",                        "selector": "section.fp-special-news-section div.ds-container",            "link_tag": "a", "language": "np", "ready": {"visible": "section.fp-special-news-section div.ds-container"}},
+    "annapurnapost": {"name": "Annapurna Post",      "url": "https://annapurnapost.com/",                      "selector": "div.ap__breakingNews div.breaking__news",                     "link_tag": "a", "language": "np", "ready": {"visible": "div.ap__breakingNews div.breaking__news"}},
+    "setopati":      {"name": "Setopati",            "url": "https://www.setopati.com/",                       "selector": "section.section.breaking-news",                               "link_tag": "a", "language": "np", "ready": {"visible": "section.section.breaking-news", "network_idle": True, "timeout": 30}},
+    "ratopati":      {"name": "Ratopati",            "url": "https://www.ratopati.com/category/headline-news", "selector": "div.samachar-section",                                        "link_tag": "a", "language": "np", "ready": {"visible": "div.samachar-section", "network_idle": True, "timeout": 30}},
+    "ujyaaloonline": {"name": "Ujyaalo Online",      "url": "https://ujyaaloonline.com/",                      "selector": "div.home-news-section",                                       "link_tag": "a", "language": "np", "ready": {"visible": "div.home-news-section"}},
+    "nagariknews":   {"name": "Nagarik News",        "url": "https://nagariknews.nagariknetwork.com/",         "selector": "div.text-center.border-bottom.pb-4",                          "link_tag": "a", "language": "np", "ready": {"visible": "div.text-center.border-bottom.pb-4"}},
+    "himalyantimes": {"name": "The Himalayan Times", "url": "https://thehimalayantimes.com/",                  "selector": "div.ht-homepage-left-one-article",                            "link_tag": "a", "language": "en", "ready": {"visible": "div.ht-homepage-left-one-article", "network_idle": True, "timeout": 30}},
 }
 
 BASE_DIR  = os.path.dirname(os.path.abspath(__file__))
@@ -28,10 +38,9 @@ THUMB_DIR = os.path.join(BASE_DIR, "portal_archive", "thumbnails")
 os.makedirs(THUMB_DIR, exist_ok=True)
 os.makedirs(os.path.dirname(DB_PATH), exist_ok=True)
 
-BROWSER_ARGS = [
-    "--no-sandbox", "--disable-gpu", "--mute-audio", "--disable-dev-shm-usage",
-]
-
+# Per-service concurrency limits for the asyncio pipeline. Portals are
+# captured concurrently in one Chromium; text fetches and summaries overlap.
+CONCURRENCY = {"browser": 3, "jina": 4, "summarize": 4}
 
 def init_db():
     conn = sqlite3.connect(DB_PATH)
@@ -55,15 +64,11 @@ def init_db():
             summary_np TEXT, keywords_np TEXT,
             first_seen_date TEXT NOT NULL CHECK (first_seen_date LIKE '____-__-__')
         );
-        CREATE TABLE IF NOT EXISTS headline_snapshots (
-            snapshot_id INTEGER PRIMARY KEY AUTOINCREMENT,
-            scrape_datetime TEXT NOT NULL,
-            portal_key TEXT NOT NULL REFERENCES portals(portal_key),
-            article_id INTEGER NOT NULL REFERENCES articles(article_id),
-            thumbnail_filename TEXT, thumbnail_path TEXT,
-            UNIQUE (scrape_datetime, portal_key)
-        );
+        CREATE INDEX IF NOT EXISTS idx_articles_first_seen ON articles (first_seen_date);
     """)
+    migrate_headline_snapshots(conn)
+    init_search_index(c)
+    init_variants(conn)
     for key, cfg in NEWS_PORTALS.items():
         c.execute("""
             INSERT INTO portals (portal_key,portal_name,base_url,selector,link_tag,language)
@@ -72,10 +77,87 @@ def init_db():
                 portal_name=excluded.portal_name, base_url=excluded.base_url,
                 selector=excluded.selector, link_tag=excluded.link_tag, language=excluded.language
         """, (key, cfg["name"], cfg["url"], cfg["selector"], cfg["link_tag"], cfg["language"]))
+    init_generation(conn, ("portals", "articles", "headline_snapshots", "thumbnail_variants"))
     conn.commit()
     conn.close()
 
 
+SNAPSHOTS_SCHEMA = """
+    CREATE TABLE {name} (
+        snapshot_id INTEGER PRIMARY KEY AUTOINCREMENT,
+        scrape_datetime TEXT NOT NULL,
+        scrape_date TEXT GENERATED ALWAYS AS (substr(scrape_datetime, 1, 10)) STORED,
+        portal_key TEXT NOT NULL REFERENCES portals(portal_key),
+        article_id INTEGER NOT NULL REFERENCES articles(article_id),
+        thumbnail_filename TEXT, thumbnail_path TEXT,
+        UNIQUE (scrape_datetime, portal_key)
+    );
+"""
+SNAPSHOT_COLS = "snapshot_id, scrape_datetime, portal_key, article_id, thumbnail_filename, thumbnail_path"
+
+
+def migrate_headline_snapshots(conn):
+    """Same scrape_date migration as the Selenium scraper (copy-and-rename)."""
+    cols = [r[1] for r in conn.execute("PRAGMA table_xinfo(headline_snapshots)")]
+    if not cols:
+        conn.executescript(SNAPSHOTS_SCHEMA.format(name="headline_snapshots"))
+    elif "scrape_date" not in cols:
+        conn.execute("PRAGMA foreign_keys = OFF")
+        conn.executescript(f"""
+            BEGIN;
+            {SNAPSHOTS_SCHEMA.format(name="headline_snapshots_new")}
+            INSERT INTO headline_snapshots_new ({SNAPSHOT_COLS}) SELECT {SNAPSHOT_COLS} FROM headline_snapshots;
+            DROP TABLE headline_snapshots;
+            ALTER TABLE headline_snapshots_new RENAME TO headline_snapshots;
+            COMMIT;
+        """)
+        conn.execute("PRAGMA foreign_keys = ON")
+    conn.executescript("""
+        CREATE INDEX IF NOT EXISTS idx_snapshots_date_portal ON headline_snapshots (scrape_date, portal_key, article_id);
+        CREATE INDEX IF NOT EXISTS idx_snapshots_article ON headline_snapshots (article_id);
+    """)
+
+
+FTS_COLUMNS = ("title", "summary_en", "summary_np", "keywords_en", "keywords_np", "clean_content")
+
+
+def init_search_index(c):
+    """articles_fts + sync triggers; same layout as the Selenium scraper's index."""
+    drop_stale_fts(c, "articles_fts")
+    exists = c.execute("SELECT 1 FROM sqlite_master WHERE type='table' AND name='articles_fts'").fetchone()
+    cols = ", ".join(FTS_COLUMNS)
+    new_vals = ", ".join(f"new.{col}" for col in FTS_COLUMNS)
+    old_vals = ", ".join(f"old.{col}" for col in FTS_COLUMNS)
+    c.executescript(f"""
+        CREATE VIRTUAL TABLE IF NOT EXISTS articles_fts USING fts5(
+            {cols}, content='articles', content_rowid='article_id',
+            tokenize="{FTS_TOKENIZE}", prefix='2 3'
+        );
+        CREATE TRIGGER IF NOT EXISTS articles_fts_ai AFTER INSERT ON articles BEGIN
+            INSERT INTO articles_fts (rowid, {cols}) VALUES (new.article_id, {new_vals});
+        END;
+        CREATE TRIGGER IF NOT EXISTS articles_fts_ad AFTER DELETE ON articles BEGIN
+            INSERT INTO articles_fts (articles_fts, rowid, {cols}) VALUES ('delete', old.article_id, {old_vals});
+        END;
+        CREATE TRIGGER IF NOT EXISTS articles_fts_au AFTER UPDATE ON articles BEGIN
+            INSERT INTO articles_fts (articles_fts, rowid, {cols}) VALUES ('delete', old.article_id, {old_vals});
+            INSERT INTO articles_fts (rowid, {cols}) VALUES (new.article_id, {new_vals});
+        END;
+    """)
+    if not exists:
+        c.execute("INSERT INTO articles_fts (articles_fts) VALUES ('rebuild')")
+
+
+def rebuild_search_index():
+    init_db()
+    conn = sqlite3.connect(DB_PATH)
+    conn.execute("INSERT INTO articles_fts (articles_fts) VALUES ('rebuild')")
+    conn.execute("INSERT INTO articles_fts (articles_fts) VALUES ('optimize')")
+    conn.commit()
+    conn.close()
+    print("Search index rebuilt")
+
+
 def extract_title(text):
     for line in (text or "").splitlines():
         s = line.strip()
@@ -84,37 +166,47 @@ def extract_title(text):
     return ""
 
 
-def get_clean_article_text(url):
+def known_article(c, article_url):
+    return c.execute("""
+        SELECT clean_content, summary_en, keywords_en, summary_np, keywords_np
+        FROM articles WHERE article_url = ?
+    """, (article_url,)).fetchone()
+
+
+async def get_clean_article_text(http, url, limit):
     if not url:
         return ""
-    try:
-        r = requests.get(f"https://r.jina.ai/{url}", timeout=16,
-                         headers={"User-Agent": "Mozilla/5.0 (compatible; NewsBot/1.0)"})
-        r.raise_for_status()
-        return r.text.strip()
-    except Exception as e:
-        print(f"  Jina failed: {e}")
-        return ""
+    async with limit:
+        try:
+            r = await http.get(f"https://r.jina.ai/{url}", timeout=16,
+                               headers={"User-Agent": "Mozilla/5.0 (compatible; NewsBot/1.0)"})
+            r.raise_for_status()
+            return r.text.strip()
+        except Exception as e:
+            print(f"  Jina failed: {e}")
+            return ""
 
 
-def summarize_with_gemini(url, lang="en"):
-    if not url:
-        return "", ""
-    if lang == "en":
-        prompt = f'Summarize the news at this URL in English (90-110 words). Extract 5-10 keywords. Return ONLY JSON no markdown: {{"summary":"...","keywords":"kw1,kw2"}} URL: {url}'
-    else:
-        prompt = f'यो URL को समाचार नेपालीमा संक्षिप्त गर्नुहोस् (९०-११० शब्द)। ५-१० किवर्ड दिनुहोस्। केवल JSON फर्काउनुहोस् no markdown: {{"summary":"...","keywords":"kw1,kw2"}} URL: {url}'
-    try:
-        raw = client.models.generate_content(model="gemini-2.5-flash", contents=prompt).text.strip()
-        raw = raw.replace("```json", "").replace("```", "").strip()
-        s, e = raw.find("{"), raw.rfind("}") + 1
-        if s == -1 or e <= s:
-            return "", ""
-        d = json.loads(raw[s:e])
-        return d.get("summary", "").strip(), d.get("keywords", "").strip()
-    except Exception as ex:
-        print(f"  Gemini {lang.upper()} failed: {str(ex)[:100]}")
-        return "", ""
+async def summarize_article(summarizer, cache, url, clean_text, limit):
+    """Both summaries from summarizers.py, or from the content-hash cache when known.
+
+    The backends are blocking, so the call runs in a worker thread; the cache
+    stays on the event loop's thread, which owns its connection.
+    """
+    cached = cache.get(clean_text, summarizer.model)
+    if cached:
+        cache.stats["content"] += 1
+        return tuple(cached)
+
+    cache.stats["miss"] += 1
+    async with limit:
+        try:
+            result = await asyncio.to_thread(summarizer.summarize, url, clean_text)
+        except SummarizerError as e:
+            print(f"  {summarizer.name} summary failed: {e}")
+            result = ("",) * 4  # left for summarize_backlog.py
+    cache.put(clean_text, summarizer.model, *result)
+    return result
 
 
 def fix_url(href, portal_url):
@@ -128,88 +220,125 @@ def fix_url(href, portal_url):
     return ""
 
 
-def scrape_portal(key, portal, conn, now, date_str, live_str):
-    c = conn.cursor()
-    with sync_playwright() as p:
-        browser = p.chromium.launch(headless=True, args=BROWSER_ARGS)
-        try:
-            context = browser.new_context(
-                viewport={"width": 1024, "height": 768},
-                user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 Chrome/122.0.0.0 Safari/537.36"
-            )
-            context.route("**/*", lambda route, req:
-                route.abort() if req.resource_type in ("media")
-                else route.continue_())
-
-            page = context.new_page()
-            page.goto(portal["url"], wait_until="domcontentloaded", timeout=60000)
-
-            wait_secs = 12 if key in ("onlinekhabar", "ratopati", "himalyantimes", "setopati") else 7
-            time.sleep(wait_secs)
-
-            el = page.wait_for_selector(portal["selector"], timeout=22000)
-            if not el:
-                print(f"{portal['name']:22} -> selector not found\n")
-                return
+async def capture_portal(browser, key, portal, now, date_str, limit):
+    """Screenshot the headline block; returns (article_url, filename, thumb_path) or None."""
+    async with limit, browser.site(key, block=("media",),
+                                    viewport={"width": 1024, "height": 768}) as context:
+        page = await context.new_page()
+        await page.goto(portal["url"], wait_until="domcontentloaded", timeout=60000)
+
+        if not await async_wait_ready(page, portal["ready"], key):
+            print(f"{portal['name']:22} -> selector not found\n")
+            return None
+        el = await page.query_selector(portal["selector"])
+
+        await el.scroll_into_view_if_needed()
+        filename   = f"{key}_{date_str}_{now.strftime('%H%M%S')}.png"
+        thumb_path = os.path.join(THUMB_DIR, filename)
+        await el.screenshot(path=thumb_path)
+
+        link_el     = await el.query_selector(portal["link_tag"])
+        raw_href    = await link_el.get_attribute("href") if link_el else ""
+        article_url = fix_url(raw_href, portal["url"])
+
+    if not article_url:
+        print(f"  Invalid URL skipped: {raw_href!r}\n")
+        return None
+    return article_url, filename, thumb_path
+
+
+async def scrape_portal(browser, http, conn, summarizer, cache, key, portal, now, date_str,
+                        writes, limits):
+    """Capture one portal, then fetch its article text and summaries while the
+    thumbnail's srcset variants are made.
+
+    As in the Selenium scraper, an article already in the archive skips Jina
+    and, once both summaries are stored, the summarizer too. conn is only read
+    here, on the event loop's thread; writes still go through the queue.
+    """
+    async def text_and_summary(article_url):
+        known      = known_article(conn, article_url) or ("",) * 5
+        clean_text = known[0] or await get_clean_article_text(http, article_url, limits["jina"])
+        if all(known[1:]):
+            cache.stats["url"] += 1
+            return clean_text, tuple(known[1:])
+        return clean_text, await summarize_article(summarizer, cache, article_url, clean_text,
+                                                   limits["summarize"])
 
-            el.scroll_into_view_if_needed()
-            filename   = f"{key}_{date_str}_{now.strftime('%H%M%S')}.png"
-            thumb_path = os.path.join(THUMB_DIR, filename)
-            el.screenshot(path=thumb_path)
+    try:
+        captured = await capture_portal(browser, key, portal, now, date_str, limits["browser"])
+        if captured is None:
+            return
+        article_url, filename, thumb_path = captured
+
+        (clean_text, (summary_en, kw_en, summary_np, kw_np)), variants = await asyncio.gather(
+            text_and_summary(article_url),
+            asyncio.to_thread(try_variants, thumb_path),
+        )
+        await writes.put({
+            "key": key, "portal": portal, "article_url": article_url,
+            "title": extract_title(clean_text), "clean_text": clean_text,
+            "summary_en": summary_en, "kw_en": kw_en,
+            "summary_np": summary_np, "kw_np": kw_np,
+            "filename": filename, "thumb_path": thumb_path, "variants": variants,
+        })
+    except Exception as e:
+        print(f"{portal['name']:22} -> {str(e)[:140]}\n")
 
-            link_el     = el.query_selector(portal["link_tag"])
-            raw_href    = link_el.get_attribute("href") if link_el else ""
-            article_url = fix_url(raw_href, portal["url"])
 
-            if not article_url:
-                print(f"  Invalid URL skipped: {raw_href!r}\n")
-                return
+def save_portal_result(conn, r, date_str, live_str):
+    c = conn.cursor()
+    c.execute("""
+        INSERT INTO articles (article_url,portal_key,title,clean_content,
+            summary_en,keywords_en,summary_np,keywords_np,first_seen_date)
+        VALUES (?,?,?,?,?,?,?,?,?)
+        ON CONFLICT(article_url) DO UPDATE SET
+            title=COALESCE(NULLIF(excluded.title,''),articles.title),
+            clean_content=COALESCE(NULLIF(excluded.clean_content,''),articles.clean_content),
+            summary_en=COALESCE(NULLIF(excluded.summary_en,''),articles.summary_en),
+            keywords_en=COALESCE(NULLIF(excluded.keywords_en,''),articles.keywords_en),
+            summary_np=COALESCE(NULLIF(excluded.summary_np,''),articles.summary_np),
+            keywords_np=COALESCE(NULLIF(excluded.keywords_np,''),articles.keywords_np)
+    """, (r["article_url"], r["key"], r["title"], r["clean_text"],
+          r["summary_en"], r["kw_en"], r["summary_np"], r["kw_np"], date_str))
+
+    article_id = c.execute(
+        "SELECT article_id FROM articles WHERE article_url=?", (r["article_url"],)
+    ).fetchone()[0]
+
+    c.execute("""
+        INSERT OR IGNORE INTO headline_snapshots
+            (scrape_datetime,portal_key,article_id,thumbnail_filename,thumbnail_path)
+        VALUES (?,?,?,?,?)
+    """, (live_str, r["key"], article_id, r["filename"], r["thumb_path"]))
+
+    c.execute("UPDATE portals SET last_scraped_at=? WHERE portal_key=?", (live_str, r["key"]))
+    conn.commit()
+    record_variants(conn, r["filename"], r["variants"])
 
-            clean_text        = get_clean_article_text(article_url)
-            title             = extract_title(clean_text)
-            summary_en, kw_en = summarize_with_gemini(article_url, "en")
-            summary_np, kw_np = summarize_with_gemini(article_url, "np")
-
-            c.execute("""
-                INSERT INTO articles (article_url,portal_key,title,clean_content,
-                    summary_en,keywords_en,summary_np,keywords_np,first_seen_date)
-                VALUES (?,?,?,?,?,?,?,?,?)
-                ON CONFLICT(article_url) DO UPDATE SET
-                    title=COALESCE(NULLIF(excluded.title,''),articles.title),
-                    clean_content=COALESCE(NULLIF(excluded.clean_content,''),articles.clean_content),
-                    summary_en=COALESCE(NULLIF(excluded.summary_en,''),articles.summary_en),
-                    keywords_en=COALESCE(NULLIF(excluded.keywords_en,''),articles.keywords_en),
-                    summary_np=COALESCE(NULLIF(excluded.summary_np,''),articles.summary_np),
-                    keywords_np=COALESCE(NULLIF(excluded.keywords_np,''),articles.keywords_np)
-            """, (article_url, key, title, clean_text, summary_en, kw_en, summary_np, kw_np, date_str))
-
-            article_id = c.execute(
-                "SELECT article_id FROM articles WHERE article_url=?", (article_url,)
-            ).fetchone()[0]
-
-            c.execute("""
-                INSERT OR IGNORE INTO headline_snapshots
-                    (scrape_datetime,portal_key,article_id,thumbnail_filename,thumbnail_path)
-                VALUES (?,?,?,?,?)
-            """, (live_str, key, article_id, filename, thumb_path))
-
-            c.execute("UPDATE portals SET last_scraped_at=? WHERE portal_key=?", (live_str, key))
-            conn.commit()
-
-            print(f"{portal['name']:22} | {filename}")
-            print(f"URL   : {article_url[:78]}")
-            print(f"Title : {(title or '(none)')[:72]}")
-            print(f"EN    : {(summary_en or '(empty)')[:65]}")
-            print(f"NP    : {(summary_np or '(empty)')[:65]}")
-            print()
+    print(f"{r['portal']['name']:22} | {r['filename']}")
+    print(f"URL   : {r['article_url'][:78]}")
+    print(f"Title : {(r['title'] or '(none)')[:72]}")
+    print(f"EN    : {(r['summary_en'] or '(empty)')[:65]}")
+    print(f"NP    : {(r['summary_np'] or '(empty)')[:65]}")
+    print()
 
-        except Exception as e:
-            print(f"{portal['name']:22} -> {str(e)[:140]}\n")
+
+async def write_results(conn, writes, date_str, live_str):
+    """Single writer: every SQLite write of the run goes through this queue."""
+    while True:
+        r = await writes.get()
+        try:
+            if r is None:
+                return
+            save_portal_result(conn, r, date_str, live_str)
+        except sqlite3.Error as e:
+            print(f"{r['portal']['name']:22} -> DB error: {e}\n")
         finally:
-            browser.close()
+            writes.task_done()
 
 
-def scrape_today():
+async def scrape_today_async():
     now      = datetime.now()
     date_str = now.strftime("%Y-%m-%d")
     live_str = now.isoformat(timespec="seconds")
@@ -218,13 +347,43 @@ def scrape_today():
     conn = sqlite3.connect(DB_PATH)
     conn.execute("PRAGMA foreign_keys = ON")
 
-    for key, portal in NEWS_PORTALS.items():
-        scrape_portal(key, portal, conn, now, date_str, live_str)
-        time.sleep(3)
+    started    = time.monotonic()
+    cache      = SummaryCache()
+    summarizer = get_summarizer(SUMMARIZER_BACKEND)
+    browser    = AsyncSharedBrowser()
+    writes  = asyncio.Queue()
+    limits  = {name: asyncio.Semaphore(n) for name, n in CONCURRENCY.items()}
+    writer  = asyncio.create_task(write_results(conn, writes, date_str, live_str))
+    try:
+        async with async_client(follow_redirects=True) as http:
+            await asyncio.gather(*(
+                scrape_portal(browser, http, conn, summarizer, cache, key, portal, now, date_str,
+                              writes, limits)
+                for key, portal in NEWS_PORTALS.items()
+            ))
+    finally:
+        await writes.put(None)
+        await writer
+        await browser.close()
+        conn.close()
+        cache.close()
+    cache.report()
+    HTTP_STATS.report()
+
+    try:
+        refresh_days("portal", [date_str], DB_PATH)
+    except Exception as e:
+        print(f"Calendar update failed: {e}")
+
+    print(f"Finished in {time.monotonic() - started:.1f}s")
 
-    conn.close()
-    print("Finished")
+
+def scrape_today():
+    asyncio.run(scrape_today_async())
 
 
 if __name__ == "__main__":
-    scrape_today()
+    if len(sys.argv) > 1 and sys.argv[1] == "rebuild-fts":
+        rebuild_search_index()
+    else:
+        scrape_today()
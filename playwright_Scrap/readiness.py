@@ -0,0 +1,154 @@
+"""Event-driven readiness waits for the Playwright scrapers.
+
+Same spec format as the Selenium helper: each site in NEWSPAPERS /
+NEWS_PORTALS carries a "ready" dict with one condition set per step,
+for example {"load": {"visible": "div.df-ui-more", "timeout": 20}}.
+
+Conditions, checked in this order against one shared deadline:
+
+    visible / clickable   CSS selector is displayed
+    present               CSS selector is attached to the DOM
+    windows               at least this many pages open in the context
+    source                regex found in the newest page's HTML
+    network_idle          no network activity for 500 ms
+    response              regex matching a response URL (200/206)
+    download              a download started
+
+`response` and `download` are caught around the `action` passed to
+wait_ready (usually the click that triggers them), so nothing is missed
+between the click and the wait. async_wait_ready is the same helper for
+pages from playwright.async_api.
+"""
+import asyncio
+import re
+import time
+
+from playwright.sync_api import TimeoutError as PlaywrightTimeoutError
+
+DEFAULT_TIMEOUT = 20
+POLL_MS         = 250
+
+
+def describe(spec):
+    return ", ".join(f"{k}={v}" if v is not True else k
+                     for k, v in spec.items() if k != "timeout")
+
+
+def _remaining_ms(deadline):
+    return max(1, int((deadline - time.monotonic()) * 1000))
+
+
+def _poll(page, deadline, check):
+    while True:
+        value = check()
+        if value:
+            return value
+        if time.monotonic() >= deadline:
+            raise PlaywrightTimeoutError("readiness condition not met")
+        page.wait_for_timeout(POLL_MS)
+
+
+def _wait_page(page, spec, deadline):
+    value = True
+    for state, key in (("visible", "visible"), ("visible", "clickable"), ("attached", "present")):
+        if key in spec:
+            value = page.wait_for_selector(spec[key], state=state, timeout=_remaining_ms(deadline))
+    if "windows" in spec:
+        _poll(page, deadline, lambda: len(page.context.pages) >= spec["windows"])
+    if "source" in spec:
+        regex = re.compile(spec["source"])
+        value = _poll(page, deadline,
+                      lambda: (regex.findall(page.context.pages[-1].content()) or [None])[0])
+    if spec.get("network_idle"):
+        page.wait_for_load_state("networkidle", timeout=_remaining_ms(deadline))
+    return value
+
+
+def wait_ready(page, spec, label, action=None):
+    """Run action (if any), then wait until spec holds or its ceiling passes.
+
+    Returns the element, matched source string, response URL or Download
+    the spec was waiting for (True for plain conditions), None on timeout.
+    """
+    timeout  = spec.get("timeout", DEFAULT_TIMEOUT)
+    start    = time.monotonic()
+    deadline = start + timeout
+    try:
+        if "download" in spec:
+            with page.expect_download(timeout=_remaining_ms(deadline)) as info:
+                action()
+            value = info.value
+        elif "response" in spec:
+            regex = re.compile(spec["response"], re.I)
+            with page.context.expect_event(
+                "response",
+                predicate=lambda r: r.status in (200, 206) and bool(regex.search(r.url)),
+                timeout=_remaining_ms(deadline),
+            ) as info:
+                action()
+            value = info.value.url
+        else:
+            if action is not None:
+                action()
+            value = _wait_page(page, spec, deadline)
+    except PlaywrightTimeoutError:
+        value = None
+
+    elapsed = time.monotonic() - start
+    status  = "ready" if value is not None else "timed out"
+    print(f"[Wait] {label}: {describe(spec)} {status} after {elapsed:.1f}s (ceiling {timeout}s)")
+    return value
+
+
+async def _async_wait_page(page, spec, deadline):
+    value = True
+    for state, key in (("visible", "visible"), ("visible", "clickable"), ("attached", "present")):
+        if key in spec:
+            value = await page.wait_for_selector(spec[key], state=state, timeout=_remaining_ms(deadline))
+    if "windows" in spec:
+        while len(page.context.pages) < spec["windows"]:
+            if time.monotonic() >= deadline:
+                raise PlaywrightTimeoutError("readiness condition not met")
+            await asyncio.sleep(POLL_MS / 1000)
+    if "source" in spec:
+        regex = re.compile(spec["source"])
+        while not (found := regex.findall(await page.context.pages[-1].content())):
+            if time.monotonic() >= deadline:
+                raise PlaywrightTimeoutError("readiness condition not met")
+            await asyncio.sleep(POLL_MS / 1000)
+        value = found[0]
+    if spec.get("network_idle"):
+        await page.wait_for_load_state("networkidle", timeout=_remaining_ms(deadline))
+    return value
+
+
+async def async_wait_ready(page, spec, label, action=None):
+    """wait_ready for async pages; action, if given, is an async callable."""
+    timeout  = spec.get("timeout", DEFAULT_TIMEOUT)
+    start    = time.monotonic()
+    deadline = start + timeout
+    try:
+        if "download" in spec:
+            async with page.expect_download(timeout=_remaining_ms(deadline)) as info:
+                await action()
+            value = await info.value
+        elif "response" in spec:
+            regex = re.compile(spec["response"], re.I)
+            async with page.context.expect_event(
+                "response",
+                predicate=lambda r: r.status in (200, 206) and bool(regex.search(r.url)),
+                timeout=_remaining_ms(deadline),
+            ) as info:
+                await action()
+            value = (await info.value).url
+        else:
+            if action is not None:
+                await action()
+            value = await _async_wait_page(page, spec, deadline)
+    except PlaywrightTimeoutError:
+        value = None
+
+    elapsed = time.monotonic() - start
+    status  = "ready" if value is not None else "timed out"
+    print(f"[Wait] {label}: {describe(spec)} {status} after {elapsed:.1f}s (ceiling {timeout}s)")
+    return value
@@ -1,11 +1,15 @@
+import sys
 import sqlite3
 import os
 from datetime import datetime
 from pathlib import Path
 
-import requests
 from bs4 import BeautifulSoup
-from playwright.sync_api import sync_playwright
+# helpers shared with the root scrapers (http_session, thumbnails, ...) live one level up
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from browser_pool import shared_browser, close_shared_browser
+from http_session import STATS as HTTP_STATS, get_session
+from image_variants import init_variants, record_variants, try_variants
 import json
 
 
@@ -53,6 +57,7 @@ def init_db():
             file_path TEXT NOT NULL
         );
     """)
+    init_variants(conn)
     conn.commit()
     conn.close()
 
@@ -101,6 +106,7 @@ def insert_post(conn, platform_name, title, link, file_path=None):
                 INSERT INTO media_files (post_id, file_path) VALUES (?, ?)
             """, (post_id, str(file_path)))
             conn.commit()
+            record_variants(conn, os.path.basename(file_path), try_variants(str(file_path)))
     except sqlite3.Error as e:
         print(f"error: {e}")
 
@@ -108,7 +114,7 @@ def insert_post(conn, platform_name, title, link, file_path=None):
 def scrape_youtube_trending_nepal(conn):
     url = "https://yt-trends.iamrohit.in/Nepal"
     try:
-        r = requests.get(url, verify=False, timeout=15)
+        r = get_session().get(url, verify=False, timeout=15)
         r.raise_for_status()
         soup = BeautifulSoup(r.text, "lxml")
 
@@ -133,7 +139,7 @@ def scrape_youtube_trending_nepal(conn):
             savepath = THUMB_FOLDER / filename
 
             try:
-                img_data = requests.get(img_url, timeout=10).content
+                img_data = get_session().get(img_url, timeout=10).content
                 savepath.write_bytes(img_data)
                 print(f"Thumbnail saved ")
             except Exception as e:
@@ -152,31 +158,9 @@ def scrape_reddit_top_posts(conn):
     with open(cookies_file, encoding="utf-8") as f:
         cookies_list = json.load(f)
 
-    with sync_playwright() as p:
-        browser = p.chromium.launch(headless=True, args=[
-    		"--no-sandbox",
-    		"--disable-gpu",
-    		"--mute-audio",
-    		"--disable-dev-shm-usage",    
-    	      
-    	
-    		"--disable-extensions",
-    		"--disable-background-networking",
-    		"--disable-default-apps",
-    		"--no-first-run",
-    		"--single-process",     
-	])
-        context = browser.new_context(
-            viewport={"width": 1920, "height": 1080},
-            user_agent=(
-                "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-                "AppleWebKit/537.36 (KHTML, like Gecko) "
-                "Chrome/122.0.0.0 Safari/537.36"
-            )
-        )
+    with shared_browser().site("reddit", block=("font",),
+                               viewport={"width": 1920, "height": 1080}) as context:
         page = context.new_page()
-        page.route("**/*", lambda route, request:
-            route.abort() if request.resource_type == "font" else route.continue_())
 
         page.goto("https://www.reddit.com", wait_until="domcontentloaded", timeout=45000)
         context.add_cookies([
@@ -230,12 +214,15 @@ def scrape_reddit_top_posts(conn):
 
             except Exception as e:
                 print(f"error: {e}")
-        browser.close()
 
 if __name__ == "__main__":
     init_db()
     conn = sqlite3.connect(DB_PATH)
     conn.execute("PRAGMA foreign_keys = ON")
     scrape_youtube_trending_nepal(conn)
-    scrape_reddit_top_posts(conn)
+    try:
+        scrape_reddit_top_posts(conn)
+    finally:
+        close_shared_browser()
     conn.close()
+    HTTP_STATS.report()
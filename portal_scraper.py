@@ -2,17 +2,22 @@ from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
 import sqlite3
 import os
 from datetime import datetime
-import json
-import time
-import requests
+import sys
 
-from google.genai import Client
+from archive_calendar import refresh_days
+from archive_generation import init_generation
+from http_session import STATS as HTTP_STATS, get_session
+from image_variants import init_variants, record_variants, try_variants
+from readiness import wait_ready
+from search_index import FTS_TOKENIZE, drop_stale_fts
+from summarizers import SummarizerError, get_summarizer
+from summary_cache import SummaryCache
 
-client = Client(api_key="api key")
+# gemini (default), local (offline TF-IDF/TextRank) or stub; see summarizers.py
+SUMMARIZER_BACKEND = os.environ.get("ARCHIVE_SUMMARIZER", "gemini")
 
 NEWS_PORTALS = {
     "onlinekhabar": {
@@ -21,6 +26,7 @@ NEWS_PORTALS = {
         "selector": "section.ok-bises.ok-bises-type-2 h2",
         "link_tag": "a",
         "language": "np",
+        "ready": {"visible": "section.ok-bises.ok-bises-type-2 h2", "network_idle": True, "timeout": 30},
     },
     "baahrakhari": {
         "name": "Baahrakhari",
@@ -28,6 +34,7 @@ NEWS_PORTALS = {
         "selector": "section.section.breaking-section.break-section div.container",
         "link_tag": "a",
         "language": "np",
+        "ready": {"visible": "section.section.breaking-section.break-section div.container"},
     },
     "deshsanchar": {
         "name": "Desh Sanchar",
@@ -35,6 +42,7 @@ NEWS_PORTALS = {
         "selector": "section.fp-special-news-section div.ds-container",
         "link_tag": "a",
         "language": "np",
+        "ready": {"visible": "section.fp-special-news-section div.ds-container"},
     },
     "annapurnapost": {
         "name": "Annapurna Post",
@@ -42,6 +50,7 @@ NEWS_PORTALS = {
         "selector": "div.ap__breakingNews div.breaking__news",
         "link_tag": "a",
         "language": "np",
+        "ready": {"visible": "div.ap__breakingNews div.breaking__news"},
     },
     "setopati": {
         "name": "Setopati",
@@ -49,6 +58,7 @@ NEWS_PORTALS = {
         "selector": "section.section.breaking-news",
         "link_tag": "a",
         "language": "np",
+        "ready": {"visible": "section.section.breaking-news", "network_idle": True, "timeout": 30},
     },
     "ratopati": {
         "name": "Ratopati",
@@ -56,6 +66,7 @@ NEWS_PORTALS = {
         "selector": "div.samachar-section",
         "link_tag": "a",
         "language": "np",
+        "ready": {"visible": "div.samachar-section", "network_idle": True, "timeout": 30},
     },
     "ujyaaloonline": {
         "name": "Ujyaalo Online",
@@ -63,6 +74,7 @@ NEWS_PORTALS = {
         "selector": "div.row.text-center.clearfix.bg-white.mb-15",
         "link_tag": "a",
         "language": "np",
+        "ready": {"visible": "div.row.text-center.clearfix.bg-white.mb-15"},
     },
     "nagariknews": {
         "name": "Nagarik News",
@@ -70,6 +82,7 @@ NEWS_PORTALS = {
         "selector": "div.text-center.border-bottom.pb-4",
         "link_tag": "a",
         "language": "np",
+        "ready": {"visible": "div.text-center.border-bottom.pb-4"},
     },
     "himalyantimes": {
         "name": "The Himalayan Times",
@@ -77,6 +90,7 @@ NEWS_PORTALS = {
         "selector": "div.ht-homepage-left-one-article",
         "link_tag": "a",
         "language": "en",
+        "ready": {"visible": "div.ht-homepage-left-one-article", "network_idle": True, "timeout": 30},
     },
 }
 
@@ -121,19 +135,15 @@ def init_db():
                 CHECK (first_seen_date LIKE '____-__-__')
         );
 
-        CREATE TABLE IF NOT EXISTS headline_snapshots (
-            snapshot_id        INTEGER PRIMARY KEY AUTOINCREMENT,
-            scrape_datetime    TEXT    NOT NULL,
-            portal_key         TEXT    NOT NULL
-                REFERENCES portals(portal_key),
-            article_id         INTEGER NOT NULL
-                REFERENCES articles(article_id),
-            thumbnail_filename TEXT,
-            thumbnail_path     TEXT,
-            UNIQUE (scrape_datetime, portal_key)
-        );
+        CREATE INDEX IF NOT EXISTS idx_articles_first_seen
+            ON articles (first_seen_date);
     """)
 
+    migrate_headline_snapshots(conn)
+    init_search_index(c)
+    init_variants(conn)
+    init_generation(conn, ("portals", "articles", "headline_snapshots", "thumbnail_variants"))
+
     for key, cfg in NEWS_PORTALS.items():
         c.execute("""
             INSERT INTO portals
@@ -152,6 +162,134 @@ def init_db():
     conn.close()
 
 
+HEADLINE_SNAPSHOTS_SCHEMA = """
+    CREATE TABLE {name} (
+        snapshot_id        INTEGER PRIMARY KEY AUTOINCREMENT,
+        scrape_datetime    TEXT    NOT NULL,
+        scrape_date        TEXT    GENERATED ALWAYS AS
+            (substr(scrape_datetime, 1, 10)) STORED,
+        portal_key         TEXT    NOT NULL
+            REFERENCES portals(portal_key),
+        article_id         INTEGER NOT NULL
+            REFERENCES articles(article_id),
+        thumbnail_filename TEXT,
+        thumbnail_path     TEXT,
+        UNIQUE (scrape_datetime, portal_key)
+    );
+"""
+
+SNAPSHOT_COPY_COLUMNS = (
+    "snapshot_id, scrape_datetime, portal_key, article_id, "
+    "thumbnail_filename, thumbnail_path"
+)
+
+
+def migrate_headline_snapshots(conn):
+    """Create headline_snapshots, or rebuild an old one to add scrape_date.
+
+    scrape_date is a stored generated copy of DATE(scrape_datetime) so the
+    web app can filter and group by day on an index. SQLite cannot ALTER a
+    stored column into an existing table, hence the copy-and-rename.
+    """
+    cols = [r[1] for r in conn.execute("PRAGMA table_xinfo(headline_snapshots)")]
+
+    if not cols:
+        conn.executescript(HEADLINE_SNAPSHOTS_SCHEMA.format(name="headline_snapshots"))
+    elif "scrape_date" not in cols:
+        print("Migrating headline_snapshots: adding scrape_date ...")
+        conn.execute("PRAGMA foreign_keys = OFF")
+        conn.executescript(f"""
+            BEGIN;
+            {HEADLINE_SNAPSHOTS_SCHEMA.format(name="headline_snapshots_new")}
+            INSERT INTO headline_snapshots_new ({SNAPSHOT_COPY_COLUMNS})
+                SELECT {SNAPSHOT_COPY_COLUMNS} FROM headline_snapshots;
+            DROP TABLE headline_snapshots;
+            ALTER TABLE headline_snapshots_new RENAME TO headline_snapshots;
+            COMMIT;
+        """)
+        conn.execute("PRAGMA foreign_keys = ON")
+
+    conn.executescript("""
+        CREATE INDEX IF NOT EXISTS idx_snapshots_date_portal
+            ON headline_snapshots (scrape_date, portal_key, article_id);
+        CREATE INDEX IF NOT EXISTS idx_snapshots_article
+            ON headline_snapshots (article_id);
+    """)
+
+
+ARTICLE_FTS_COLUMNS = (
+    "title", "summary_en", "summary_np",
+    "keywords_en", "keywords_np", "clean_content",
+)
+
+
+def init_search_index(c):
+    """Create the articles_fts index and the triggers that keep it in sync.
+
+    FTS_TOKENIZE (search_index.py) keeps Devanagari vowel signs and virama
+    inside tokens and splits on the danda, so Nepali and English text share
+    one index. The prefix indexes make the prefix queries built by app.py
+    cheap, which matters for Nepali where postpositions are glued onto the
+    noun (नेपालमा, सरकारले). An index built with an older tokenizer is
+    dropped and rebuilt.
+    """
+    drop_stale_fts(c, "articles_fts")
+    exists = c.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'articles_fts'"
+    ).fetchone()
+
+    cols     = ", ".join(ARTICLE_FTS_COLUMNS)
+    new_vals = ", ".join(f"new.{col}" for col in ARTICLE_FTS_COLUMNS)
+    old_vals = ", ".join(f"old.{col}" for col in ARTICLE_FTS_COLUMNS)
+
+    c.executescript(f"""
+        CREATE VIRTUAL TABLE IF NOT EXISTS articles_fts USING fts5(
+            {cols},
+            content       = 'articles',
+            content_rowid = 'article_id',
+            tokenize      = "{FTS_TOKENIZE}",
+            prefix        = '2 3'
+        );
+
+        CREATE TRIGGER IF NOT EXISTS articles_fts_ai AFTER INSERT ON articles BEGIN
+            INSERT INTO articles_fts (rowid, {cols})
+            VALUES (new.article_id, {new_vals});
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS articles_fts_ad AFTER DELETE ON articles BEGIN
+            INSERT INTO articles_fts (articles_fts, rowid, {cols})
+            VALUES ('delete', old.article_id, {old_vals});
+        END;
+
+        CREATE TRIGGER IF NOT EXISTS articles_fts_au AFTER UPDATE ON articles BEGIN
+            INSERT INTO articles_fts (articles_fts, rowid, {cols})
+            VALUES ('delete', old.article_id, {old_vals});
+            INSERT INTO articles_fts (rowid, {cols})
+            VALUES (new.article_id, {new_vals});
+        END;
+    """)
+
+    # The update/delete triggers assume every existing row is already indexed,
+    # so an index added to an existing database must be filled straight away.
+    if not exists:
+        c.execute("INSERT INTO articles_fts (articles_fts) VALUES ('rebuild')")
+
+
+def rebuild_search_index():
+    """One-shot backfill of articles_fts from the articles table.
+
+    init_db() first recreates an index built with an older tokenizer.
+    """
+    init_db()
+    conn = sqlite3.connect(DB_PATH)
+    conn.execute("INSERT INTO articles_fts (articles_fts) VALUES ('rebuild')")
+    conn.execute("INSERT INTO articles_fts (articles_fts) VALUES ('optimize')")
+    conn.commit()
+    total = conn.execute("SELECT COUNT(*) FROM articles").fetchone()[0]
+    conn.close()
+    print(f"Search index rebuilt for {total} articles")
+
+
 def extract_title_from_jina_text(text: str) -> str:
     """Return text after the first 'Title:' line in Jina-cleaned output."""
     if not text:
@@ -167,7 +305,7 @@ def get_clean_article_text(url: str) -> str:
     if not url:
         return ""
     try:
-        resp = requests.get(
+        resp = get_session().get(
             f"https://r.jina.ai/{url}",
             timeout=16,
             headers={"User-Agent": "Mozilla/5.0 (compatible; NewsBot/1.0)"},
@@ -179,40 +317,40 @@ def get_clean_article_text(url: str) -> str:
         return ""
 
 
-def summarize_with_gemini(url: str, lang: str = "en") -> tuple[str, str]:
-    if not url:
-        return "", ""
-
-    if lang == "en":
-        prompt = f"""Summarize the main news article at this URL in English.
-                    Be concise (max 90-110 words). Focus on key facts.
-                    Extract 5-10 important keywords (comma separated).
-                    Return ONLY valid JSON with no markdown fences:
-                    {{"summary": "...", "keywords": "kw1,kw2,kw3"}}
-                    URL: {url}"""
-    else:
-        prompt = f"""यो URL मा रहेको मुख्य समाचारको नेपालीमा संक्षिप्त सारांश लेख्नुहोस्।
-                    अधिकतम ९०-११० शब्द। मुख्य तथ्यमा केन्द्रित रहनुहोस्।
-                    ५-१० मुख्य किवर्डहरू कमाले छुट्ट्याएर दिनुहोस्।
-                    केवल valid JSON फर्काउनुहोस् — markdown fence नराख्नुस्:
-                    {{"summary": "...", "keywords": "kw1,kw2,kw3"}}
-                    URL: {url}"""
+def known_article(c, article_url):
+    return c.execute("""
+        SELECT clean_content, summary_en, keywords_en, summary_np, keywords_np
+        FROM articles WHERE article_url = ?
+    """, (article_url,)).fetchone()
+
+
+def fetch_and_summarize(c, cache, summarizer, article_url):
+    """Article text and both summaries, skipping any network call whose result is known.
+
+    Checks the articles row for this URL first, then the content-hash cache,
+    and only then asks Jina / the summarizer.
+    """
+    known = known_article(c, article_url) or ("",) * 5
+    clean_text = known[0] or get_clean_article_text(article_url)
 
+    if all(known[1:]):
+        cache.stats["url"] += 1
+        return (clean_text, *known[1:])
+
+    cached = cache.get(clean_text, summarizer.model)
+    if cached:
+        cache.stats["content"] += 1
+        return (clean_text, *cached)
+
+    cache.stats["miss"] += 1
     try:
-        response = client.models.generate_content(
-            model="gemini-2.5-flash",
-            contents=prompt,
-        )
-        raw   = response.text.strip()
-        start = raw.find("{")
-        end   = raw.rfind("}") + 1
-        if start == -1 or end <= start:
-            return "", ""
-        data = json.loads(raw[start:end])
-        return data.get("summary", "").strip(), data.get("keywords", "").strip()
-    except Exception as e:
-        print(f"  Gemini {lang.upper()} failed → {url[:80]} → {str(e)[:140]}")
-        return "", ""
+        result = summarizer.summarize(article_url, clean_text)
+    except SummarizerError as e:
+        print(f"  {summarizer.name} summary failed → {e}")
+        result = ("",) * 4  # left for summarize_backlog.py
+    cache.put(clean_text, summarizer.model, *result)
+    return (clean_text, *result)
+
 
 def scrape_today():
     now      = datetime.now()
@@ -223,6 +361,8 @@ def scrape_today():
     conn = sqlite3.connect(DB_PATH)
     conn.execute("PRAGMA foreign_keys = ON")
     c = conn.cursor()
+    cache = SummaryCache()
+    summarizer = get_summarizer(SUMMARIZER_BACKEND)
 
     options = Options()
     options.add_argument("--headless=new")
@@ -237,13 +377,11 @@ def scrape_today():
             driver = webdriver.Chrome(options=options)
             driver.get(portal["url"])
 
-            wait_secs = 16 if key in ("onlinekhabar", "ratopati", "himalyantimes", "setopati") else 9
-            time.sleep(wait_secs)
-
-            wait        = WebDriverWait(driver, 22)
-            headline_el = wait.until(
-                EC.presence_of_element_located((By.CSS_SELECTOR, portal["selector"]))
-            )
+            if not wait_ready(driver, portal["ready"], key):
+                print(f"{portal['name']:22} → headline not ready\n")
+                continue
+            headline_el = driver.find_element(By.CSS_SELECTOR, portal["selector"])
+            wait        = WebDriverWait(driver, 10)
             driver.execute_script(
                 "arguments[0].scrollIntoView({block:'center'});", headline_el
             )
@@ -259,10 +397,8 @@ def scrape_today():
             if not article_url.startswith("http"):
                 print(f"  ⚠  Invalid URL skipped: {article_url!r}")
                 continue
-            clean_text = get_clean_article_text(article_url)
-            title      = extract_title_from_jina_text(clean_text)
-            summary_en, kw_en = summarize_with_gemini(article_url, "en")
-            summary_np, kw_np = summarize_with_gemini(article_url, "np")
+            clean_text, summary_en, kw_en, summary_np, kw_np = fetch_and_summarize(c, cache, summarizer, article_url)
+            title = extract_title_from_jina_text(clean_text)
 
             # ON CONFLICT: keep existing non-empty values; only fill blanks.
             c.execute("""
@@ -298,6 +434,7 @@ def scrape_today():
                 (live_str, key)
             )
             conn.commit()
+            record_variants(conn, filename, try_variants(thumb_path))
 
             print(f"{portal['name']:22} | {filename}")
             print(f"URL   : {article_url[:78]}")
@@ -306,8 +443,6 @@ def scrape_today():
             print(f"NP    : {(summary_np or '(empty)')[:65]}")
             print()
 
-            time.sleep(2.4)
-
         except Exception as e:
             print(f"{portal['name']:22} → {str(e)[:140]}\n")
         finally:
@@ -315,7 +450,19 @@ def scrape_today():
                 driver.quit()
 
     conn.close()
+    cache.report()
+    cache.close()
+    HTTP_STATS.report()
+
+    try:
+        refresh_days("portal", [date_str], DB_PATH)
+    except Exception as e:
+        print(f"Calendar update failed: {e}")
+
     print(f"Finished")
 
 if __name__ == "__main__":
-    scrape_today()
\ No newline at end of file
+    if len(sys.argv) > 1 and sys.argv[1] == "rebuild-fts":
+        rebuild_search_index()
+    else:
+        scrape_today()
\ No newline at end of file
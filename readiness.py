@@ -0,0 +1,135 @@
+"""Event-driven readiness waits for the Selenium scrapers.
+
+A readiness spec is a small dict kept next to each site's selectors in
+NEWSPAPERS / NEWS_PORTALS, one per step of the site's flow:
+
+    "ready": {
+        "load": {"visible": "div.df-ui-more", "timeout": 20},
+        "open": {"visible": "a.df-ui-download"},
+    }
+
+Conditions (all given ones must hold at once):
+
+    visible       CSS selector is displayed
+    present       CSS selector is in the DOM
+    clickable     CSS selector is displayed and enabled
+    windows       at least this many browser windows/tabs are open
+    source        regex found in the page source
+    response      regex matching a network response URL (needs the
+                  goog:loggingPrefs performance capability)
+    download      a finished file with this suffix in download_dir
+    network_idle  no new resource loads for idle_ms (default 500)
+
+`timeout` is the ceiling in seconds. wait_ready returns as soon as the
+spec holds and logs how long it actually took, so the ceilings can be
+tuned from the scraper log.
+"""
+import json
+import os
+import re
+import time
+
+from selenium.common.exceptions import TimeoutException, WebDriverException
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.support.ui import WebDriverWait
+
+DEFAULT_TIMEOUT = 20
+POLL_SECONDS    = 0.25
+
+
+def _network_idle(idle_ms):
+    state = {"count": -1, "since": time.monotonic()}
+
+    def check(driver):
+        count = driver.execute_script(
+            "return document.readyState === 'complete'"
+            " ? performance.getEntriesByType('resource').length : -1")
+        now = time.monotonic()
+        if count != state["count"]:
+            state["count"], state["since"] = count, now
+            return False
+        return count >= 0 and (now - state["since"]) * 1000 >= idle_ms
+    return check
+
+
+def _response(pattern):
+    regex = re.compile(pattern, re.I)
+    seen  = []
+
+    def check(driver):
+        for entry in driver.get_log("performance"):
+            try:
+                msg = json.loads(entry["message"])["message"]
+            except (ValueError, KeyError):
+                continue
+            if msg.get("method") != "Network.responseReceived":
+                continue
+            resp = msg["params"]["response"]
+            if resp.get("status") in (200, 206) and regex.search(resp.get("url", "")):
+                seen.append(resp["url"])
+        return seen[0] if seen else False
+    return check
+
+
+def _download(suffix, download_dir):
+    def check(driver):
+        done = [f for f in os.listdir(download_dir) if f.endswith(suffix)]
+        return os.path.join(download_dir, done[0]) if done else False
+    return check
+
+
+def _conditions(spec, download_dir):
+    conds = []
+    if "visible" in spec:
+        conds.append(EC.visibility_of_element_located((By.CSS_SELECTOR, spec["visible"])))
+    if "present" in spec:
+        conds.append(EC.presence_of_element_located((By.CSS_SELECTOR, spec["present"])))
+    if "clickable" in spec:
+        conds.append(EC.element_to_be_clickable((By.CSS_SELECTOR, spec["clickable"])))
+    if "windows" in spec:
+        conds.append(lambda d: len(d.window_handles) >= spec["windows"])
+    if "source" in spec:
+        regex = re.compile(spec["source"])
+        conds.append(lambda d: (regex.findall(d.page_source) or [False])[0])
+    if "response" in spec:
+        conds.append(_response(spec["response"]))
+    if "download" in spec:
+        conds.append(_download(spec["download"], download_dir))
+    if spec.get("network_idle"):
+        conds.append(_network_idle(spec.get("idle_ms", 500)))
+    return conds
+
+
+def describe(spec):
+    return ", ".join(f"{k}={v}" if v is not True else k
+                     for k, v in spec.items() if k not in ("timeout", "idle_ms"))
+
+
+def wait_ready(driver, spec, label, download_dir=None):
+    """Wait until every condition in spec holds or its ceiling passes.
+
+    Returns the value of the last condition (element, URL, path, True) or
+    None on timeout.
+    """
+    timeout = spec.get("timeout", DEFAULT_TIMEOUT)
+    conds   = _conditions(spec, download_dir)
+
+    def all_met(d):
+        value = True
+        for cond in conds:
+            value = cond(d)
+            if not value:
+                return False
+        return value
+
+    start = time.monotonic()
+    try:
+        value = WebDriverWait(driver, timeout, poll_frequency=POLL_SECONDS,
+                              ignored_exceptions=(WebDriverException,)).until(all_met)
+    except TimeoutException:
+        value = None
+    elapsed = time.monotonic() - start
+    status  = "ready" if value is not None else "timed out"
+    print(f"[Wait] {label}: {describe(spec)} {status} after {elapsed:.1f}s (ceiling {timeout}s)")
+    return value
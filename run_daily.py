@@ -0,0 +1,208 @@
+"""The daily scrape: papers, portals and socials side by side.
+
+The three scrapers share no sites or databases, so instead of running them
+one after the other each one gets its own supervised child process and
+they all start at once; the run takes as long as the slowest of them. A job
+that runs past its timeout is stopped together with the browsers it
+started. Output is relayed line by line with the job's name in front, and
+a JSON report of the run is written to run_reports/.
+
+    python run_daily.py [--only paper,portal] [--timeout-scale 1.5]
+
+While it runs it holds scrape.lock, which paper_ocr.py waits on. Ctrl-C or
+SIGTERM stops every job the same way before it exits.
+"""
+import argparse
+import json
+import os
+import signal
+import subprocess
+import sys
+import threading
+import time
+from collections import deque
+from datetime import datetime
+
+BASE_DIR    = os.path.dirname(os.path.abspath(__file__))
+REPORT_DIR  = os.path.join(BASE_DIR, "run_reports")
+SCRAPE_LOCK = os.path.join(BASE_DIR, "scrape.lock")
+
+# name -> (script, timeout in seconds)
+JOBS = {
+    "paper":  ("paper_scraper.py",  60 * 60),
+    "portal": ("portal_scraper.py", 40 * 60),
+    "social": ("social_scraper.py", 20 * 60),
+}
+
+KILL_GRACE = 20   # seconds between SIGTERM and SIGKILL
+LOG_TAIL   = 30   # last lines of each job kept in the report
+
+
+class Job:
+    """One scraper in its own process group, with its output relayed."""
+
+    def __init__(self, name, script, timeout):
+        self.name     = name
+        self.script   = script
+        self.timeout  = timeout
+        self.tail     = deque(maxlen=LOG_TAIL)
+        self.status   = "pending"
+        self.proc     = None
+        self.started  = None
+        self.seconds  = None
+        self.kill_at  = None
+        self._relay   = None
+
+    def start(self):
+        kwargs = {"start_new_session": True} if os.name == "posix" else \
+                 {"creationflags": subprocess.CREATE_NEW_PROCESS_GROUP}
+        self.started = time.monotonic()
+        self.proc    = subprocess.Popen(
+            [sys.executable, self.script], cwd=BASE_DIR,
+            stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+            env={**os.environ, "PYTHONUNBUFFERED": "1", "PYTHONIOENCODING": "utf-8"},
+            **kwargs,
+        )
+        self.status = "running"
+        self._relay = threading.Thread(target=self._relay_output, daemon=True)
+        self._relay.start()
+        print(f"[run] {self.name}: started {self.script} (pid {self.proc.pid}, "
+              f"timeout {self.timeout // 60} min)", flush=True)
+
+    def _relay_output(self):
+        for raw in self.proc.stdout:
+            line = raw.decode("utf-8", errors="replace").rstrip()
+            self.tail.append(line)
+            print(f"[{self.name}] {line}", flush=True)
+
+    def overdue(self):
+        return time.monotonic() - self.started > self.timeout
+
+    def stop(self, status="timeout"):
+        """Ask the whole process group, chromedriver and browsers included, to exit.
+
+        Does not wait: enforce() kills the group once KILL_GRACE has passed.
+        """
+        if self.kill_at is not None:
+            return
+        print(f"[run] {self.name}: {status}, stopping", flush=True)
+        self.status  = status
+        self.kill_at = time.monotonic() + KILL_GRACE
+        self._signal(signal.SIGTERM if os.name == "posix" else signal.CTRL_BREAK_EVENT)
+
+    def enforce(self):
+        """Kill a stopped job that is still running after KILL_GRACE."""
+        if self.kill_at is not None and time.monotonic() >= self.kill_at:
+            self._signal(signal.SIGKILL if os.name == "posix" else None)
+
+    def _signal(self, sig):
+        try:
+            if os.name == "posix":
+                os.killpg(self.proc.pid, sig)
+            elif sig is None:
+                self.proc.kill()
+            else:
+                self.proc.send_signal(sig)
+        except (ProcessLookupError, OSError):
+            pass
+
+    def finish(self):
+        self.seconds = time.monotonic() - self.started
+        if self.kill_at is not None and os.name == "posix":
+            self._signal(signal.SIGKILL)  # whatever of the group outlived the leader
+        self._relay.join(timeout=5)
+        if self.status == "running":
+            self.status = "ok" if self.proc.returncode == 0 else "failed"
+        print(f"[run] {self.name}: {self.status} (exit {self.proc.returncode}) "
+              f"in {self.seconds:.0f}s", flush=True)
+
+    def report(self):
+        return {
+            "script":    self.script,
+            "status":    self.status,
+            "exit_code": self.proc.returncode if self.proc else None,
+            "seconds":   round(self.seconds, 1) if self.seconds is not None else None,
+            "timeout":   self.timeout,
+            "log_tail":  list(self.tail),
+        }
+
+
+def supervise(running, poll=1.0):
+    """Poll until every job has exited, stopping and killing overdue ones."""
+    while running:
+        time.sleep(poll)
+        for job in list(running):
+            if job.proc.poll() is None:
+                if job.overdue():
+                    job.stop()
+                job.enforce()
+            if job.proc.poll() is not None:
+                job.finish()
+                running.remove(job)
+
+
+def _terminated(signum, frame):
+    raise SystemExit(128 + signum)  # unwinds into run_all's cleanup like Ctrl-C
+
+
+def run_all(names, timeout_scale=1.0):
+    jobs = [Job(name, JOBS[name][0], int(JOBS[name][1] * timeout_scale)) for name in names]
+
+    started_at = datetime.now()
+    started    = time.monotonic()
+    on_sigterm = None
+    if threading.current_thread() is threading.main_thread():
+        on_sigterm = signal.signal(signal.SIGTERM, _terminated)
+    with open(SCRAPE_LOCK, "w") as f:
+        f.write(str(os.getpid()))
+    try:
+        for job in jobs:
+            job.start()
+        supervise(list(jobs))
+    finally:
+        if on_sigterm is not None:
+            signal.signal(signal.SIGTERM, signal.SIG_IGN)  # no second unwind mid-cleanup
+        # interrupted: leave nothing behind
+        left = [job for job in jobs if job.proc and job.seconds is None]
+        for job in left:
+            if job.proc.poll() is None:
+                job.stop("interrupted")
+        supervise(left, poll=0.2)
+        if on_sigterm is not None:
+            signal.signal(signal.SIGTERM, on_sigterm)
+        if os.path.exists(SCRAPE_LOCK):
+            os.remove(SCRAPE_LOCK)
+
+    wall   = time.monotonic() - started
+    report = {
+        "started_at":   started_at.isoformat(timespec="seconds"),
+        "finished_at":  datetime.now().isoformat(timespec="seconds"),
+        "wall_seconds": round(wall, 1),
+        "job_seconds":  round(sum(job.seconds or 0 for job in jobs), 1),
+        "ok":           all(job.status == "ok" for job in jobs),
+        "jobs":         {job.name: job.report() for job in jobs},
+    }
+    os.makedirs(REPORT_DIR, exist_ok=True)
+    path = os.path.join(REPORT_DIR, started_at.strftime("%Y-%m-%d_%H%M%S") + ".json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+
+    summary = ", ".join(f"{job.name} {job.status} {job.seconds or 0:.0f}s" for job in jobs)
+    print(f"[run] {summary}; wall {wall:.0f}s against {report['job_seconds']:.0f}s "
+          f"one after another. Report: {path}", flush=True)
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the daily scrapers concurrently.")
+    parser.add_argument("--only", default=",".join(JOBS),
+                        help=f"comma-separated jobs (default: {','.join(JOBS)})")
+    parser.add_argument("--timeout-scale", type=float, default=1.0,
+                        help="multiply every job's timeout")
+    args  = parser.parse_args()
+    names = [n for n in args.only.split(",") if n]
+    for name in names:
+        if name not in JOBS:
+            raise SystemExit(f"unknown job {name!r} (choose from {', '.join(JOBS)})")
+    report = run_all(names, args.timeout_scale)
+    sys.exit(0 if report["ok"] else 1)
@@ -0,0 +1,73 @@
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from urllib.parse import urlparse
+
+
+class HostLimiter:
+    """Per-host politeness for concurrent scrapers.
+
+    At most `per_host` requests are in flight to one host, and request starts
+    to the same host are spaced at least `min_interval` seconds apart.
+    Unrelated hosts never wait on each other.
+    """
+
+    def __init__(self, per_host=1, min_interval=2.0):
+        self.per_host     = per_host
+        self.min_interval = min_interval
+        self._lock        = threading.Lock()
+        self._slots       = {}
+        self._next_start  = defaultdict(float)
+
+    @contextmanager
+    def slot(self, url):
+        host = urlparse(url).hostname or url
+        with self._lock:
+            sem = self._slots.setdefault(host, threading.BoundedSemaphore(self.per_host))
+        with sem:
+            with self._lock:
+                now   = time.monotonic()
+                start = max(now, self._next_start[host])
+                self._next_start[host] = start + self.min_interval
+            if start > now:
+                time.sleep(start - now)
+            yield
+
+
+class StageTimer:
+    """Wall and busy time per pipeline stage, for the end-of-run summary."""
+
+    def __init__(self):
+        self._lock  = threading.Lock()
+        self.first  = {}
+        self.last   = {}
+        self.busy   = defaultdict(float)
+        self.ok     = defaultdict(int)
+        self.failed = defaultdict(int)
+
+    def run(self, stage, fn, *args, **kwargs):
+        """Call fn, counting it as failed if it raises or returns a falsy value."""
+        start  = time.monotonic()
+        result = None
+        try:
+            result = fn(*args, **kwargs)
+            return result
+        finally:
+            end = time.monotonic()
+            with self._lock:
+                self.first[stage] = min(self.first.get(stage, start), start)
+                self.last[stage]  = max(self.last.get(stage, end), end)
+                self.busy[stage] += end - start
+                if result:
+                    self.ok[stage] += 1
+                else:
+                    self.failed[stage] += 1
+
+    def summary(self, total):
+        print(f"\n[Summary] {'stage':<10} {'wall':>8} {'busy':>8} {'ok':>4} {'failed':>6}")
+        for stage in self.first:
+            wall = self.last[stage] - self.first[stage]
+            print(f"[Summary] {stage:<10} {wall:7.1f}s {self.busy[stage]:7.1f}s "
+                  f"{self.ok[stage]:>4} {self.failed[stage]:>6}")
+        print(f"[Summary] {'total':<10} {total:7.1f}s")
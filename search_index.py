@@ -0,0 +1,21 @@
+"""FTS5 settings shared by the archives' full-text indexes."""
+
+# Plain unicode61 treats Devanagari vowel signs and the virama (categories
+# Mn/Mc) as separators, which indexes नेपालमा as न / प / लम. Counting them as
+# token characters keeps Nepali words whole; the danda (Po) still splits.
+FTS_TOKENIZE = "unicode61 categories 'L* N* Co Mc Mn'"
+
+
+def drop_stale_fts(c, table):
+    """Drop table if it was built with another tokenizer; returns True if it was.
+
+    The caller recreates it with FTS_TOKENIZE and fills it with 'rebuild'.
+    """
+    row = c.execute(
+        "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = ?", (table,)
+    ).fetchone()
+    if row is None or FTS_TOKENIZE in row[0]:
+        return False
+    c.execute(f"DROP TABLE {table}")
+    print(f"[FTS] {table}: built with an older tokenizer, rebuilding")
+    return True
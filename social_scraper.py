@@ -3,11 +3,15 @@ import os
 from datetime import datetime
 from pathlib import Path
 
-import requests
 from bs4 import BeautifulSoup
 from playwright.sync_api import sync_playwright
 import json
 
+from archive_calendar import refresh_days
+from archive_generation import init_generation
+from http_session import STATS as HTTP_STATS, get_session
+from image_variants import init_variants, record_variants, try_variants
+
 
 SCRIPT_PARENT = Path(__file__).resolve().parent
 DATA_FOLDER   = SCRIPT_PARENT / "social_archive"
@@ -52,7 +56,13 @@ def init_db():
             post_id   INTEGER NOT NULL REFERENCES social_posts(post_id),
             file_path TEXT NOT NULL
         );
+
+        CREATE INDEX IF NOT EXISTS idx_posts_date ON social_posts (archive_date_id);
+        CREATE INDEX IF NOT EXISTS idx_media_post ON media_files (post_id);
     """)
+    init_variants(conn)
+    init_generation(conn, ("platforms", "archive_dates", "social_posts", "media_files",
+                           "thumbnail_variants"))
     conn.commit()
     conn.close()
 
@@ -102,6 +112,7 @@ def insert_post(conn, platform_name, title, link, file_path=None):
                 INSERT INTO media_files (post_id, file_path) VALUES (?, ?)
             """, (post_id, str(file_path)))
             conn.commit()
+            record_variants(conn, os.path.basename(file_path), try_variants(str(file_path)))
     except sqlite3.Error as e:
         print(f"error: {e}")
 
@@ -109,7 +120,7 @@ def insert_post(conn, platform_name, title, link, file_path=None):
 def scrape_youtube_trending_nepal(conn):
     url = "https://yt-trends.iamrohit.in/Nepal"
     try:
-        r = requests.get(url, verify=False, timeout=15)
+        r = get_session().get(url, verify=False, timeout=15)
         r.raise_for_status()
         soup = BeautifulSoup(r.text, "lxml")
 
@@ -134,7 +145,7 @@ def scrape_youtube_trending_nepal(conn):
             savepath = THUMB_FOLDER / filename
 
             try:
-                img_data = requests.get(img_url, timeout=10).content
+                img_data = get_session().get(img_url, timeout=10).content
                 savepath.write_bytes(img_data)
                 print(f"Thumbnail saved ")
             except Exception as e:
@@ -232,3 +243,8 @@ if __name__ == "__main__":
     scrape_youtube_trending_nepal(conn)
     scrape_reddit_top_posts(conn)
     conn.close()
+    HTTP_STATS.report()
+    try:
+        refresh_days("social", [TODAY_DB], DB_PATH)
+    except Exception as e:
+        print(f"Calendar update failed: {e}")
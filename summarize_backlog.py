@@ -0,0 +1,224 @@
+"""Backlog worker: fill in article summaries the capture pass left blank.
+
+    python summarize_backlog.py [--backend gemini|local] [--batch 20] [--workers 4]
+                                [--per-minute 30] [--limit N] [--restart] [--db PATH]
+
+Walks articles with a missing summary or keyword list in article_id order,
+in batches. Each batch is summarized concurrently, every API call under a
+requests-per-minute limit, with exponential backoff on failures; batched
+backends (local) take the whole batch in one call instead. Only blank
+columns are filled. Progress is kept in backlog_cursor after every batch, so
+an interrupted run resumes where it stopped; a completed pass resets the
+cursor. An article the backend gave up on, or left with a blank column (the
+local backend only writes one language), is recorded in backlog_attempts
+and skipped by that backend for 1, 2, 4 ... up to RETRY_DAYS_MAX days.
+
+The stub backend writes placeholders that would never be replaced, so it
+only runs against a scratch database given with --db.
+"""
+import argparse
+import os
+import random
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from summarizers import BACKENDS, SummarizerError, get_summarizer
+from summary_cache import SUMMARY_CACHE_PATH, SummaryCache
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DB_PATH  = os.path.join(BASE_DIR, "portal_archive", "database.db")
+
+CURSOR_NAME  = "summaries"
+MAX_ATTEMPTS = 5
+BACKOFF_BASE = 2.0
+BACKOFF_MAX  = 60.0
+
+RETRY_DAYS_MAX = 32
+
+BLANK_SQL = """
+    (COALESCE(summary_en, '') = '' OR COALESCE(keywords_en, '') = ''
+     OR COALESCE(summary_np, '') = '' OR COALESCE(keywords_np, '') = '')
+"""
+
+MISSING_SQL = f"""
+    SELECT article_id, article_url, clean_content
+    FROM articles
+    WHERE article_id > ?
+      AND {BLANK_SQL}
+      AND NOT EXISTS (SELECT 1 FROM backlog_attempts b
+                      WHERE b.article_id = articles.article_id AND b.backend = ?
+                        AND b.retry_after > CURRENT_TIMESTAMP)
+    ORDER BY article_id
+    LIMIT ?
+"""
+
+
+class RateLimiter:
+    """Spaces calls evenly so at most per_minute start in any minute."""
+
+    def __init__(self, per_minute):
+        self.interval = 60.0 / per_minute if per_minute else 0.0
+        self._lock    = threading.Lock()
+        self._next    = 0.0
+
+    def wait(self):
+        with self._lock:
+            now   = time.monotonic()
+            start = max(now, self._next)
+            self._next = start + self.interval
+        if start > now:
+            time.sleep(start - now)
+
+
+def init_cursor(conn):
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS backlog_cursor (
+            name       TEXT PRIMARY KEY,
+            last_id    INTEGER NOT NULL DEFAULT 0,
+            updated_at TEXT    NOT NULL DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    conn.execute("INSERT OR IGNORE INTO backlog_cursor (name) VALUES (?)", (CURSOR_NAME,))
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS backlog_attempts (
+            article_id  INTEGER NOT NULL,
+            backend     TEXT    NOT NULL,
+            status      TEXT    NOT NULL CHECK (status IN ('failed', 'partial')),
+            attempts    INTEGER NOT NULL,
+            retry_after TEXT    NOT NULL,
+            PRIMARY KEY (article_id, backend)
+        ) WITHOUT ROWID
+    """)
+    conn.commit()
+
+
+def set_cursor(conn, last_id):
+    conn.execute("""
+        UPDATE backlog_cursor SET last_id = ?, updated_at = CURRENT_TIMESTAMP
+        WHERE name = ?
+    """, (last_id, CURSOR_NAME))
+    conn.commit()
+
+
+def summarize_with_retry(summarizer, url, clean_text):
+    for attempt in range(1, MAX_ATTEMPTS + 1):
+        try:
+            return summarizer.summarize(url, clean_text)
+        except SummarizerError as e:
+            if attempt == MAX_ATTEMPTS:
+                print(f"  gave up after {attempt} attempts: {e}")
+                return None
+            delay = min(BACKOFF_MAX, BACKOFF_BASE * 2 ** (attempt - 1)) * random.uniform(0.5, 1.0)
+            print(f"  attempt {attempt} failed ({e}); retrying in {delay:.1f}s")
+            time.sleep(delay)
+
+
+def save_summary(conn, article_id, result):
+    summary_en, kw_en, summary_np, kw_np = result
+    conn.execute("""
+        UPDATE articles SET
+            summary_en  = COALESCE(NULLIF(summary_en,  ''), NULLIF(?, '')),
+            keywords_en = COALESCE(NULLIF(keywords_en, ''), NULLIF(?, '')),
+            summary_np  = COALESCE(NULLIF(summary_np,  ''), NULLIF(?, '')),
+            keywords_np = COALESCE(NULLIF(keywords_np, ''), NULLIF(?, ''))
+        WHERE article_id = ?
+    """, (summary_en, kw_en, summary_np, kw_np, article_id))
+
+
+def settle(conn, article_id, backend, result):
+    """Save a result and record the article in backlog_attempts if it is still incomplete."""
+    if result:
+        save_summary(conn, article_id, result)
+        blank = conn.execute(f"SELECT 1 FROM articles WHERE article_id = ? AND {BLANK_SQL}",
+                             (article_id,)).fetchone()
+        if not blank:
+            conn.execute("DELETE FROM backlog_attempts WHERE article_id = ? AND backend = ?",
+                         (article_id, backend))
+            return True
+    row      = conn.execute("SELECT attempts FROM backlog_attempts WHERE article_id = ? AND backend = ?",
+                            (article_id, backend)).fetchone()
+    attempts = (row[0] if row else 0) + 1
+    days     = min(RETRY_DAYS_MAX, 2 ** (attempts - 1))
+    conn.execute("""
+        INSERT OR REPLACE INTO backlog_attempts (article_id, backend, status, attempts, retry_after)
+        VALUES (?, ?, ?, ?, datetime('now', ?))
+    """, (article_id, backend, "partial" if result else "failed", attempts, f"+{days} days"))
+    return bool(result)
+
+
+def run_backlog(backend="gemini", batch_size=20, workers=4, per_minute=30,
+                limit=None, restart=False, db_path=DB_PATH, cache_path=SUMMARY_CACHE_PATH):
+    if backend == "stub" and os.path.realpath(db_path) == os.path.realpath(DB_PATH):
+        raise SystemExit("the stub backend only runs against a scratch database (--db PATH)")
+    summarizer = get_summarizer(backend)
+    cache      = SummaryCache(cache_path)
+    summarizer.limiter = RateLimiter(per_minute)  # waited on before every API call
+
+    conn = sqlite3.connect(db_path)
+    init_cursor(conn)
+    if restart:
+        set_cursor(conn, 0)
+    last_id = conn.execute("SELECT last_id FROM backlog_cursor WHERE name = ?",
+                           (CURSOR_NAME,)).fetchone()[0]
+    print(f"[Backlog] backend={summarizer.name} resuming after article_id {last_id}")
+
+    done = filled = skipped = 0
+    started = time.monotonic()
+    with ThreadPoolExecutor(workers, thread_name_prefix="summarize") as pool:
+        while limit is None or done < limit:
+            size = batch_size if limit is None else min(batch_size, limit - done)
+            rows = conn.execute(MISSING_SQL, (last_id, summarizer.name, size)).fetchall()
+            if not rows:
+                set_cursor(conn, 0)  # pass complete; next run starts over
+                print("[Backlog] no more articles with missing summaries")
+                break
+
+            # cache lookups and writes stay on this thread, which owns both connections
+            misses = []
+            for row in rows:
+                cached = cache.get(row[2], summarizer.model)
+                if cached:
+                    if settle(conn, row[0], summarizer.name, cached):
+                        filled += 1
+                    else:
+                        skipped += 1
+                else:
+                    misses.append(row)
+            if summarizer.batched:
+                results = summarizer.summarize_many([(url, text) for _, url, text in misses])
+            else:
+                results = pool.map(lambda r: summarize_with_retry(summarizer, r[1], r[2]), misses)
+            for (article_id, url, clean_text), result in zip(misses, results):
+                if result:
+                    cache.put(clean_text, summarizer.model, *result)
+                if settle(conn, article_id, summarizer.name, result):
+                    filled += 1
+                else:
+                    skipped += 1
+            done   += len(rows)
+            last_id = rows[-1][0]
+            set_cursor(conn, last_id)
+            print(f"[Backlog] {done} processed, {filled} filled, {skipped} set aside, "
+                  f"cursor at {last_id}")
+
+    conn.close()
+    cache.close()
+    elapsed = time.monotonic() - started
+    print(f"[Backlog] finished: {filled}/{done} articles filled in {elapsed:.1f}s")
+    return filled
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fill in missing article summaries.")
+    parser.add_argument("--backend", default="gemini", choices=sorted(BACKENDS))
+    parser.add_argument("--batch", type=int, default=20)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--per-minute", type=int, default=30)
+    parser.add_argument("--limit", type=int)
+    parser.add_argument("--restart", action="store_true", help="ignore the saved cursor")
+    parser.add_argument("--db", default=DB_PATH, help="portal database (default: the archive)")
+    args = parser.parse_args()
+    run_backlog(args.backend, args.batch, args.workers, args.per_minute, args.limit,
+                args.restart, args.db)
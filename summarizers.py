@@ -0,0 +1,383 @@
+"""Summarizer backends for portal articles.
+
+Every backend takes an article URL and its Jina-cleaned text and returns
+(summary_en, keywords_en, summary_np, keywords_np). Backends raise
+SummarizerError when nothing usable came back, so callers can retry.
+
+    gemini  one bilingual Gemini call per article, per-language URL fallback
+    local   extractive TF-IDF + TextRank on the CPU, no network; fills only
+            the article's own language (Nepali or English)
+    stub    leading words and frequent terms, for tests
+
+The portal scraper picks one with ARCHIVE_SUMMARIZER (default "gemini").
+"""
+import json
+import math
+import re
+from collections import Counter
+
+GEMINI_API_KEY = "api key"
+GEMINI_MODEL   = "gemini-2.5-flash"
+
+# One structured-JSON call per article for both languages, built from the
+# Jina text; per-language URL prompts are only used for a half that fails.
+BILINGUAL_SUMMARY   = True
+BILINGUAL_MAX_CHARS = 12000
+BILINGUAL_SCHEMA    = {
+    "type": "OBJECT",
+    "properties": {
+        "summary_en":  {"type": "STRING"},
+        "keywords_en": {"type": "ARRAY", "items": {"type": "STRING"}},
+        "summary_np":  {"type": "STRING"},
+        "keywords_np": {"type": "ARRAY", "items": {"type": "STRING"}},
+    },
+    "required": ["summary_en", "keywords_en", "summary_np", "keywords_np"],
+}
+DEVANAGARI_RE = re.compile(r"[\u0900-\u097F]")
+
+_client = None
+
+
+class SummarizerError(Exception):
+    pass
+
+
+def gemini_client():
+    global _client
+    if _client is None:
+        from google.genai import Client
+        _client = Client(api_key=GEMINI_API_KEY)
+    return _client
+
+
+def summarize_with_gemini(url: str, lang: str = "en") -> tuple[str, str]:
+    if not url:
+        return "", ""
+
+    if lang == "en":
+        prompt = f"""Summarize the main news article at this URL in English.
+                    Be concise (max 90-110 words). Focus on key facts.
+                    Extract 5-10 important keywords (comma separated).
+                    Return ONLY valid JSON with no markdown fences:
+                    {{"summary": "...", "keywords": "kw1,kw2,kw3"}}
+                    URL: {url}"""
+    else:
+        prompt = f"""यो URL मा रहेको मुख्य समाचारको नेपालीमा संक्षिप्त सारांश लेख्नुहोस्।
+                    अधिकतम ९०-११० शब्द। मुख्य तथ्यमा केन्द्रित रहनुहोस्।
+                    ५-१० मुख्य किवर्डहरू कमाले छुट्ट्याएर दिनुहोस्।
+                    केवल valid JSON फर्काउनुहोस् — markdown fence नराख्नुस्:
+                    {{"summary": "...", "keywords": "kw1,kw2,kw3"}}
+                    URL: {url}"""
+
+    try:
+        response = gemini_client().models.generate_content(
+            model=GEMINI_MODEL,
+            contents=prompt,
+        )
+        data = parse_json_object(response.text)
+        if data is None:
+            return "", ""
+        return data.get("summary", "").strip(), data.get("keywords", "").strip()
+    except Exception as e:
+        print(f"  Gemini {lang.upper()} failed → {url[:80]} → {str(e)[:140]}")
+        return "", ""
+
+
+def parse_json_object(raw):
+    raw   = (raw or "").strip()
+    start = raw.find("{")
+    end   = raw.rfind("}") + 1
+    if start == -1 or end <= start:
+        return None
+    return json.loads(raw[start:end])
+
+
+def valid_half(data, lang):
+    """(summary, keywords) for one language if it passes the schema checks, else None."""
+    summary  = data.get(f"summary_{lang}")
+    keywords = data.get(f"keywords_{lang}")
+    if not isinstance(summary, str) or not isinstance(keywords, list):
+        return None
+    summary  = summary.strip()
+    keywords = [k.strip() for k in keywords if isinstance(k, str) and k.strip()]
+    if not 20 <= len(summary.split()) <= 250 or not keywords:
+        return None
+    if bool(DEVANAGARI_RE.search(summary)) != (lang == "np"):
+        return None  # answered in the wrong language
+    return summary, ",".join(keywords[:10])
+
+
+def summarize_bilingual(clean_text):
+    """Both summaries from one Gemini call; returns {"en": half, "np": half}, a half None if invalid."""
+    prompt = f"""Summarize the news article below twice: once in English and once in Nepali
+                (Devanagari script). Each summary 90-110 words, key facts only.
+                Give 5-10 keywords per language.
+                Fill summary_en, keywords_en, summary_np, keywords_np.
+
+                ARTICLE:
+                {clean_text[:BILINGUAL_MAX_CHARS]}"""
+    try:
+        response = gemini_client().models.generate_content(
+            model=GEMINI_MODEL,
+            contents=prompt,
+            config={
+                "response_mime_type": "application/json",
+                "response_schema":    BILINGUAL_SCHEMA,
+            },
+        )
+        data = parse_json_object(response.text) or {}
+    except Exception as e:
+        print(f"  Gemini bilingual failed → {str(e)[:140]}")
+        data = {}
+    halves = {lang: valid_half(data, lang) for lang in ("en", "np")}
+    for lang, half in halves.items():
+        if half is None:
+            print(f"  Gemini bilingual: {lang.upper()} half invalid, falling back")
+    return halves
+
+
+class Summarizer:
+    name    = "base"
+    model   = "base"  # cache key in summary_cache
+    batched = False   # summarize_many is faster than one call per article
+    limiter = None    # anything with wait(), called before every API request
+
+    def summarize(self, url, clean_text):
+        raise NotImplementedError
+
+    def throttle(self):
+        if self.limiter is not None:
+            self.limiter.wait()
+
+    def summarize_many(self, items):
+        """[(url, clean_text), ...] -> one result tuple (or None on failure) per item."""
+        results = []
+        for url, clean_text in items:
+            try:
+                results.append(self.summarize(url, clean_text))
+            except SummarizerError as e:
+                print(f"  {self.name}: {e}")
+                results.append(None)
+        return results
+
+
+class GeminiSummarizer(Summarizer):
+    """One bilingual call from the Jina text, per-language URL prompts as fallback."""
+
+    name  = "gemini"
+    model = GEMINI_MODEL
+
+    def summarize(self, url, clean_text):
+        halves = {}
+        if BILINGUAL_SUMMARY and clean_text:
+            self.throttle()
+            halves = summarize_bilingual(clean_text)
+        for lang in ("en", "np"):
+            if not halves.get(lang) and url:
+                self.throttle()
+                halves[lang] = summarize_with_gemini(url, lang)
+        summary_en, kw_en = halves.get("en") or ("", "")
+        summary_np, kw_np = halves.get("np") or ("", "")
+        if not (summary_en or summary_np):
+            raise SummarizerError(f"Gemini returned nothing for {url}")
+        return summary_en, kw_en, summary_np, kw_np
+
+
+JINA_HEADER_RE = re.compile(r"^\s*(Title|URL Source|Published Time|Markdown Content|Warning):.*$", re.M)
+MD_IMAGE_RE    = re.compile(r"!\[[^\]]*\]\([^)]*\)")
+MD_LINK_RE     = re.compile(r"\[([^\]]*)\]\([^)]*\)")
+URL_RE         = re.compile(r"https?://\S+")
+SENTENCE_RE    = re.compile(r"(?<=[.!?।॥])\s+")
+TOKEN_RE       = re.compile(r"[\w\u0900-\u0963\u0966-\u097F]+")  # no danda
+
+SUMMARY_WORDS  = 100  # same target as the Gemini prompts
+KEYWORDS       = 8
+MAX_SENTENCES  = 80
+MIN_LINE_WORDS = 6    # shorter lines are menus, bylines and captions
+DAMPING        = 0.85
+
+EN_STOPWORDS = set("""
+    a about after again against all also am an and any are as at be because been before being
+    between both but by can could did do does doing down during each few for from further had has
+    have having he her here hers him his how i if in into is it its itself just me more most my no
+    nor not now of off on once only or other our out over own said same she should so some such
+    than that the their them then there these they this those through to too under until up very
+    was we were what when where which while who whom why will with would you your year years
+    new one two three says told per cent mr ms
+""".split())
+NP_STOPWORDS = set("""
+    छ छन् छैन थियो थिए थिइन् हो होइन हुन् हुने हुन भएको भएका भए भई भयो र तथा पनि नै मात्र यो यस यी
+    त्यो त्यस ती उनी उनले उनको उनका उनलाई उक्त भने भन्ने भनेर भनिएको गरेको गरेका गर्ने गर्न गरी गरे गरिएको
+    गर्दै रहेको रहेका रहे लागि अनुसार बताए बताइन् बताउनुभयो जानकारी दिए दिएका एक अहिले अझै अब साथै तर वा
+    सबै केही धेरै कुनै आफ्नो हामी म तपाईं यहाँ त्यहाँ जुन जसले जब गत आज भोलि पछि अघि बीच बिच रूपमा
+    क्रममा सम्बन्धमा बारेमा पर्ने पर्छ सक्ने सक्छ लिएर दिने जना वटा
+""".split())
+# Postpositions and plural markers that attach to Nepali nouns, longest first.
+NP_SUFFIXES = ("हरूलाई", "हरूबाट", "हरूको", "हरूका", "हरूले", "हरूमा", "हरू",
+               "लाई", "बाट", "देखि", "सम्म", "भन्दा", "को", "का", "की", "ले", "मा")
+
+
+def _stem(token, lang):
+    if lang == "np":
+        for suffix in NP_SUFFIXES:
+            if token.endswith(suffix) and len(token) - len(suffix) >= 2:
+                return token[:-len(suffix)]
+    return token
+
+
+def _cosine(a, b):
+    if len(a) > len(b):
+        a, b = b, a
+    dot = sum(w * b[t] for t, w in a.items() if t in b)
+    if not dot:
+        return 0.0
+    return dot / (math.sqrt(sum(w * w for w in a.values())) * math.sqrt(sum(w * w for w in b.values())))
+
+
+class LocalSummarizer(Summarizer):
+    """Extractive TF-IDF + TextRank, no network.
+
+    Sentences are ranked by PageRank over their TF-IDF cosine graph, with the
+    teleport weighted toward the lead (news puts the facts first). Keywords
+    are the top TF-IDF terms. summarize_many shares IDF across the batch, so
+    words common to every article rank low.
+    """
+
+    name    = "local"
+    model   = "local-textrank-v1"
+    batched = True
+
+    def _prepare(self, clean_text):
+        text = JINA_HEADER_RE.sub("", clean_text or "")
+        text = MD_LINK_RE.sub(r"\1", MD_IMAGE_RE.sub("", text))
+        text = URL_RE.sub("", text)
+
+        devanagari = len(DEVANAGARI_RE.findall(text))
+        latin      = len(re.findall(r"[A-Za-z]", text))
+        lang       = "np" if devanagari > latin else "en"
+        stopwords  = NP_STOPWORDS if lang == "np" else EN_STOPWORDS
+
+        sentences, surface = [], {}
+        for line in text.splitlines():
+            line = line.strip(" \t#>*-_|")
+            if len(line.split()) < MIN_LINE_WORDS:
+                continue
+            for sentence in SENTENCE_RE.split(line):
+                stems = []
+                for token in TOKEN_RE.findall(sentence.lower()):
+                    if token.isdigit() or token in stopwords:
+                        continue
+                    stem = _stem(token, lang)
+                    if stem in stopwords or len(stem) < (2 if lang == "np" else 3):
+                        continue
+                    stems.append(stem)
+                    surface.setdefault(stem, Counter())[token] += 1
+                if len(stems) >= 3:
+                    sentences.append((" ".join(sentence.replace("*", "").split()), stems))
+                if len(sentences) >= MAX_SENTENCES:
+                    break
+        return lang, sentences, surface
+
+    @staticmethod
+    def _idf(docs):
+        df = Counter(t for doc in docs for t in doc)
+        n  = len(docs)
+        return {t: math.log((1 + n) / (1 + d)) + 1 for t, d in df.items()}
+
+    def _rank(self, sentences, idf):
+        vectors = [{t: c * idf[t] for t, c in Counter(stems).items()} for _, stems in sentences]
+        n       = len(vectors)
+        edges   = [[] for _ in range(n)]
+        for i in range(n):
+            for j in range(i + 1, n):
+                w = _cosine(vectors[i], vectors[j])
+                if w:
+                    edges[i].append((j, w))
+                    edges[j].append((i, w))
+        out_weight = [sum(w for _, w in e) or 1.0 for e in edges]
+        lead       = [1.0 / (i + 1) for i in range(n)]
+        total      = sum(lead)
+        teleport   = [(1 - DAMPING) * l / total for l in lead]
+        scores     = [1.0 / n] * n
+        for _ in range(30):
+            new = [teleport[i] + DAMPING * sum(scores[j] * w / out_weight[j] for j, w in edges[i])
+                   for i in range(n)]
+            delta, scores = sum(abs(a - b) for a, b in zip(new, scores)), new
+            if delta < 1e-5:
+                break
+        return vectors, scores
+
+    def _summarize_doc(self, url, prepared, idf):
+        lang, sentences, surface = prepared
+        if not sentences:
+            raise SummarizerError(f"no sentences to extract for {url}")
+        vectors, scores = self._rank(sentences, idf)
+
+        chosen, words = [], 0
+        for i in sorted(range(len(sentences)), key=lambda i: (-scores[i], i)):
+            if any(_cosine(vectors[i], vectors[j]) > 0.7 for j in chosen):
+                continue  # near-duplicate of a sentence already picked
+            chosen.append(i)
+            words += len(sentences[i][0].split())
+            if words >= SUMMARY_WORDS:
+                break
+        summary = " ".join(sentences[i][0] for i in sorted(chosen))
+
+        weights = Counter()
+        for _, stems in sentences:
+            for t in stems:
+                weights[t] += idf[t]
+        # show the bare word when the text uses it, else its commonest inflection
+        keywords = ",".join(t if t in surface[t] else surface[t].most_common(1)[0][0]
+                            for t, _ in weights.most_common(KEYWORDS))
+
+        if lang == "np":
+            return "", "", summary, keywords
+        return summary, keywords, "", ""
+
+    def summarize(self, url, clean_text):
+        prepared = self._prepare(clean_text)
+        idf      = self._idf([set(stems) for _, stems in prepared[1]])
+        return self._summarize_doc(url, prepared, idf)
+
+    def summarize_many(self, items):
+        prepared = [self._prepare(text) for _, text in items]
+        docs     = [{t for _, stems in p[1] for t in stems} for p in prepared]
+        if len(docs) < 2:
+            return super().summarize_many(items)
+        idf     = self._idf(docs)
+        results = []
+        for (url, _), p in zip(items, prepared):
+            try:
+                results.append(self._summarize_doc(url, p, idf))
+            except SummarizerError as e:
+                print(f"  {self.name}: {e}")
+                results.append(None)
+        return results
+
+
+class StubSummarizer(Summarizer):
+    """Offline, deterministic stand-in: leading words and most frequent words."""
+
+    name  = "stub"
+    model = "stub"
+
+    def summarize(self, url, clean_text):
+        body = [l for l in (clean_text or "").splitlines()
+                if l.strip() and not JINA_HEADER_RE.match(l)]
+        if not body:
+            raise SummarizerError(f"no text for {url}")
+        text     = " ".join(" ".join(body).split())
+        summary  = " ".join(text.split()[:60])
+        counts   = Counter(w for w in TOKEN_RE.findall(text.lower()) if len(w) >= 4)
+        keywords = ",".join(sorted(counts, key=lambda w: (-counts[w], w))[:8])
+        return summary, keywords, summary, keywords
+
+
+BACKENDS = {cls.name: cls for cls in (GeminiSummarizer, LocalSummarizer, StubSummarizer)}
+
+
+def get_summarizer(name):
+    if name not in BACKENDS:
+        raise ValueError(f"unknown summarizer backend: {name} (choose from {', '.join(BACKENDS)})")
+    return BACKENDS[name]()
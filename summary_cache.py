@@ -0,0 +1,70 @@
+import hashlib
+import os
+import re
+import sqlite3
+
+BASE_DIR           = os.path.dirname(os.path.abspath(__file__))
+SUMMARY_CACHE_PATH = os.path.join(BASE_DIR, "portal_archive", "summary_cache.db")
+
+# Jina's header lines differ between a URL and its redirects/re-publications,
+# so they are left out of the content hash.
+VOLATILE_LINE_RE = re.compile(r"^\s*(URL Source|Published Time|Warning):.*$", re.I | re.M)
+
+
+def content_hash(clean_text):
+    """sha256 of the cleaned article text with volatile headers and spacing removed."""
+    text = VOLATILE_LINE_RE.sub("", clean_text or "")
+    text = " ".join(text.split())
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class SummaryCache:
+    """On-disk summaries keyed by (content hash, model).
+
+    Lets a re-published or redirected article with identical text reuse the
+    summaries of the copy already seen, without another LLM call.
+    """
+
+    def __init__(self, path=SUMMARY_CACHE_PATH):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.conn  = sqlite3.connect(path)
+        self.stats = {"url": 0, "content": 0, "miss": 0}
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS summary_cache (
+                content_hash TEXT NOT NULL,
+                model        TEXT NOT NULL,
+                summary_en   TEXT NOT NULL,
+                keywords_en  TEXT NOT NULL,
+                summary_np   TEXT NOT NULL,
+                keywords_np  TEXT NOT NULL,
+                created_at   TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
+                PRIMARY KEY (content_hash, model)
+            ) WITHOUT ROWID;
+        """)
+
+    def get(self, clean_text, model):
+        if not clean_text:
+            return None
+        row = self.conn.execute("""
+            SELECT summary_en, keywords_en, summary_np, keywords_np
+            FROM summary_cache WHERE content_hash = ? AND model = ?
+        """, (content_hash(clean_text), model)).fetchone()
+        return row
+
+    def put(self, clean_text, model, summary_en, keywords_en, summary_np, keywords_np):
+        """Store only complete results, so a failed half is retried next time."""
+        if not (clean_text and summary_en and summary_np):
+            return
+        self.conn.execute("""
+            INSERT OR REPLACE INTO summary_cache
+                (content_hash, model, summary_en, keywords_en, summary_np, keywords_np)
+            VALUES (?, ?, ?, ?, ?, ?)
+        """, (content_hash(clean_text), model, summary_en, keywords_en, summary_np, keywords_np))
+        self.conn.commit()
+
+    def report(self):
+        s = self.stats
+        print(f"[Cache] url hits: {s['url']}, content hits: {s['content']}, misses: {s['miss']}")
+
+    def close(self):
+        self.conn.close()
@@ -0,0 +1,129 @@
+"""EXPLAIN QUERY PLAN regression check for the web app's hot routes.
+
+Builds empty archives with the scrapers' own init_db() in a temp directory,
+requests each hot route through Flask's test client while recording every
+statement the app runs, and fails if any of them full-scans a large table.
+Needs Python 3.11+ so the trace callback reports statements with their
+parameters already bound.
+"""
+import os
+import sqlite3
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app  # noqa: E402
+import paper_scraper  # noqa: E402
+import portal_scraper  # noqa: E402
+import social_scraper  # noqa: E402
+from archive_calendar import init_calendar  # noqa: E402
+
+HOT_ROUTES = [
+    "/",
+    "/?year=2024",
+    "/portals",
+    "/portals?date=2024-01-01",
+    "/portals?date=2024-01-01&portal=onlinekhabar&lang=np",
+    "/portals?date=2024-01-01&q=nepal",
+    "/papers",
+    "/papers?date=2024-01-01&paper=kantipur",
+    "/socials",
+    "/socials?date=2024-01-01",
+    # social titles are matched with LIKE '%q%', which scans by design
+    "/search?q=nepal&source=papers&source=portals",
+    "/search?from=2024-01-01&to=2024-12-31",
+    "/search?q=nepal&from=2024-01-01",
+]
+
+# Lookup tables that only ever hold a handful of rows may be scanned.
+SMALL_TABLES = {"portals", "platforms", "newspapers", "p", "n", "sqlite_master"}
+
+
+def full_scans(conn, sql):
+    plan = conn.execute("EXPLAIN QUERY PLAN " + sql).fetchall()
+    bad = []
+    for row in plan:
+        detail = row[3]
+        if not detail.startswith("SCAN "):
+            continue
+        target = detail.split()[1]
+        if target.startswith("(") or target in SMALL_TABLES:
+            continue
+        if "USING" in detail or "VIRTUAL TABLE" in detail:  # index scan / FTS
+            continue
+        bad.append(detail)
+    return bad
+
+
+class HotRouteQueryPlanTest(unittest.TestCase):
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.paths = {
+            "PAPER_DB_PATH":    os.path.join(tmp.name, "paper.db"),
+            "PORTAL_DB_PATH":   os.path.join(tmp.name, "portal.db"),
+            "SOCIAL_DB_PATH":   os.path.join(tmp.name, "social.db"),
+            "CALENDAR_DB_PATH": os.path.join(tmp.name, "calendar.db"),
+        }
+        patches = [
+            mock.patch.object(paper_scraper,  "PAPER_DB_PATH", self.paths["PAPER_DB_PATH"]),
+            mock.patch.object(portal_scraper, "DB_PATH",       self.paths["PORTAL_DB_PATH"]),
+            mock.patch.object(social_scraper, "DB_PATH",       self.paths["SOCIAL_DB_PATH"]),
+            *(mock.patch.object(app, name, path) for name, path in self.paths.items()),
+            # a page cached by an earlier test would hide this run's queries
+            mock.patch.object(app, "response_cache",
+                              app.ResponseCache(app.RESPONSE_CACHE_BYTES, app.RESPONSE_CACHE_ENTRIES)),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+
+        paper_scraper.init_db()
+        portal_scraper.init_db()
+        social_scraper.init_db()
+        conn = sqlite3.connect(self.paths["CALENDAR_DB_PATH"])
+        init_calendar(conn)
+        conn.close()
+
+    def trace_statements(self):
+        """Request every hot route; returns {db path: [statement, ...]}."""
+        by_path = {path: [] for path in self.paths.values()}
+        opened  = []
+        open_readonly = app.open_readonly
+
+        def traced(path):
+            conn = open_readonly(path)
+            conn.set_trace_callback(by_path[path].append)
+            opened.append(conn)
+            return conn
+
+        with mock.patch.object(app, "open_readonly", traced):
+            client = app.app.test_client()
+            for route in HOT_ROUTES:
+                with self.subTest(route=route):
+                    self.assertEqual(client.get(route).status_code, 200)
+        for conn in opened:
+            conn.close()
+        return by_path
+
+    def test_hot_routes_avoid_full_table_scans(self):
+        failures = []
+        for path, statements in self.trace_statements().items():
+            conn = sqlite3.connect(path)
+            for sql in dict.fromkeys(statements):
+                # skip pragmas and FTS5's own reads of its shadow tables
+                if sql.lstrip().upper().startswith("PRAGMA") or "'main'." in sql:
+                    continue
+                for detail in full_scans(conn, sql):
+                    failures.append(f"{os.path.basename(path)}: {detail}\n"
+                                    f"    {' '.join(sql.split())[:200]}")
+            conn.close()
+        self.assertEqual(failures, [], "full table scans in hot route queries")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,100 @@
+import os
+import sqlite3
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import summarize_backlog  # noqa: E402
+import summarizers  # noqa: E402
+
+ARTICLE_TEXT = "Title: Budget\n\n" + " ".join(
+    f"Parliament passed the budget after debate number {n}." for n in range(20))
+
+
+class StubBacklogTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp     = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmp.name, "database.db")
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("""
+            CREATE TABLE articles (
+                article_id    INTEGER PRIMARY KEY,
+                article_url   TEXT,
+                clean_content TEXT,
+                summary_en    TEXT,
+                keywords_en   TEXT,
+                summary_np    TEXT,
+                keywords_np   TEXT
+            )
+        """)
+        conn.executemany("INSERT INTO articles VALUES (?, ?, ?, ?, ?, ?, ?)", [
+            (1, "https://example.com/1", ARTICLE_TEXT, None, None, None, None),
+            (2, "https://example.com/2", ARTICLE_TEXT, "kept", "kept", None, ""),
+            (3, "https://example.com/3", "", None, None, None, None),
+        ])
+        conn.commit()
+        conn.close()
+        # article 3 has no text and fails every attempt; don't sleep between them
+        backoff = mock.patch.object(summarize_backlog, "BACKOFF_BASE", 0.0)
+        backoff.start()
+        self.addCleanup(backoff.stop)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def run_stub(self, **kwargs):
+        return summarize_backlog.run_backlog(
+            "stub", per_minute=0, db_path=self.db_path,
+            cache_path=os.path.join(self.tmp.name, "summary_cache.db"), **kwargs)
+
+    def rows(self):
+        conn = sqlite3.connect(self.db_path)
+        rows = conn.execute("""
+            SELECT article_id, summary_en, keywords_en, summary_np, keywords_np
+            FROM articles ORDER BY article_id
+        """).fetchall()
+        conn.close()
+        return rows
+
+    def test_fills_only_blank_columns(self):
+        self.assertEqual(self.run_stub(), 2)
+        first, second, empty = self.rows()
+        self.assertTrue(all(first[1:]))
+        self.assertEqual(second[1:3], ("kept", "kept"))
+        self.assertTrue(second[3] and second[4])
+        self.assertEqual(empty[1:], (None, None, None, None))
+
+    def test_failed_article_is_set_aside(self):
+        self.run_stub()
+        self.assertEqual(self.run_stub(restart=True), 0)
+        conn = sqlite3.connect(self.db_path)
+        attempts = conn.execute(
+            "SELECT article_id, backend, status, attempts FROM backlog_attempts").fetchall()
+        pending  = conn.execute(summarize_backlog.MISSING_SQL, (0, "stub", 10)).fetchall()
+        conn.close()
+        self.assertEqual(attempts, [(3, "stub", "failed", 1)])
+        self.assertEqual(pending, [])
+
+    def test_refuses_the_archive_database(self):
+        with self.assertRaises(SystemExit):
+            summarize_backlog.run_backlog("stub")
+
+
+class GeminiRateLimitTest(unittest.TestCase):
+
+    def test_every_api_call_waits(self):
+        limiter = mock.Mock()
+        gemini  = summarizers.GeminiSummarizer()
+        gemini.limiter = limiter
+        with mock.patch.object(summarizers, "summarize_bilingual", return_value={"en": None, "np": None}), \
+             mock.patch.object(summarizers, "summarize_with_gemini", return_value=("summary", "kw")):
+            gemini.summarize("https://example.com/1", ARTICLE_TEXT)
+        self.assertEqual(limiter.wait.call_count, 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
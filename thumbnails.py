@@ -0,0 +1,175 @@
+"""Front-page thumbnails for the newspaper archive.
+
+Page one is rendered by poppler straight at the thumbnail height instead
+of at 150 dpi and then downscaled, and renders run in a process pool so
+several papers use several cores. Each JPEG carries the SHA-256 of the PDF
+it was made from in its comment, so an unchanged PDF is never rendered
+twice.
+
+Regenerate thumbnails for a date range:
+
+    python thumbnails.py --from 2024-01-01 --to 2024-12-31 [--paper kantipur] [--force]
+"""
+import argparse
+import hashlib
+import multiprocessing
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from pdf2image import convert_from_path
+from PIL import Image
+
+THUMB_SIZE     = (400, 600)
+JPEG_QUALITY   = 85
+RENDER_WORKERS = os.cpu_count() or 2
+
+# Bundled Windows build of poppler; elsewhere pdftoppm comes from the PATH.
+POPPLER_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                            "Release-25.12.0-0", "poppler-25.12.0", "Library", "bin")
+if not os.path.isdir(POPPLER_PATH):
+    POPPLER_PATH = None
+
+_pool      = None
+_pool_lock = threading.Lock()
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(1 << 20):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def thumbnail_tag(sha256):
+    return f"sha256={sha256} size={THUMB_SIZE[0]}x{THUMB_SIZE[1]}"
+
+
+def is_current(thumb_path, sha256):
+    """True if thumb_path was rendered from this PDF at the current size."""
+    try:
+        with Image.open(thumb_path) as img:
+            return img.info.get("comment", b"").decode(errors="replace") == thumbnail_tag(sha256)
+    except OSError:
+        return False
+
+
+def render_thumbnail(pdf_path, thumb_path, sha256=None, force=False):
+    """Render page one of pdf_path to thumb_path; returns "rendered" or "cached".
+
+    Runs in a worker process. sha256 is the PDF's hash as recorded in the
+    files table; without it the file on disk is hashed.
+    """
+    sha256 = sha256 or file_sha256(pdf_path)
+    if not force and is_current(thumb_path, sha256):
+        return "cached"
+
+    images = convert_from_path(pdf_path, first_page=1, last_page=1, single_file=True,
+                               size=(None, THUMB_SIZE[1]), poppler_path=POPPLER_PATH)
+    if not images:
+        raise RuntimeError("poppler returned no page")
+    img = images[0].convert("RGB")
+    img.thumbnail(THUMB_SIZE)  # wide pages: fit the width as well
+
+    tmp_path = thumb_path + ".tmp"
+    img.save(tmp_path, "JPEG", quality=JPEG_QUALITY, comment=thumbnail_tag(sha256).encode())
+    os.replace(tmp_path, thumb_path)
+    return "rendered"
+
+
+def render_pool():
+    """The process pool shared by every caller in this process."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # forkserver: the scrapers are multi-threaded when they first render
+            method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+            _pool  = ProcessPoolExecutor(RENDER_WORKERS, mp_context=multiprocessing.get_context(method))
+        return _pool
+
+
+def shutdown_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=True, cancel_futures=True)
+            _pool = None
+
+
+def make_thumbnail(pdf_path, thumb_path, label, sha256=None):
+    """Render in the process pool and wait; returns thumb_path or None."""
+    try:
+        status = render_pool().submit(render_thumbnail, pdf_path, thumb_path, sha256).result()
+    except Exception as e:
+        print(f"Thumbnail generation failed for {label}: {e}")
+        return None
+    print(f"Thumbnail {status}: {thumb_path}")
+    return thumb_path
+
+
+def regenerate(date_from, date_to, paper=None, force=False):
+    """Re-render every paper thumbnail between two issue dates, in parallel."""
+    from paper_scraper import PAPER_DB_PATH, PAPER_PDF_DIR, PAPER_THUMB_DIR
+
+    conn = sqlite3.connect(PAPER_DB_PATH)
+    sql  = """
+        SELECT f.id, f.pdf_path, f.thumbnail_path, f.sha256, i.issue_date, n.key
+        FROM files f
+        JOIN issues i     ON i.id = f.issue_id
+        JOIN newspapers n ON n.id = i.newspaper_id
+        WHERE i.issue_date BETWEEN ? AND ?
+    """
+    params = [date_from, date_to]
+    if paper:
+        sql += " AND n.key = ?"
+        params.append(paper)
+    rows = conn.execute(sql + " ORDER BY i.issue_date", params).fetchall()
+    print(f"{len(rows)} issues between {date_from} and {date_to}")
+
+    counts  = {"rendered": 0, "cached": 0, "failed": 0}
+    started = time.monotonic()
+    futures = {}
+    pool    = render_pool()
+    for file_id, pdf_path, thumb_path, sha256, issue_date, key in rows:
+        pdf_path   = os.path.join(PAPER_PDF_DIR, os.path.basename(pdf_path))
+        thumb_name = os.path.basename(thumb_path) if thumb_path else f"{issue_date}_{key}.jpg"
+        thumb_path = os.path.join(PAPER_THUMB_DIR, thumb_name)
+        if not os.path.exists(pdf_path):
+            print(f"  missing PDF: {pdf_path}")
+            counts["failed"] += 1
+            continue
+        future = pool.submit(render_thumbnail, pdf_path, thumb_path, sha256, force)
+        futures[future] = (file_id, thumb_path, f"{issue_date} {key}")
+
+    for future in as_completed(futures):
+        file_id, thumb_path, label = futures[future]
+        try:
+            status = future.result()
+        except Exception as e:
+            print(f"  {label}: failed ({e})")
+            counts["failed"] += 1
+            continue
+        counts[status] += 1
+        conn.execute("UPDATE files SET thumbnail_path = ? WHERE id = ? AND thumbnail_path IS NOT ?",
+                     (thumb_path, file_id, thumb_path))
+    conn.commit()
+    conn.close()
+    shutdown_pool()
+
+    elapsed = time.monotonic() - started
+    print(f"rendered {counts['rendered']}, up to date {counts['cached']}, "
+          f"failed {counts['failed']} in {elapsed:.1f}s")
+    return counts
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Regenerate newspaper thumbnails.")
+    parser.add_argument("--from", dest="date_from", required=True, help="YYYY-MM-DD")
+    parser.add_argument("--to", dest="date_to", required=True, help="YYYY-MM-DD")
+    parser.add_argument("--paper", help="newspaper key, e.g. kantipur")
+    parser.add_argument("--force", action="store_true", help="re-render even if up to date")
+    args = parser.parse_args()
+    regenerate(args.date_from, args.date_to, args.paper, args.force)